@@ -0,0 +1,197 @@
+"""Local OpenAI-compatible chat completions server answering classification prompts."""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal
+
+from loguru import logger
+
+from oslm_analyst.data_utils import Lifecycle, Modality
+
+_BATCH_ITEM_RE = re.compile(r'^### Repository \d+\nIdentifier: (\S+)', re.MULTILINE)
+_IDENTIFIER_RE = re.compile(r'^Identifier: (\S+)', re.MULTILINE)
+
+
+def deterministic_label(identifier: str, category: Literal['model', 'dataset']) -> dict:
+    """The answer the fake LLM gives for a repository, derived from a hash of its identifier."""
+    h = zlib.crc32(identifier.encode('utf-8'))
+    if h % 10 == 0:
+        result = {'valid': False, 'modality': None, 'reason': 'Fake: invalid'}
+        if category == 'dataset':
+            result['lifecycle'] = None
+        return result
+    modalities = list(Modality)
+    result = {
+        'valid': True,
+        'modality': modalities[(h // 10) % len(modalities)].value,
+        'reason': 'Fake: hashed identifier',
+    }
+    if category == 'dataset':
+        lifecycles = list(Lifecycle)
+        result['lifecycle'] = lifecycles[(h // 100) % len(lifecycles)].value
+    return result
+
+
+class FakeLLMServer:
+    """OpenAI-compatible `/v1/chat/completions` endpoint for tests and benchmarks.
+
+    Answers are deterministic (see `deterministic_label`), both for single and batched prompts.
+    Each request sleeps `latency` seconds plus `latency_per_1k_tokens` per 1000 prompt tokens;
+    requests beyond `rpm` per minute get a 429 with `Retry-After`, and `error_rate` of the
+    requests fail with a 500.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        latency_per_1k_tokens: float = 0.0,
+        rpm: int | None = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        rate_window: float = 60.0,
+    ):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.rpm = rpm
+        # Length of the rate limit window in seconds; shorter than a minute only in tests
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: deque[float] = deque()
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    return self._send(400, {'error': {'message': 'Invalid JSON body'}})
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    return self._send(404, {'error': {'message': f'Unknown path {self.path}'}})
+                status, payload, headers = server.respond(body)
+                self._send(status, payload, headers)
+
+            def _send(self, status: int, payload: dict, headers: dict | None = None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.trace(f'Fake LLM: {format % args}')
+
+        return Handler
+
+    def _admit(self) -> tuple[int, float]:
+        """Return (status, retry-after) for a new request under the rate limit and error rate."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            while self._window and self._window[0] <= now - self.rate_window:
+                self._window.popleft()
+            if self.rpm is not None and len(self._window) >= self.rpm:
+                self.rate_limited += 1
+                retry_after = self._window[0] + self.rate_window - now if self._window else 1.0
+                return 429, retry_after
+            self._window.append(now)
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return 500, 0.0
+        return 200, 0.0
+
+    def respond(self, body: dict) -> tuple[int, dict, dict]:
+        messages = body.get('messages', [])
+        system = ' '.join(m.get('content', '') for m in messages if m.get('role') == 'system')
+        prompt = '\n'.join(m.get('content', '') for m in messages if m.get('role') != 'system')
+        prompt_tokens = (len(system) + len(prompt)) // 4 + 1
+
+        status, retry_after = self._admit()
+        if status == 429:
+            return (
+                429,
+                {'error': {'message': 'Rate limit reached', 'type': 'requests', 'code': '429'}},
+                {'Retry-After': f'{retry_after:.3f}'},
+            )
+        time.sleep(self.latency + self.latency_per_1k_tokens * prompt_tokens / 1000)
+        if status == 500:
+            return 500, {'error': {'message': 'Injected server error', 'type': 'server'}}, {}
+
+        category = 'dataset' if 'dataset repositories' in system else 'model'
+        batch = _BATCH_ITEM_RE.findall(prompt)
+        if batch:
+            answer = [{'identifier': i, **deterministic_label(i, category)} for i in batch]
+        else:
+            match = _IDENTIFIER_RE.search(prompt)
+            answer = deterministic_label(match.group(1) if match else '', category)
+        content = json.dumps(answer)
+        completion_tokens = len(content) // 4 + 1
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+        return (
+            200,
+            {
+                'id': f'chatcmpl-fake-{self.requests}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'fake'),
+                'choices': [
+                    {
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': content},
+                        'finish_reason': 'stop',
+                    }
+                ],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens,
+                },
+            },
+            {},
+        )
+
+    def start(self) -> 'FakeLLMServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f'Fake LLM server listening on {self.base_url}')
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,133 @@
+"""Throughput benchmark of `ModalityAIHelper.update_extra_info` against the fake LLM server."""
+
+import itertools
+import json
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Literal
+
+from langchain_core.caches import InMemoryCache
+from loguru import logger
+
+from oslm_analyst.bench.fake_llm import FakeLLMServer
+from oslm_analyst.bench.readme_source import FakeReadmeSource
+from oslm_analyst.processors.modality import ModalityAIHelper, write_jsonl_atomic
+
+
+@dataclass
+class ThroughputSetting:
+    llm_concurrency: int = 1
+    batch_size: int = 1
+    fetch_concurrency: int = 4
+    cache: bool = False
+
+
+def make_info_lines(category: Literal['model', 'dataset'], n: int, seed: int = 0) -> list[dict]:
+    """Unlabelled extra-info entries for `n` synthetic repositories."""
+    lines = []
+    for i in range(n):
+        line = {
+            'repo': f'org{(i * 7 + seed) % 50}',
+            'name': f'{category}-{seed}-{i}',
+            'modality': None,
+            'valid': None,
+            'link': f'https://huggingface.co/org/{category}-{i}',
+        }
+        if category == 'dataset':
+            line['lifecycle'] = None
+        lines.append(line)
+    return lines
+
+
+def _timed_run(helper: ModalityAIHelper, info_path: Path, lines: list[dict]) -> float:
+    write_jsonl_atomic(info_path, lines)
+    start = time.perf_counter()
+    helper.update_extra_info()
+    return time.perf_counter() - start
+
+
+def run_setting(
+    setting: ThroughputSetting,
+    server: FakeLLMServer,
+    readme_source: FakeReadmeSource,
+    n_items: int,
+    category: Literal['model', 'dataset'] = 'model',
+    use_rules: bool = False,
+    work_dir: Path | None = None,
+) -> dict:
+    """Classify `n_items` synthetic repositories once (twice with a cache) and time it."""
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        info_path = Path(tmp) / f'{category}_info.jsonl'
+        helper = ModalityAIHelper(
+            api_key='fake',
+            base_url=server.base_url,
+            model='fake',
+            batch_size=setting.batch_size,
+            use_rules=use_rules,
+            knn_threshold=None,
+            fetch_concurrency=setting.fetch_concurrency,
+            llm_concurrency=setting.llm_concurrency,
+        )
+        helper._fetch_readme = readme_source.fetch  # type: ignore
+        helper.model_info_path = info_path if category == 'model' else Path(tmp) / 'missing'
+        helper.dataset_info_path = info_path if category == 'dataset' else Path(tmp) / 'missing'
+        if setting.cache:
+            helper.llm.cache = InMemoryCache()  # type: ignore
+
+        lines = make_info_lines(category, n_items)
+        seconds = _timed_run(helper, info_path, lines)
+        result = {
+            **asdict(setting),
+            'items': n_items,
+            'seconds': seconds,
+            'items_per_second': n_items / seconds if seconds else None,
+            'llm_requests': helper.stats[category].llm_requests,
+        }
+        if setting.cache:
+            # Same repositories again: every prompt is now served from the cache
+            result['warm_seconds'] = _timed_run(helper, info_path, lines)
+        result['llm'] = helper.metrics[category].summary()
+    logger.info(
+        f'{setting}: {n_items} items in {result["seconds"]:.2f}s '
+        f'({result["items_per_second"]:.1f} items/s)'
+    )
+    return result
+
+
+def run_benchmark(
+    llm_concurrency: list[int],
+    batch_size: list[int],
+    cache: list[bool],
+    n_items: int = 200,
+    category: Literal['model', 'dataset'] = 'model',
+    latency: float = 0.2,
+    latency_per_1k_tokens: float = 0.0,
+    rpm: int | None = None,
+    error_rate: float = 0.0,
+    readme_latency: float = 0.0,
+    fetch_concurrency: int = 4,
+    use_rules: bool = False,
+    out_path: Path | None = None,
+) -> list[dict]:
+    """Run every combination of the given settings against one fake LLM server."""
+    readme_source = FakeReadmeSource(latency=readme_latency)
+    results = []
+    with FakeLLMServer(
+        latency=latency,
+        latency_per_1k_tokens=latency_per_1k_tokens,
+        rpm=rpm,
+        error_rate=error_rate,
+    ) as server:
+        for concurrency, size, cached in itertools.product(llm_concurrency, batch_size, cache):
+            setting = ThroughputSetting(concurrency, size, fetch_concurrency, cached)
+            results.append(
+                run_setting(setting, server, readme_source, n_items, category, use_rules)
+            )
+    if out_path is not None:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f'Wrote benchmark results to {out_path}')
+    return results
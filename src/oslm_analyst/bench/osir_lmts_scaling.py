@@ -0,0 +1,145 @@
+"""Scaling benchmark of `OsirLmtsProcessor.run` on synthetic trees of increasing size, with a
+check of the time and memory of every stage against a baseline run."""
+
+import json
+import tempfile
+import time
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+
+from oslm_analyst.bench.osir_lmts_synthetic import SyntheticSetting, generate_tree
+from oslm_analyst.processors.osir_lmts import OsirLmtsProcessor
+from oslm_analyst.processors.osir_lmts_rank import get_rank_strategy_for_month
+
+# Stage changes below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MEMORY = 2**20
+SETTING_FIELDS = (*(f.name for f in fields(SyntheticSetting)), 'engine', 'workers')
+
+
+def run_size(
+    setting: SyntheticSetting,
+    engine: Literal['python', 'columnar'] = 'python',
+    workers: int = 1,
+    work_dir: Path | None = None,
+) -> dict:
+    """Generate a tree and run every month in order, timing the stages of the last one.
+
+    The timed runs are not profiled, so their times carry no cProfile or tracemalloc
+    overhead; the peak memory of every stage comes from a separate, profiled rerun of the
+    last month.
+    """
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        months = generate_tree(root, setting)
+        generate_seconds = time.perf_counter() - start
+
+        processor = OsirLmtsProcessor(
+            months[0],
+            output_root=root / 'output',
+            config_root=root / 'config',
+            engine=engine,
+            workers=workers,
+        )
+        # The earlier months build the accumulated data and ranks the last month starts from
+        for month in months:
+            processor = processor.for_month(month)
+            start = time.perf_counter()
+            report = processor.run(get_rank_strategy_for_month(month))
+            wall_seconds = time.perf_counter() - start
+        profiled = processor.run(get_rank_strategy_for_month(months[-1]), force=True, profile=True)
+
+    timings = report.profile_dict()['stages']
+    peaks = {name: p['peak_memory'] for name, p in profiled.profile_dict()['stages'].items()}
+    return {
+        **asdict(setting),
+        'engine': engine,
+        'workers': workers,
+        'month': months[-1],
+        'generate_seconds': generate_seconds,
+        'wall_seconds': wall_seconds,
+        'peak_memory': max((peak or 0 for peak in peaks.values()), default=0),
+        'stages': {
+            name: {
+                **{key: p[key] for key in ('wall_seconds', 'cpu_seconds', 'rows')},
+                'peak_memory': peaks.get(name),
+            }
+            for name, p in timings.items()
+        },
+    }
+
+
+def _setting_key(result: dict) -> tuple:
+    """What a result is comparable on: the whole synthetic setting, engine and workers."""
+    return tuple(result.get(name) for name in SETTING_FIELDS)
+
+
+def find_regressions(
+    results: list[dict],
+    baseline: list[dict],
+    threshold: float = 0.5,
+    min_seconds: float = MIN_SECONDS,
+    min_memory: int = MIN_MEMORY,
+) -> list[str]:
+    """Stages slower or bigger than in the baseline result of the same setting by more than
+    `threshold` (0.5 is 50%) and the noise floors."""
+    by_setting = {_setting_key(b): b for b in baseline}
+    regressions = []
+    for result in results:
+        base = by_setting.get(_setting_key(result))
+        if base is None:
+            logger.warning(f'No baseline result for {result["identifiers"]} identifiers')
+            continue
+        for name, stage in result['stages'].items():
+            base_stage = base['stages'].get(name)
+            if base_stage is None:
+                continue
+            for key, floor, unit, scale in (
+                ('wall_seconds', min_seconds, 's', 1),
+                ('peak_memory', min_memory, ' MiB', 2**20),
+            ):
+                now, before = stage.get(key), base_stage.get(key)
+                if now is None or before is None:
+                    continue
+                if now > before * (1 + threshold) and now - before > floor:
+                    regressions.append(
+                        f'{result["identifiers"]} identifiers, {name}: {key} '
+                        f'{before / scale:.2f}{unit} -> {now / scale:.2f}{unit}'
+                    )
+    return regressions
+
+
+def run_scaling(
+    sizes: list[int],
+    setting: SyntheticSetting,
+    engine: Literal['python', 'columnar'] = 'python',
+    workers: int = 1,
+    baseline_path: Path | None = None,
+    threshold: float = 0.5,
+    out_path: Path | None = None,
+) -> tuple[list[dict], list[str]]:
+    """Run `setting` at every number of identifiers of `sizes`; returns the results and the
+    regressions against the results of `baseline_path`, written by an earlier run."""
+    results = []
+    for size in sizes:
+        result = run_size(replace(setting, identifiers=size), engine, workers)
+        logger.info(
+            f'{size} identifiers: {result["wall_seconds"]:.2f}s, '
+            f'peak {result["peak_memory"] / 2**20:.1f} MiB'
+        )
+        results.append(result)
+    if out_path is not None:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f'Wrote benchmark results to {out_path}')
+
+    regressions = []
+    if baseline_path is not None:
+        with open(baseline_path, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), threshold)
+    return results, regressions
@@ -0,0 +1,310 @@
+"""Synthetic input trees for `OsirLmtsProcessor`: the output/{platform}_{date} snapshot
+directories of several months, shaped like the crawlers' output, and the matching config/
+files, at any number of organizations and repositories.
+
+The snapshots have the quirks of real crawls (missing counts, likes of -1, repositories
+crawled twice, lines without repository), so the trees serve the processor's tests too.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import yaml
+from loguru import logger
+
+from oslm_analyst.processors.osir_lmts import month_range
+from oslm_analyst.processors.osir_lmts_data import (
+    EvalSummaryRow,
+    EvalSummaryTable,
+    InfraSummaryRow,
+    InfraSummaryTable,
+)
+
+MODEL_MODALITIES = {
+    'Language': 0.45,
+    'Vision': 0.15,
+    'Multimodal': 0.15,
+    'Vector': 0.1,
+    'Speech': 0.08,
+    'Embodied': 0.03,
+    'Protein': 0.02,
+    '3D': 0.02,
+}
+DATASET_MODALITIES = {
+    'Language': 0.5,
+    'Vision': 0.2,
+    'Multimodal': 0.15,
+    'Speech': 0.1,
+    'Embodied': 0.05,
+}
+LIFECYCLES = {'Fine-tuning': 0.5, 'Pre-training': 0.3, 'Preference': 0.1, 'Evaluation': 0.1}
+ORG_TYPES = {'Company': 0.6, 'Research Lab': 0.15, 'University': 0.15, 'Non-Profit': 0.1}
+COUNTRIES = {'CN': 0.45, 'US': 0.4, 'DE': 0.05, 'FR': 0.05, 'UAE': 0.05}
+
+
+def _link(platform: str, category: str, account: str, name: str) -> str:
+    if platform == 'modelscope':
+        return f'https://modelscope.cn/{category}s/{account}/{name}'
+    prefix = 'datasets/' if category == 'dataset' else ''
+    return f'https://huggingface.co/{prefix}{account}/{name}'
+
+
+@dataclass
+class SyntheticSetting:
+    orgs: int = 50
+    # Models; there are `dataset_ratio` as many datasets
+    identifiers: int = 10_000
+    months: int = 2
+    snapshots_per_month: int = 2
+    # Zipf exponent of the spread of repositories over accounts and of their popularity
+    skew: float = 1.1
+    dataset_ratio: float = 0.25
+    first_month: str = '2026-01'
+    seed: int = 0
+
+
+def _choice(rng: np.random.Generator, weights: dict[str, float], n: int) -> list[str]:
+    p = np.asarray(list(weights.values()))
+    return rng.choice(list(weights), size=n, p=p / p.sum()).tolist()
+
+
+def _zipf_weights(n: int, skew: float) -> np.ndarray:
+    weights = np.arange(1, n + 1, dtype=float) ** -skew
+    return weights / weights.sum()
+
+
+def _write_jsonl(path: Path, lines: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(line, ensure_ascii=False) + '\n' for line in lines)
+
+
+def _orgs(
+    rng: np.random.Generator, setting: SyntheticSetting
+) -> tuple[list[dict], list[tuple[str, str]]]:
+    """orgs.yaml entries, and every (platform, account), those of no organization included."""
+    orgs = []
+    accounts = []
+    types = _choice(rng, ORG_TYPES, setting.orgs)
+    countries = _choice(rng, COUNTRIES, setting.orgs)
+    for i in range(setting.orgs):
+        hf_accounts = [f'org{i}-hf{j}' for j in range(1 + rng.poisson(0.7))]
+        ms_accounts = [f'org{i}-ms{j}' for j in range(rng.poisson(0.6))]
+        orgs.append(
+            {
+                'org': f'Org{i}',
+                'type': types[i],
+                'country': countries[i],
+                'focus': [],
+                'hf_accounts': hf_accounts,
+                'ms_accounts': ms_accounts,
+                'metadata': {'chips': int(rng.integers(0, 5))},
+            }
+        )
+        accounts += [('huggingface', a) for a in hf_accounts]
+        accounts += [('modelscope', a) for a in ms_accounts]
+    # As many accounts of no tracked organization, whose repositories are crawled too
+    accounts += [
+        ('modelscope' if j % 4 == 3 else 'huggingface', f'user{j}') for j in range(setting.orgs)
+    ]
+    return orgs, accounts
+
+
+def _repositories(
+    rng: np.random.Generator,
+    setting: SyntheticSetting,
+    accounts: list[tuple[str, str]],
+    category: Literal['model', 'dataset'],
+    n: int,
+) -> dict[str, np.ndarray | list]:
+    """Account, popularity, first month and labels of `n` repositories."""
+    # A few accounts own most repositories
+    weights = _zipf_weights(len(accounts), setting.skew)
+    owners = rng.permutation(len(accounts))[rng.choice(len(accounts), size=n, p=weights)]
+    modalities = MODEL_MODALITIES if category == 'model' else DATASET_MODALITIES
+    return {
+        'account': owners,
+        # Monthly downloads, heavy-tailed
+        'popularity': (rng.pareto(setting.skew, n) * 20).astype(np.int64),
+        # Most repositories exist from the first month, the others appear later
+        'first_month': np.where(rng.random(n) < 0.7, 0, rng.integers(0, setting.months, n)),
+        'modality': _choice(rng, modalities, n),
+        'lifecycle': _choice(rng, LIFECYCLES, n),
+        'valid': rng.choice([True, False, None], size=n, p=[0.9, 0.05, 0.05]).tolist(),
+    }
+
+
+def _snapshot_lines(
+    rng: np.random.Generator,
+    repos: dict,
+    accounts: list[tuple[str, str]],
+    category: Literal['model', 'dataset'],
+    platform: str,
+    month_idx: int,
+    fraction: float,
+    date: str,
+) -> list[dict]:
+    """Raw lines of a platform's snapshot, `fraction` of the way through month `month_idx`."""
+    n = len(repos['account'])
+    noise = rng.lognormal(0, 0.3, n)
+    drop = rng.random(n)
+    quirk = rng.random(n)
+    labelled = rng.random(n) < 0.5
+    lines = []
+    for i, owner in enumerate(repos['account'].tolist()):
+        account_platform, account = accounts[owner]
+        # A few repositories are missed by a crawl
+        if account_platform != platform or repos['first_month'][i] > month_idx or drop[i] < 0.03:
+            continue
+        name = f'{category}-{i}'
+        if drop[i] > 0.99:
+            lines.append(
+                {
+                    'repo': account,
+                    'name': name,
+                    'category': category,
+                    'date_crawl': date,
+                    'error': 'HTTP Error 404',
+                }
+            )
+            continue
+        popularity = int(repos['popularity'][i] * noise[i])
+        line = {'repo': account, 'name': name, 'category': category, 'date_crawl': date}
+        if platform == 'huggingface':
+            line['downloads_last_month'] = popularity
+            line['likes'] = int(popularity**0.5)
+            line['discussions'] = popularity % 7 if quirk[i] > 0.05 else None
+            line['discussion_msg'] = popularity % 23
+        else:
+            # Totals since the repository appeared
+            months = month_idx - int(repos['first_month'][i]) + fraction
+            line['downloads'] = int(popularity * months)
+            line['likes'] = int(popularity**0.4)
+        # Counts the crawler could not read
+        if quirk[i] < 0.03:
+            line['downloads_last_month' if platform == 'huggingface' else 'downloads'] = None
+        elif quirk[i] < 0.06:
+            line['likes'] = -1 if quirk[i] < 0.045 else None
+        line['link'] = _link(platform, category, account, name)
+        line['modality'] = repos['modality'][i] if labelled[i] else None
+        if category == 'dataset':
+            line['lifecycle'] = repos['lifecycle'][i] if labelled[i] else None
+        # The crawlers copy the labels and validity of the extra info
+        line['valid'] = repos['valid'][i]
+        lines.append(line)
+    # Repositories crawled twice, the later line winning, and a line without repository
+    crawled = [line for line in lines if 'error' not in line]
+    if crawled:
+        twice = rng.choice(len(crawled), size=1 + len(crawled) // 50, replace=False)
+        lines += [dict(crawled[j], likes=3) for j in sorted(twice.tolist())]
+    lines.append({'repo': '', 'name': 'orphan', 'category': category, 'downloads': 5})
+    return lines
+
+
+def _curated_summaries(rng: np.random.Generator, out_dir: Path, orgs: list[dict]) -> None:
+    """The manually curated infra/eval summaries of a month, as the processor keeps them."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    infra = InfraSummaryTable()
+    evals = EvalSummaryTable()
+    for org in orgs:
+        infra.rows.append(InfraSummaryRow(org['org'], *rng.integers(0, 10, 12).tolist()))
+        evals.rows.append(EvalSummaryRow(org['org'], *rng.integers(0, 10, 5).tolist()))
+    infra.to_csv(out_dir / 'infra_summary.csv', others_as_float=False)
+    evals.to_csv(out_dir / 'eval_summary.csv', others_as_float=False)
+
+
+def _curated_sources(rng: np.random.Generator, root: Path, orgs: list[dict]) -> None:
+    """Curated infra/eval summaries as delivered, with two header lines, for source paths."""
+    for name, width in (('infra_summary.csv', 12), ('eval_summary.csv', 5)):
+        rows = ['header', 'header'] + [
+            ','.join([org['org'], *map(str, rng.integers(0, 10, width).tolist())]) for org in orgs
+        ]
+        (root / name).write_text('\n'.join(rows) + '\n', encoding='utf-8')
+
+
+def _other_source_datasets(rng: np.random.Generator, orgs: list[dict]) -> list[dict]:
+    """Datasets published outside the crawled platforms, some of no tracked organization."""
+    lines = []
+    for i, org in enumerate(orgs):
+        if rng.random() < 0.5:
+            lines.append(
+                {
+                    'org': org['org'],
+                    'dataset_name': f'external-{i}',
+                    'modality': _choice(rng, DATASET_MODALITIES, 1)[0],
+                    'lifecycle': _choice(rng, LIFECYCLES, 1)[0] if i % 3 else None,
+                }
+            )
+    lines.append({'org': 'Elsewhere', 'dataset_name': 'external', 'modality': 'Vision'})
+    lines.append({'dataset_name': 'unattributed', 'modality': 'Language'})
+    return lines
+
+
+def generate_tree(root: Path, setting: SyntheticSetting) -> list[str]:
+    """Write root/config and the snapshot directories of root/output; returns the months.
+
+    The curated infra/eval summaries are written to every output/osir-lmts_YYYY-MM directory,
+    where `OsirLmtsProcessor.run` reads them without source paths, and as delivered to
+    root/infra_summary.csv and root/eval_summary.csv, to pass as source paths.
+    """
+    rng = np.random.default_rng(setting.seed)
+    months = month_range(
+        setting.first_month,
+        str(np.datetime64(setting.first_month, 'M') + np.timedelta64(setting.months - 1, 'M')),
+    )
+    orgs, accounts = _orgs(rng, setting)
+    config = root / 'config'
+    config.mkdir(parents=True, exist_ok=True)
+    (config / 'orgs.yaml').write_text(yaml.safe_dump(orgs, sort_keys=False), encoding='utf-8')
+    _write_jsonl(config / 'other_source_datasets.jsonl', _other_source_datasets(rng, orgs))
+
+    days = np.linspace(3, 26, setting.snapshots_per_month).round().astype(int).tolist()
+    for category in ('model', 'dataset'):
+        n = setting.identifiers
+        if category == 'dataset':
+            n = int(n * setting.dataset_ratio)
+        repos = _repositories(rng, setting, accounts, category, n)
+        unclassified = rng.random(n)
+        info, descendants = [], []
+        for i, owner in enumerate(repos['account'].tolist()):
+            platform, account = accounts[owner]
+            # A few entries were never classified
+            modality = repos['modality'][i] if unclassified[i] > 0.05 else None
+            entry = {'repo': account, 'name': f'{category}-{i}', 'modality': modality}
+            if category == 'dataset':
+                entry['lifecycle'] = repos['lifecycle'][i]
+            entry['valid'] = repos['valid'][i]
+            entry['link'] = _link(platform, category, account, f'{category}-{i}')
+            info.append(entry)
+            if repos['popularity'][i] > 50:
+                descendants.append(
+                    {
+                        'repo': account,
+                        'name': f'{category}-{i}',
+                        'descendants': int(repos['popularity'][i] ** 0.5),
+                    }
+                )
+        _write_jsonl(config / f'{category}_info.jsonl', info)
+        _write_jsonl(config / f'{category}_descendants.jsonl', descendants)
+
+        for month_idx, month in enumerate(months):
+            for day in days:
+                date = f'{month}-{day:02d}'
+                for platform in ('huggingface', 'modelscope'):
+                    lines = _snapshot_lines(
+                        rng, repos, accounts, category, platform, month_idx, day / 30, date
+                    )
+                    path = root / 'output' / f'{platform}_{date}' / f'raw_{category}_data.jsonl'
+                    _write_jsonl(path, lines)
+
+    for month in months:
+        _curated_summaries(rng, root / 'output' / f'osir-lmts_{month}', orgs)
+    _curated_sources(rng, root, orgs)
+    logger.info(
+        f'Generated {setting.identifiers} models of {setting.orgs} organizations over '
+        f'{len(months)} months in {root}'
+    )
+    return months
@@ -0,0 +1,64 @@
+"""Deterministic stand-in for fetching READMEs from HuggingFace/ModelScope."""
+
+import random
+import time
+import zlib
+from typing import Literal
+
+_SECTIONS = [
+    ('## Model Description', 'This repository contains a model trained for {task}. ' * 6),
+    ('## Installation', '```bash\npip install package-{n}\n```'),
+    ('## Usage', '```python\nfrom package import Model\nmodel = Model.load("{identifier}")\n```'),
+    ('## Evaluation', '| Benchmark | Score |\n|---|---|\n| bench-{n} | 0.{n} |'),
+    ('## Training Data', 'The training data consists of public {task} corpora. ' * 8),
+    ('## Citation', '@article{{ref{n},\n  title={{Paper {n}}}\n}}'),
+    ('## License', 'Released under the Apache 2.0 license. ' * 10),
+]
+
+_TASKS = ['text generation', 'image classification', 'speech recognition', 'embeddings']
+
+
+class FakeReadmeSource:
+    """Generates a README per identifier, with `latency` seconds of simulated network delay.
+
+    Sizes vary between repositories, `empty_ratio` of them have no README and
+    `metadata_ratio` carry a card header the metadata rules can resolve.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        empty_ratio: float = 0.05,
+        metadata_ratio: float = 0.3,
+        min_sections: int = 2,
+        max_sections: int = 7,
+    ):
+        self.latency = latency
+        self.empty_ratio = empty_ratio
+        self.metadata_ratio = metadata_ratio
+        self.min_sections = min_sections
+        self.max_sections = max_sections
+
+    def fetch(self, identifier: str, link: str, category: Literal['model', 'dataset']) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        rng = random.Random(zlib.crc32(identifier.encode('utf-8')))
+        if rng.random() < self.empty_ratio:
+            return ''
+        task = rng.choice(_TASKS)
+        parts = []
+        if rng.random() < self.metadata_ratio:
+            key = 'pipeline_tag' if category == 'model' else 'task_categories'
+            tag = {
+                'text generation': 'text-generation',
+                'image classification': 'image-classification',
+                'speech recognition': 'automatic-speech-recognition',
+                'embeddings': 'sentence-similarity',
+            }[task]
+            parts.append(f'---\n{key}: {tag}\nlicense: apache-2.0\n---')
+        parts.append(f'# {identifier}\n\nA {category} for {task}.')
+        n_sections = rng.randint(self.min_sections, self.max_sections)
+        for heading, text in rng.sample(_SECTIONS, n_sections):
+            n = rng.randint(1, 99)
+            parts.append(f'{heading}\n{text.format(task=task, n=n, identifier=identifier)}')
+        return '\n\n'.join(parts)
@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta
+import glob
 import json
+import os
 import re
 import subprocess
 import sys
+import time
 import asyncio
 from oslm_analyst.processors.modality import ModalityAIHelper
-from oslm_analyst.processors.osir_lmts import OsirLmtsProcessor
+from oslm_analyst.processors.osir_lmts import OsirLmtsProcessor, month_range
 from oslm_analyst.processors.osir_lmts_rank import get_rank_strategy_for_month
 from oslm_analyst.database.osir_lmts import OsirLmtsDatabase
 import typer
@@ -28,6 +31,10 @@ process_app = typer.Typer(name='Raw-data Processor', help='Post-process the raw
 app.add_typer(process_app, name='process')
 db_app = typer.Typer(name='Database', help='OSIR-LMTS database management.')
 app.add_typer(db_app, name='db')
+bench_app = typer.Typer(
+    name='Benchmark', help='Local benchmarks against a fake LLM endpoint or synthetic data.'
+)
+app.add_typer(bench_app, name='bench')
 
 
 @app.command()
@@ -201,12 +208,25 @@ def crawl(
             raise NotImplementedError()
 
 
+def _expand_dirs(paths: list[str]) -> list[Path]:
+    """Expand glob patterns among `paths`, keeping their order and dropping duplicates."""
+    dirs: list[Path] = []
+    for path in paths:
+        matches = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        if not matches:
+            logger.warning(f'No directory matches {path}')
+        for match in matches:
+            if Path(match) not in dirs:
+                dirs.append(Path(match))
+    return dirs
+
+
 @process_app.command('gen-modality')
 def process_modality(
     inp_path: Annotated[
-        str | None,
+        list[str] | None,
         Argument(
-            help='Specify the data source (consistent with the path output by the crawl command), for example, huggingface_2026-01-01'
+            help='Specify the data sources (consistent with the paths output by the crawl command), for example, huggingface_2026-01-01 modelscope_2026-01-01, or a glob such as output/*_2026-01-01'
         ),
     ] = None,
     api_key: Annotated[
@@ -227,25 +247,317 @@ def process_modality(
             help='Model name to use. If not provided, uses OPENAI_MODEL_NAME environment variable or defaults to gpt-5.'
         ),
     ] = None,
+    batch_size: Annotated[
+        int,
+        Option(
+            help='Number of repositories packed into one LLM request. 1 disables batching; '
+            'batches whose responses cannot be parsed fall back to per-item requests.'
+        ),
+    ] = 1,
+    batch_token_budget: Annotated[
+        int,
+        Option(help='Maximum estimated prompt tokens of one batched LLM request.'),
+    ] = 24000,
+    readme_token_budget: Annotated[
+        int,
+        Option(help='Maximum estimated tokens of a README in a single-repository prompt.'),
+    ] = 2000,
+    condense_readme: Annotated[
+        bool,
+        Option(
+            help='Condense READMEs to their card metadata and most relevant sections (dropping '
+            'code, tables, badges and citations) instead of keeping their head and tail. '
+            'Compare both with eval-modality before relying on it.'
+        ),
+    ] = False,
+    rules: Annotated[
+        bool,
+        Option(
+            help='Resolve repositories whose card metadata (pipeline_tag, tags, task_categories, ...) '
+            'determines the modality/lifecycle without calling the LLM. Off by default: it can '
+            'change existing labels, compare with eval-modality first.'
+        ),
+    ] = False,
+    knn_threshold: Annotated[
+        float,
+        Option(
+            help='Minimum confidence at which the local k-NN classifier (see train-modality-knn) '
+            'labels a repository without fetching its README or calling the LLM.'
+        ),
+    ] = 0.8,
+    knn: Annotated[
+        bool,
+        Option(
+            help='Use the local k-NN classifier as the first classification stage after mirror '
+            'propagation. It never marks a repository invalid; those go on to the LLM.'
+        ),
+    ] = False,
+    mirror_threshold: Annotated[
+        float,
+        Option(
+            help='Minimum confidence at which the label of a linked mirror (same organization in '
+            'orgs.yaml, same or nearly the same name) is copied without classifying the repository. '
+            'The confidence of a link is the share of labelled mirror pairs whose labels agree.'
+        ),
+    ] = 0.9,
+    mirror: Annotated[
+        bool,
+        Option(
+            help='Propagate labels between mirrored repositories before any other stage; '
+            'propagations are logged to config/modality_mirror_audit.jsonl.'
+        ),
+    ] = False,
+    fetch_concurrency: Annotated[
+        int,
+        Option(help='Number of threads fetching READMEs ahead of classification.'),
+    ] = 4,
+    fetch_rate: Annotated[
+        float | None,
+        Option(help='Maximum README fetches per second (no limit by default).'),
+    ] = None,
+    llm_concurrency: Annotated[
+        int,
+        Option(help='Number of threads sending classification requests to the LLM.'),
+    ] = 1,
+    prefetch_queue_size: Annotated[
+        int,
+        Option(help='Maximum number of fetched READMEs waiting for classification.'),
+    ] = 32,
+    checkpoint_every: Annotated[
+        int,
+        Option(help='Commit classifications to the config files after this many items.'),
+    ] = 50,
+    checkpoint_interval: Annotated[
+        float,
+        Option(help='Commit classifications to the config files at least this often (seconds).'),
+    ] = 60.0,
+    metrics_path: Annotated[
+        Path | None,
+        Option(
+            help='Where to write the JSON summary of LLM calls (tokens, latency percentiles, '
+            'errors, retries, cache hits, fallbacks, README truncation). Defaults to '
+            'modality_metrics.json in the data source directory, or in the current directory.'
+        ),
+    ] = None,
+    prompt_price: Annotated[
+        float | None,
+        Option(help='Price per 1000 prompt tokens, used to estimate the cost of the run.'),
+    ] = None,
+    completion_price: Annotated[
+        float | None,
+        Option(help='Price per 1000 completion tokens, used to estimate the cost of the run.'),
+    ] = None,
+    llm_rpm: Annotated[
+        int | None,
+        Option(help='Requests per minute allowed by the LLM endpoint (no limit by default).'),
+    ] = None,
+    llm_tpm: Annotated[
+        int | None,
+        Option(
+            help='Tokens per minute allowed by the LLM endpoint (no limit by default). Requests '
+            'are paced using estimated prompt sizes; rate-limited repositories stay unclassified.'
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        Option(help='Number of processes writing labels to the raw data files of the snapshots.'),
+    ] = 4,
 ):
     """
     Generate modal and lifecycle information for all raw data in the specified directory, while updating the configuration file.
     """
-    ai_helper = ModalityAIHelper(api_key=api_key, base_url=base_url, model=model)
-    ai_helper.update_extra_info()
-    if inp_path is None:
+    inp_dirs = _expand_dirs(inp_path or [])
+    if metrics_path is None:
+        metrics_path = (inp_dirs[0] if inp_dirs else Path('.')) / 'modality_metrics.json'
+    ai_helper = ModalityAIHelper(
+        api_key=api_key,
+        base_url=base_url,
+        model=model,
+        batch_size=batch_size,
+        batch_token_budget=batch_token_budget,
+        readme_token_budget=readme_token_budget,
+        condense_readme=condense_readme,
+        use_rules=rules,
+        knn_threshold=knn_threshold if knn else None,
+        mirror_threshold=mirror_threshold if mirror else None,
+        fetch_concurrency=fetch_concurrency,
+        fetch_rate=fetch_rate,
+        llm_concurrency=llm_concurrency,
+        prefetch_queue_size=prefetch_queue_size,
+        checkpoint_every=checkpoint_every,
+        checkpoint_interval=checkpoint_interval,
+        metrics_path=metrics_path,
+        prompt_price=prompt_price,
+        completion_price=completion_price,
+        llm_rpm=llm_rpm,
+        llm_tpm=llm_tpm,
+    )
+    if not inp_dirs:
+        ai_helper.update_extra_info()
         return
-    inp_dir = Path(inp_path)
-    platform = inp_dir.name.split('_')[0]
-    logger.info(
-        f'Generate modality and lifecycle information for raw data in {inp_path} ({platform})'
+    for inp_dir in inp_dirs:
+        platform = inp_dir.name.split('_')[0]
+        logger.info(
+            f'Generate modality and lifecycle information for raw data in {inp_dir} ({platform})'
+        )
+    # The unlabelled repositories of all snapshots are classified once, then the labels are
+    # written to every raw data file in parallel
+    ai_helper.update_snapshots(inp_dirs, workers=workers)
+
+
+@process_app.command('train-modality-knn')
+def process_train_modality_knn(
+    holdout: Annotated[
+        float,
+        Option(help='Fraction of labelled entries held out to report accuracy.'),
+    ] = 0.1,
+    threshold: Annotated[
+        float,
+        Option(help='Confidence threshold at which coverage and accuracy are reported.'),
+    ] = 0.8,
+):
+    """
+    Train the local k-NN modality classifiers on config/model_info.jsonl and config/dataset_info.jsonl.
+
+    Accuracy against the existing labels is reported on a held-out split, then the classifiers are
+    trained on all labelled entries and saved to config/modality_knn_{model,dataset}.npz.
+    """
+    from oslm_analyst.processors.modality_knn import train_from_info_file
+
+    ai_helper = ModalityAIHelper(knn_threshold=None)
+    for category, info_path in (
+        ('model', ai_helper.model_info_path),
+        ('dataset', ai_helper.dataset_info_path),
+    ):
+        if not info_path.exists():
+            logger.warning(f'{info_path} does not exist.')
+            continue
+        # Logs the held-out evaluation
+        train_from_info_file(
+            info_path,
+            ai_helper.knn_artifact_path(category),  # type: ignore
+            category,  # type: ignore
+            holdout=holdout,
+            threshold=threshold,
+        )
+
+
+@process_app.command('eval-modality')
+def process_eval_modality(
+    config: Annotated[
+        list[str] | None,
+        Option(
+            help='Classifier configuration as name:key=value,... (keys: model, batch_size, '
+            'readme_token_budget, condense_readme, use_rules, knn_threshold, mirror_threshold, '
+            'llm, llm_concurrency), e.g. rules-only:llm=false or mini:model=gpt-5-mini. Repeatable.'
+        ),
+    ] = None,
+    category: Annotated[
+        str, Option(help='Category of the labelled entries to evaluate on (model or dataset).')
+    ] = 'model',
+    sample: Annotated[int, Option(help='Number of labelled entries to sample.')] = 200,
+    seed: Annotated[int, Option(help='Seed of the sample.')] = 0,
+    api_key: Annotated[
+        str | None,
+        Option(help='API key for the LLM service. If not provided, uses OPENAI_API_KEY.'),
+    ] = None,
+    base_url: Annotated[
+        str | None,
+        Option(help='Base URL for the LLM service. If not provided, uses OPENAI_API_BASE.'),
+    ] = None,
+    prompt_price: Annotated[
+        float | None,
+        Option(help='Price per 1000 prompt tokens, used to estimate the cost of each configuration.'),
+    ] = None,
+    completion_price: Annotated[
+        float | None,
+        Option(help='Price per 1000 completion tokens, used to estimate the cost of each configuration.'),
+    ] = None,
+    min_accuracy: Annotated[
+        float | None,
+        Option(help='Recommend the fastest configuration reaching this accuracy.'),
+    ] = None,
+    out_path: Annotated[
+        Path | None, Option(help='Where to write the evaluation report as JSON.')
+    ] = None,
+):
+    """
+    Compare classifier configurations on a sample of labelled config/{model,dataset}_info.jsonl entries.
+
+    Reports accuracy, a confusion matrix, LLM cost and p50/p95 latency per configuration.
+    """
+    from oslm_analyst.processors.modality_eval import (
+        format_report,
+        parse_eval_config,
+        run_evaluation,
+    )
+
+    configs = [parse_eval_config(spec) for spec in config or ['default']]
+    report = run_evaluation(
+        configs,
+        category=category,  # type: ignore
+        n_items=sample,
+        seed=seed,
+        api_key=api_key,
+        base_url=base_url,
+        prompt_price=prompt_price,
+        completion_price=completion_price,
+        min_accuracy=min_accuracy,
+        out_path=out_path,
     )
-    if (inp_dir / 'raw_dataset_data.jsonl').exists():
-        logger.info('Generate modality and lifecycle for dataset data.')
-        ai_helper.update_raw_data(inp_dir / 'raw_dataset_data.jsonl', 'dataset')
-    if (inp_dir / 'raw_model_data.jsonl').exists():
-        logger.info('Generate modality for model data.')
-        ai_helper.update_raw_data(inp_dir / 'raw_model_data.jsonl', 'model')
+    logger.info(f'Modality evaluation:\n{format_report(report["results"])}')
+    if min_accuracy is not None:
+        recommended = report['recommended'] or 'none reaches the accuracy'
+        logger.info(f'Recommended configuration: {recommended}')
+
+
+@process_app.command('revalidate')
+def process_revalidate(
+    category: Annotated[
+        str, Option(help='Category of the entries to revalidate (model, dataset or all).')
+    ] = 'all',
+    concurrency: Annotated[int, Option(help='Number of accounts listed at the same time.')] = 4,
+    max_vanished_ratio: Annotated[
+        float,
+        Option(
+            help='Skip an account when more than this fraction of its entries is missing from '
+            'its listing (usually a renamed account or a truncated listing).'
+        ),
+    ] = 0.5,
+    dry_run: Annotated[
+        bool, Option(help='Only report the vanished repositories, without updating the config.')
+    ] = False,
+):
+    """
+    Flag repositories deleted or made private as invalid in config/{model,dataset}_info.jsonl.
+
+    Every HuggingFace/ModelScope account is listed once and its tracked entries missing from the
+    listing are set to valid=false; flagged entries are logged to config/revalidation_audit.jsonl.
+    """
+    from oslm_analyst.processors.revalidate import crawler_list_names, revalidate_info_file
+
+    config_dir = Path(__file__).parents[2] / 'config'
+    list_names = crawler_list_names()
+    categories = ['model', 'dataset'] if category == 'all' else [category]
+    for cat in categories:
+        info_path = config_dir / f'{cat}_info.jsonl'
+        if not info_path.exists():
+            logger.warning(f'{info_path} does not exist.')
+            continue
+        result = revalidate_info_file(
+            info_path,
+            cat,  # type: ignore
+            list_names,
+            concurrency=concurrency,
+            max_vanished_ratio=max_vanished_ratio,
+            dry_run=dry_run,
+            audit_path=config_dir / 'revalidation_audit.jsonl',
+        )
+        logger.info(result.summary())
+        for identifier in result.vanished:
+            logger.warning(f'Vanished: {identifier}')
+        for account in result.skipped_accounts:
+            logger.info(f'Skipped account: {account}')
 
 
 @process_app.command('osir-lmts')
@@ -292,6 +604,61 @@ def process_osir_lmts(
             help='Specify the path to the JSON file containing the list of institutions to be included in the ranking.'
         ),
     ] = './config/osir_lmts_orgs.json',
+    engine: Annotated[
+        str,
+        Option(
+            help='Aggregation engine for model_data/dataset_data: python (row by row) or '
+            'columnar (pandas, much faster on large months). Both write the same files.'
+        ),
+    ] = 'python',
+    workers: Annotated[
+        int | None,
+        Option(
+            help='Number of processes parsing the raw data files, while models and datasets '
+            'are aggregated at the same time. Defaults to the number of CPUs.'
+        ),
+    ] = None,
+    force: Annotated[
+        bool,
+        Option(
+            help='Recompute every stage, even those whose inputs did not change since the '
+            'last run (see pipeline_manifest.json in the output directory).'
+        ),
+    ] = False,
+    from_month: Annotated[
+        str | None,
+        Option(
+            '--from',
+            help='First month (YYYY-MM) of a backfill: every month up to --to is processed in '
+            'order, each one passing its results to the next in memory.',
+        ),
+    ] = None,
+    to_month: Annotated[
+        str | None,
+        Option('--to', help='Last month (YYYY-MM) of a backfill, the previous month by default.'),
+    ] = None,
+    parse_cache: Annotated[
+        bool,
+        Option(
+            help='Keep the parsed raw data files in sidecar raw_*_data.cache.npz files, rebuilt '
+            'when a raw file changes, instead of parsing the JSON again on every run.'
+        ),
+    ] = True,
+    profile: Annotated[
+        bool,
+        Option(
+            help='Trace the peak memory of every stage and dump cProfile stats of the slowest '
+            'one (pipeline_profile_<stage>.prof), then print the time, rows and memory of every '
+            'stage. Stages run one at a time and more slowly while profiled.'
+        ),
+    ] = False,
+    cascade: Annotated[
+        bool,
+        Option(
+            help='After correcting the raw data of a past month, reprocess it and the following '
+            'months already processed, stopping at the first month whose outputs do not change.'
+        ),
+    ] = False,
 ):
     """
     Generate OSIR-LMTS (Open Source AI Resource - Large Model Tracking System) aggregated data.
@@ -310,6 +677,8 @@ def process_osir_lmts(
     - eval_summary.csv: Copied from the provided source path (manually curated)
     - model_rank.csv / dataset_rank.csv / infra_rank.csv / eval_rank.csv / overall_rank.csv: Rankings for current month
     - acc_model_rank.csv / acc_dataset_rank.csv / acc_overall_rank.csv: Rankings for accumulated data
+    - {universe}_overall_rank.csv / {universe}_acc_overall_rank.csv: Overall rankings of every
+      country (e.g. CN), org type (e.g. type-company) and list of config/org_universes.json
     """
     # Resolve target_month: if None, use previous month
     if target_month is None:
@@ -320,6 +689,19 @@ def process_osir_lmts(
     else:
         resolved_target_month = target_month
 
+    if from_month is not None and (target_month or infra_source_path or eval_source_path):
+        logger.error(
+            'A backfill (--from) takes no target month, and reads the infra/eval summaries '
+            'from each month\'s output directory'
+        )
+        raise typer.Exit(1)
+    if cascade and (from_month or infra_source_path or eval_source_path):
+        logger.error(
+            'A cascade (--cascade) takes no --from, and reads the infra/eval summaries from '
+            'each month\'s output directory'
+        )
+        raise typer.Exit(1)
+
     strategy = get_rank_strategy_for_month(resolved_target_month)
 
     if target_orgs_path:
@@ -333,17 +715,38 @@ def process_osir_lmts(
         target_orgs = None
 
     processor = OsirLmtsProcessor(
-        target_month=resolved_target_month,
+        target_month=from_month or resolved_target_month,
         target_orgs=target_orgs,
         output_root=Path(output_root),
         config_root=Path(config_root),
+        engine=engine,  # type: ignore
+        workers=workers or os.cpu_count() or 1,
+        parse_cache=parse_cache,
     )
 
-    processor.run(
+    if from_month is not None or cascade:
+        if cascade:
+            reports = processor.cascade(force=force, profile=profile)
+        else:
+            months = month_range(from_month, to_month or resolved_target_month)
+            reports = processor.backfill(months, force=force, profile=profile)
+        for month, report in reports.items():
+            logger.info(f'{month}: {report.summary()}')
+            if profile:
+                logger.info(f'{month} stage profile:\n{report.profile_table()}')
+        return
+
+    report = processor.run(
         strategy=strategy,
         infra_source_path=Path(infra_source_path) if infra_source_path else None,
         eval_source_path=Path(eval_source_path) if eval_source_path else None,
+        force=force,
+        profile=profile,
     )
+    logger.info(f'Ran: {", ".join(report.ran) or "-"}')
+    logger.info(f'Skipped (inputs unchanged): {", ".join(report.skipped) or "-"}')
+    if profile:
+        logger.info(f'Stage profile:\n{report.profile_table()}')
 
 
 @app.command()
@@ -519,6 +922,200 @@ def mcp_server_cmd(
     asyncio.run(mcp_server.main(db_path))
 
 
+@bench_app.command('fake-llm')
+def bench_fake_llm(
+    host: Annotated[str, Option(help='Host to listen on.')] = '127.0.0.1',
+    port: Annotated[int, Option(help='Port to listen on.')] = 8000,
+    latency: Annotated[float, Option(help='Seconds of latency added to every request.')] = 0.2,
+    latency_per_1k_tokens: Annotated[
+        float, Option(help='Additional seconds of latency per 1000 prompt tokens.')
+    ] = 0.0,
+    rpm: Annotated[
+        int | None, Option(help='Requests per minute before answering with 429.')
+    ] = None,
+    error_rate: Annotated[
+        float, Option(help='Fraction of requests failing with a 500 error.')
+    ] = 0.0,
+):
+    """
+    Serve an OpenAI-compatible endpoint giving deterministic classification answers.
+
+    Point gen-modality at it with `--base-url http://HOST:PORT/v1 --api-key fake`.
+    """
+    # Bench modules are only imported by their commands, so other commands do not load them
+    from oslm_analyst.bench.fake_llm import FakeLLMServer
+
+    server = FakeLLMServer(host, port, latency, latency_per_1k_tokens, rpm, error_rate)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+@bench_app.command('gen-modality')
+def bench_gen_modality(
+    items: Annotated[int, Option(help='Number of synthetic repositories to classify.')] = 200,
+    category: Annotated[
+        str, Option(help='Category of the synthetic repositories (model or dataset).')
+    ] = 'model',
+    llm_concurrency: Annotated[
+        str, Option(help='Comma separated LLM concurrency levels to compare.')
+    ] = '1,4,8',
+    batch_size: Annotated[str, Option(help='Comma separated batch sizes to compare.')] = '1,4',
+    cache: Annotated[
+        str,
+        Option(help='Comma separated cache settings to compare (on, off); with a cache the '
+        'run is repeated to time cache hits.'),
+    ] = 'off',
+    latency: Annotated[float, Option(help='Seconds of fake LLM latency per request.')] = 0.2,
+    latency_per_1k_tokens: Annotated[
+        float, Option(help='Additional fake LLM latency per 1000 prompt tokens.')
+    ] = 0.0,
+    rpm: Annotated[int | None, Option(help='Rate limit of the fake LLM.')] = None,
+    error_rate: Annotated[float, Option(help='Fraction of fake LLM requests failing.')] = 0.0,
+    readme_latency: Annotated[float, Option(help='Seconds to fetch one fake README.')] = 0.0,
+    fetch_concurrency: Annotated[int, Option(help='Number of README fetch threads.')] = 4,
+    rules: Annotated[
+        bool, Option(help='Let the card metadata rules resolve repositories before the LLM.')
+    ] = False,
+    out_path: Annotated[
+        Path | None, Option(help='Where to write the results as JSON.')
+    ] = None,
+):
+    """
+    Measure gen-modality classification throughput against a local fake LLM at several settings.
+    """
+    from oslm_analyst.bench.modality_throughput import run_benchmark
+
+    results = run_benchmark(
+        llm_concurrency=[int(c) for c in parse_commas_separated_params(llm_concurrency)],
+        batch_size=[int(b) for b in parse_commas_separated_params(batch_size)],
+        cache=[c == 'on' for c in parse_commas_separated_params(cache)],
+        n_items=items,
+        category=category,  # type: ignore
+        latency=latency,
+        latency_per_1k_tokens=latency_per_1k_tokens,
+        rpm=rpm,
+        error_rate=error_rate,
+        readme_latency=readme_latency,
+        fetch_concurrency=fetch_concurrency,
+        use_rules=rules,
+        out_path=out_path,
+    )
+    for r in results:
+        warm = f', warm {r["warm_seconds"]:.2f}s' if 'warm_seconds' in r else ''
+        logger.info(
+            f'llm_concurrency={r["llm_concurrency"]:<3} batch_size={r["batch_size"]:<3} '
+            f'cache={"on " if r["cache"] else "off"} {r["seconds"]:7.2f}s '
+            f'{r["items_per_second"]:8.1f} items/s, {r["llm_requests"]} requests{warm}'
+        )
+
+
+@bench_app.command('gen-osir-lmts')
+def bench_gen_osir_lmts(
+    root: Annotated[Path, Argument(help='Directory to write config/ and output/ to.')],
+    orgs: Annotated[int, Option(help='Number of organizations.')] = 50,
+    identifiers: Annotated[
+        int, Option(help='Number of models; a quarter as many datasets.')
+    ] = 10_000,
+    months: Annotated[int, Option(help='Number of months of snapshots.')] = 2,
+    snapshots_per_month: Annotated[int, Option(help='Snapshots of every platform per month.')] = 2,
+    skew: Annotated[
+        float, Option(help='Zipf exponent of repositories per account and of popularity.')
+    ] = 1.1,
+    first_month: Annotated[str, Option(help='First month, YYYY-MM.')] = '2026-01',
+    seed: Annotated[int, Option(help='Random seed.')] = 0,
+):
+    """
+    Write a synthetic OSIR-LMTS input tree: snapshot directories and the matching config files.
+
+    Process it with `--output-root ROOT/output --config-root ROOT/config`.
+    """
+    from oslm_analyst.bench.osir_lmts_synthetic import SyntheticSetting, generate_tree
+
+    setting = SyntheticSetting(
+        orgs=orgs,
+        identifiers=identifiers,
+        months=months,
+        snapshots_per_month=snapshots_per_month,
+        skew=skew,
+        first_month=first_month,
+        seed=seed,
+    )
+    generate_tree(root, setting)
+
+
+@bench_app.command('osir-lmts')
+def bench_osir_lmts(
+    sizes: Annotated[
+        str, Option(help='Comma separated numbers of models to run the processor at.')
+    ] = '1000,10000',
+    orgs: Annotated[int, Option(help='Number of organizations.')] = 50,
+    months: Annotated[
+        int, Option(help='Number of months; the stages of the last one are recorded.')
+    ] = 2,
+    snapshots_per_month: Annotated[int, Option(help='Snapshots of every platform per month.')] = 2,
+    skew: Annotated[
+        float, Option(help='Zipf exponent of repositories per account and of popularity.')
+    ] = 1.1,
+    seed: Annotated[int, Option(help='Random seed.')] = 0,
+    engine: Annotated[
+        str, Option(help='Aggregation engine of the processor (python or columnar).')
+    ] = 'python',
+    workers: Annotated[int, Option(help='Processes reading the snapshot files.')] = 1,
+    baseline: Annotated[
+        Path | None, Option(help='Results of an earlier run (--out-path) to compare with.')
+    ] = None,
+    threshold: Annotated[
+        float, Option(help='Relative growth of a stage\'s time or memory that fails the run.')
+    ] = 0.5,
+    out_path: Annotated[
+        Path | None, Option(help='Where to write the results as JSON.')
+    ] = None,
+):
+    """
+    Run the OSIR-LMTS processor on synthetic trees of increasing size, timing every stage.
+
+    With --baseline, exit with 1 if a stage got slower or bigger than --threshold allows.
+    """
+    from oslm_analyst.bench.osir_lmts_scaling import run_scaling
+    from oslm_analyst.bench.osir_lmts_synthetic import SyntheticSetting
+
+    if engine not in ('python', 'columnar'):
+        logger.error(f'Unknown engine {engine}, expected python or columnar')
+        raise typer.Exit(1)
+    setting = SyntheticSetting(
+        orgs=orgs, months=months, snapshots_per_month=snapshots_per_month, skew=skew, seed=seed
+    )
+    results, regressions = run_scaling(
+        [int(s) for s in parse_commas_separated_params(sizes)],
+        setting,
+        engine=engine,  # type: ignore
+        workers=workers,
+        baseline_path=baseline,
+        threshold=threshold,
+        out_path=out_path,
+    )
+    for r in results:
+        lines = [
+            f'  {name:<24} {stage["wall_seconds"]:8.2f}s '
+            f'{(stage["peak_memory"] or 0) / 2**20:8.1f} MiB {stage["rows"] or 0:>10} rows'
+            for name, stage in r['stages'].items()
+        ]
+        logger.info(
+            f'{r["identifiers"]} identifiers: {r["wall_seconds"]:.2f}s, '
+            f'peak {r["peak_memory"] / 2**20:.1f} MiB\n' + '\n'.join(lines)
+        )
+    if regressions:
+        for regression in regressions:
+            logger.error(f'Regression: {regression}')
+        raise typer.Exit(1)
+
+
 def main() -> None:
     print('Hello from oslm-analyst!')
     app()
@@ -159,13 +159,13 @@ class HfCrawler:
             raise
 
     def _fetch_from_repo(
-        self, repo, category: Literal['model', 'dataset']
+        self, repo, category: Literal['model', 'dataset'], full: bool = True
     ) -> Iterator[tuple[ModelInfo | DatasetInfo | None, str | None]]:
         match category:
             case 'model':
-                infos = self.api.list_models(author=repo, full=True)
+                infos = self.api.list_models(author=repo, full=full)
             case 'dataset':
-                infos = self.api.list_datasets(author=repo, full=True)
+                infos = self.api.list_datasets(author=repo, full=full)
 
         while True:
             try:
@@ -183,6 +183,18 @@ class HfCrawler:
                 yield None, error
                 break
 
+    def list_names(self, repo, category: Literal['model', 'dataset']) -> set[str]:
+        """Names of all public repositories of an account, from one paginated listing.
+
+        Raises if the listing could not be completed.
+        """
+        names = set()
+        for info, error in self._fetch_from_repo(repo, category, full=False):
+            if info is None:
+                raise RuntimeError(f'Incomplete listing of {repo} ({category}): {error}')
+            names.add(info.id.split('/')[-1])
+        return names
+
     def _fetch_discussions_count(
         self, identifier, category: Literal['model', 'dataset']
     ) -> tuple[int, int]:
@@ -145,6 +145,19 @@ class MsCrawler:
                 error = traceback.format_exc()
                 yield None, error
 
+    def list_names(self, repo, category: Literal['model', 'dataset']) -> set[str]:
+        """Names of all public repositories of an account, from one paginated listing.
+
+        Raises if the listing could not be completed.
+        """
+        names = set()
+        for info, error in self._fetch_from_repo(repo, category):
+            if info is None:
+                raise RuntimeError(f'Incomplete listing of {repo} ({category}): {error}')
+            assert isinstance(info.name, str)
+            names.add(info.name)
+        return names
+
     def _fetch_from_identifier(
         self, identifier, category: Literal['model', 'dataset']
     ) -> ModelInfo | DatasetInfo:
@@ -0,0 +1,155 @@
+"""Request pacing for an OpenAI-compatible endpoint with requests/tokens-per-minute limits."""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import TypeVar
+
+import openai
+from loguru import logger
+from tenacity import (
+    RetryError,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
+
+T = TypeVar('T')
+
+WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token estimate (about 4 characters per token), used for the TPM budget."""
+    return len(text) // 4 + 1
+
+
+class RateLimitExhausted(Exception):
+    """Raised when a request is still rate limited (or failing transiently) after all retries."""
+
+
+def is_rate_limit_error(exception: BaseException) -> bool:
+    if isinstance(exception, openai.RateLimitError):
+        return True
+    return getattr(exception, 'status_code', None) == 429
+
+
+def is_retryable_error(exception: BaseException) -> bool:
+    """Rate limits plus the transient errors the OpenAI client would otherwise retry itself."""
+    return is_rate_limit_error(exception) or isinstance(
+        exception, (openai.APIConnectionError, openai.InternalServerError)
+    )
+
+
+def _retry_after(exception: BaseException | None) -> float | None:
+    response = getattr(exception, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMRequestScheduler:
+    """Thread-safe pacing of LLM requests within RPM/TPM budgets over a sliding minute.
+
+    `submit` blocks until the request and its estimated token count fit into both budgets, then
+    runs it. Rate-limit and transient errors are retried with exponential backoff; a rate limit
+    also pauses every caller for the endpoint's `Retry-After`, if it sends one. If a request
+    still fails after `max_attempts`, `RateLimitExhausted` is raised so the caller can leave the
+    item for a later run instead of recording a bogus result.
+    """
+
+    def __init__(
+        self,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        max_attempts: int = 6,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._cond = threading.Condition()
+        # (submission time, estimated tokens) of the requests in the current window
+        self._window: deque[tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._paused_until = 0.0
+        self.retrier = Retrying(
+            reraise=False,
+            retry=retry_if_exception(is_retryable_error),
+            # Jitter keeps concurrent workers from retrying in lockstep
+            wait=wait_exponential(multiplier=backoff_initial, max=backoff_max)
+            + wait_random(0, backoff_initial),
+            stop=stop_after_attempt(max_attempts),
+        )
+
+    def _expire(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _delay(self, now: float, tokens: int) -> float:
+        """Seconds until a request of `tokens` tokens fits, 0 if it can be sent now."""
+        delay = self._paused_until - now
+        if self.rpm is not None and len(self._window) >= self.rpm:
+            delay = max(delay, self._window[len(self._window) - self.rpm][0] + WINDOW_SECONDS - now)
+        if self.tpm is not None and self._window:
+            # A request larger than the whole budget is sent alone once the window is empty
+            excess = self._window_tokens + min(tokens, self.tpm) - self.tpm
+            for sent_at, sent_tokens in self._window:
+                if excess <= 0:
+                    break
+                excess -= sent_tokens
+                delay = max(delay, sent_at + WINDOW_SECONDS - now)
+        return max(delay, 0.0)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of `tokens` estimated tokens fits into the budgets."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                delay = self._delay(now, tokens)
+                if delay <= 0:
+                    self._window.append((now, tokens))
+                    self._window_tokens += tokens
+                    return
+                self._cond.wait(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for `seconds`, e.g. after the endpoint reported a rate limit."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def _before_retry(self, retry_state, on_retry: Callable[[], None] | None) -> None:
+        exception = retry_state.outcome.exception()
+        if is_rate_limit_error(exception):
+            retry_after = _retry_after(exception)
+            if retry_after is not None:
+                self.pause(retry_after)
+        logger.warning(
+            f'LLM request failed (attempt {retry_state.attempt_number}), retrying: {exception!r}'
+        )
+        if on_retry is not None:
+            on_retry()
+
+    def submit(
+        self, fn: Callable[[], T], tokens: int, on_retry: Callable[[], None] | None = None
+    ) -> T:
+        """Run `fn`, a request of about `tokens` tokens, within the budgets."""
+
+        def attempt() -> T:
+            self.acquire(tokens)
+            return fn()
+
+        retrier = self.retrier.copy(before_sleep=lambda state: self._before_retry(state, on_retry))
+        try:
+            return retrier(attempt)
+        except RetryError as e:
+            raise RateLimitExhausted(repr(e.last_attempt.exception())) from e
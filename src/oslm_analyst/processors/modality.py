@@ -1,6 +1,14 @@
+import multiprocessing
+import queue
+import threading
+import time
 import traceback
 import tempfile
 import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal, TypedDict
 
@@ -15,6 +23,21 @@ from oslm_analyst.crawlers.crawl_utils import format_identifier_from_dict
 from oslm_analyst.crawlers.huggingface import HfCrawler
 from oslm_analyst.crawlers.modelscope import MsCrawler
 from oslm_analyst.data_utils import DatasetExtraInfo, Lifecycle, Modality, ModelExtraInfo
+from oslm_analyst.processors.llm_scheduler import (
+    LLMRequestScheduler,
+    RateLimitExhausted,
+    estimate_tokens,
+)
+from oslm_analyst.processors.modality_knn import (
+    INVALID_LABEL,
+    KnnModalityClassifier,
+    classification_from_label,
+)
+from oslm_analyst.processors.modality_mirror import load_account_orgs, propagate_mirror_labels
+from oslm_analyst.processors.modality_metrics import LLMCallMetrics, write_metrics_summary
+from oslm_analyst.processors.modality_rules import MetadataRuleClassifier
+from oslm_analyst.processors.readme_condenser import ReadmeCondenser
+from oslm_analyst.utils import RateLimiter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -33,10 +56,267 @@ class DatasetClassification(TypedDict):
     reason: str
 
 
+def write_jsonl_atomic(path: Path, rows: Iterable[dict]) -> None:
+    """Durably replace `path` with `rows`: write a temp file, fsync it, then rename it."""
+    with tempfile.NamedTemporaryFile(
+        'w',
+        dir=path.parent,
+        prefix=f'.{path.name}.',
+        suffix='.tmp',
+        delete=False,
+        encoding='utf-8',
+    ) as tf:
+        try:
+            with jsonlines.Writer(tf) as writer:
+                writer.write_all(rows)
+            tf.flush()
+            os.fsync(tf.fileno())
+        except BaseException:
+            tf.close()
+            Path(tf.name).unlink(missing_ok=True)
+            raise
+    Path(tf.name).replace(path)
+    # Persist the rename itself
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def cleanup_temp_files(path: Path) -> None:
+    """Remove temp files of `write_jsonl_atomic` left next to `path` by an interrupted run."""
+    # Only the exact pattern written above: other files in config/ or a snapshot are the user's
+    for leftover in path.parent.glob(f'.{path.name}.*.tmp'):
+        logger.warning(f'Removing leftover temp file {leftover}')
+        leftover.unlink(missing_ok=True)
+
+
+def _labels_from_dict(line: dict, category: Literal['model', 'dataset']) -> tuple:
+    """(valid, modality[, lifecycle]) of an extra-info entry, normalized like from_dict."""
+    valid = line['valid'] if 'valid' in line else None
+    if category == 'model':
+        return valid, line.get('modality') or None
+    return valid, line.get('modality') or None, line.get('lifecycle') or None
+
+
+def _is_labelled(line: dict, category: Literal['model', 'dataset']) -> bool:
+    if category == 'model':
+        return line['modality'] is not None
+    return bool(line['modality'] and line['lifecycle'])
+
+
+def _new_info_entry(line: dict, category: Literal['model', 'dataset']) -> dict:
+    info_cls = ModelExtraInfo if category == 'model' else DatasetExtraInfo
+    return info_cls.from_dict(line).to_dict()
+
+
+def _update_raw_file(
+    data_path: Path, category: Literal['model', 'dataset'], index: dict[str, tuple]
+) -> list[dict]:
+    """Copy labels from `index` into a raw data file; returns entries for unknown identifiers.
+
+    Module level, so that raw files can be updated in worker processes.
+    """
+    new_entries: list[dict] = []
+
+    def updated_lines() -> Iterator[dict]:
+        with jsonlines.open(data_path, 'r') as reader:
+            for line in reader:
+                if not _is_labelled(line, category):
+                    identifier = format_identifier_from_dict(line)
+                    labels = index.get(identifier)
+                    if labels is not None:
+                        line['valid'], line['modality'] = labels[0], labels[1]
+                        if category == 'dataset':
+                            line['lifecycle'] = labels[2]
+                    else:
+                        entry = _new_info_entry(line, category)
+                        index[identifier] = _labels_from_dict(entry, category)
+                        new_entries.append(entry)
+                yield line
+
+    cleanup_temp_files(data_path)
+    write_jsonl_atomic(data_path, updated_lines())
+    logger.info(f'Updated {category} labels in {data_path}')
+    return new_entries
+
+
+class _Checkpointer:
+    """Applies classifications to the lines of an info file and commits them periodically."""
+
+    def __init__(self, path: Path, lines: list[dict], every: int, interval: float):
+        self.path = path
+        self.lines = lines
+        self.every = every
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def apply(self, update: Callable[[], None]) -> None:
+        with self._lock:
+            update()
+            self._uncommitted += 1
+            if (
+                self._uncommitted >= self.every
+                or time.monotonic() - self._last_commit >= self.interval
+            ):
+                self._commit()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._uncommitted:
+            write_jsonl_atomic(self.path, self.lines)
+            logger.debug(f'Checkpointed {self._uncommitted} classifications to {self.path}')
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+
+@dataclass
+class ClassificationStats:
+    """Counters describing how the pending repositories of one info file were resolved."""
+
+    category: str
+    pending: int = 0
+    # Number of repositories resolved by each stage, e.g. 'rules' or 'llm'
+    resolved_by: Counter = field(default_factory=Counter)
+    # Number of requests actually sent to the LLM
+    llm_requests: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, stage: str, n: int = 1) -> None:
+        with self._lock:
+            self.resolved_by[stage] += n
+
+    def add_llm_request(self) -> None:
+        with self._lock:
+            self.llm_requests += 1
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        # Repositories without README never reached the LLM, so they are not counted
+        return sum(
+            n
+            for stage, n in self.resolved_by.items()
+            if stage not in ('llm', 'no_readme', 'deferred')
+        )
+
+    def summary(self) -> str:
+        stages = ', '.join(f'{stage}={n}' for stage, n in sorted(self.resolved_by.items()))
+        return (
+            f'{self.category}: pending={self.pending}, {stages or "nothing resolved"}, '
+            f'llm_requests={self.llm_requests}, llm_calls_avoided={self.llm_calls_avoided}'
+        )
+
+
+BATCH_INSTRUCTION = (
+    '\n\nYou will receive several repositories at once, each introduced by a '
+    '"### Repository N" header. Respond with a JSON array containing exactly one object '
+    'per repository, in the same order, and add an "identifier" field holding the '
+    "repository's identifier to each object."
+)
+
+
 class ModalityAIHelper:
-    def __init__(self, api_key=None, base_url=None, model=None):
+    def __init__(
+        self,
+        api_key=None,
+        base_url=None,
+        model=None,
+        batch_size: int = 1,
+        batch_token_budget: int = 24000,
+        batch_readme_tokens: int = 1000,
+        readme_token_budget: int = 2000,
+        condense_readme: bool = False,
+        use_rules: bool = False,
+        knn_threshold: float | None = None,
+        fetch_concurrency: int = 4,
+        fetch_rate: float | None = None,
+        llm_concurrency: int = 1,
+        prefetch_queue_size: int = 32,
+        checkpoint_every: int = 50,
+        checkpoint_interval: float = 60.0,
+        metrics_path: Path | None = None,
+        prompt_price: float | None = None,
+        completion_price: float | None = None,
+        llm_rpm: int | None = None,
+        llm_tpm: int | None = None,
+        completion_tokens_per_item: int = 150,
+        mirror_threshold: float | None = None,
+        mirror_audit_path: Path | None = None,
+    ):
         self.hf_crawler = HfCrawler()
         self.ms_crawler = MsCrawler()
+        # batch_size > 1 packs several repositories into one LLM request; each request is
+        # additionally capped by batch_token_budget (estimated prompt tokens), and every
+        # README in a batch is cut to batch_readme_tokens.
+        self.batch_size = max(1, batch_size)
+        self.batch_token_budget = batch_token_budget
+        self.batch_readme_tokens = batch_readme_tokens
+        # READMEs are condensed to their card metadata and most relevant sections within
+        # readme_token_budget; without condense_readme they are cut to their head and tail.
+        self.readme_token_budget = readme_token_budget
+        self.condenser = ReadmeCondenser() if condense_readme else None
+        # README fetching and classification run as a pipeline: fetch_concurrency threads
+        # (at most fetch_rate READMEs per second) feed llm_concurrency classification threads
+        # through a queue of prefetch_queue_size READMEs, which bounds memory.
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.fetch_limiter = RateLimiter(fetch_rate) if fetch_rate else None
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.prefetch_queue_size = max(1, prefetch_queue_size)
+        # Classifications are committed to the info file every checkpoint_every items or
+        # checkpoint_interval seconds, so an interrupted run loses little work
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.checkpoint_interval = checkpoint_interval
+        # Card metadata rules resolve obvious repositories before they reach the LLM
+        self.rule_classifier = MetadataRuleClassifier() if use_rules else None
+        # Identifier k-NN (see `process train-modality-knn`), off unless knn_threshold is set,
+        # runs first, before any README is fetched; predictions below knn_threshold confidence
+        # are escalated, and so are invalid ones, which a name alone cannot establish.
+        self.knn_threshold = knn_threshold
+        self.knn_classifiers: dict[str, KnnModalityClassifier] = {}
+        if knn_threshold is not None:
+            for category in ('model', 'dataset'):
+                knn_path = self.knn_artifact_path(category)  # type: ignore
+                if knn_path.exists():
+                    self.knn_classifiers[category] = KnnModalityClassifier.load(knn_path)
+                else:
+                    logger.info(f'No k-NN {category} classifier found at {knn_path}, skipping it.')
+        # Labels of linked mirrors (same organization in orgs.yaml, same normalized or nearly
+        # the same name) are propagated at or above mirror_threshold confidence before any
+        # other stage, if it is set; the confidence is the measured agreement of labelled
+        # mirrors, and every propagation is appended to mirror_audit_path.
+        self.mirror_threshold = mirror_threshold
+        self.mirror_audit_path = mirror_audit_path or (
+            Path(__file__).parents[3] / 'config/modality_mirror_audit.jsonl'
+        )
+        self.account_orgs = (
+            load_account_orgs(Path(__file__).parents[3] / 'config/orgs.yaml')
+            if mirror_threshold is not None
+            else {}
+        )
+        self.stats: dict[str, ClassificationStats] = {
+            'model': ClassificationStats('model'),
+            'dataset': ClassificationStats('dataset'),
+        }
+        # Every LLM call is instrumented; update_extra_info writes a summary to metrics_path.
+        # Prices (per 1000 prompt/completion tokens) are only used to estimate the run's cost.
+        self.metrics: dict[str, LLMCallMetrics] = {
+            'model': LLMCallMetrics('model'),
+            'dataset': LLMCallMetrics('dataset'),
+        }
+        self.metrics_path = metrics_path
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        # Every LLM request goes through the scheduler, which paces it within the endpoint's
+        # requests/tokens per minute and retries rate limits; the token count of a request is
+        # its estimated prompt plus completion_tokens_per_item for every repository in it.
+        self.scheduler = LLMRequestScheduler(rpm=llm_rpm, tpm=llm_tpm)
+        self.completion_tokens_per_item = completion_tokens_per_item
         self.model_info_path = Path(__file__).parents[3] / 'config/model_info.jsonl'
         self.dataset_info_path = Path(__file__).parents[3] / 'config/dataset_info.jsonl'
 
@@ -44,6 +324,7 @@ class ModalityAIHelper:
         api_key = api_key or os.getenv('OPENAI_API_KEY', None)
         base_url = base_url or os.getenv('OPENAI_API_BASE', None)
         model = model or os.getenv('OPENAI_MODEL_NAME', 'gpt-5')
+        self.model_name = model
 
         if not api_key:
             logger.warning(
@@ -51,16 +332,29 @@ class ModalityAIHelper:
             )
             self.llm = None
         else:
-            self.llm = ChatOpenAI(model=model, api_key=api_key, base_url=base_url, temperature=0)  # type: ignore
+            # Retries are left to the scheduler, so that they respect the rate limits
+            self.llm = ChatOpenAI(
+                model=model,
+                api_key=api_key,  # type: ignore
+                base_url=base_url,
+                temperature=0,
+                max_retries=0,
+            )
 
         # Build chains
         self._build_chains()
 
+    def knn_artifact_path(self, category: Literal['model', 'dataset']) -> Path:
+        return Path(__file__).parents[3] / f'config/modality_knn_{category}.npz'
+
     def _build_chains(self):
         """Build LangChain chains for classification."""
         if self.llm is None:
+            self.prompt_overhead = {'model': 0, 'dataset': 0}
             self.model_chain = None
             self.dataset_chain = None
+            self.model_batch_chain = None
+            self.dataset_batch_chain = None
             return
 
         # Model classification prompt (validity + modality)
@@ -122,189 +416,491 @@ class ModalityAIHelper:
             ]
         )
 
+        # Batched prompts: several repositories per request, answered with a JSON array
+        model_batch_prompt = ChatPromptTemplate.from_messages(
+            [
+                ('system', model_prompt.messages[0].prompt.template + BATCH_INSTRUCTION),  # type: ignore
+                (
+                    'human',
+                    'Repositories:\n\n{repositories}\n\n'
+                    'Evaluate each of these {count} model repositories.',
+                ),
+            ]
+        )
+        dataset_batch_prompt = ChatPromptTemplate.from_messages(
+            [
+                ('system', dataset_prompt.messages[0].prompt.template + BATCH_INSTRUCTION),  # type: ignore
+                (
+                    'human',
+                    'Repositories:\n\n{repositories}\n\n'
+                    'Evaluate each of these {count} dataset repositories.',
+                ),
+            ]
+        )
+
+        # Fixed part of the prompts (including the batch instruction), for token estimates
+        self.prompt_overhead = {
+            category: estimate_tokens(
+                ''.join(m.prompt.template for m in prompt.messages)  # type: ignore
+            )
+            for category, prompt in (('model', model_batch_prompt), ('dataset', dataset_batch_prompt))
+        }
+
         model_parser = JsonOutputParser()
         dataset_parser = JsonOutputParser()
 
         self.model_chain = model_prompt | self.llm | model_parser
         self.dataset_chain = dataset_prompt | self.llm | dataset_parser
+        self.model_batch_chain = model_batch_prompt | self.llm | JsonOutputParser()
+        self.dataset_batch_chain = dataset_batch_prompt | self.llm | JsonOutputParser()
 
     def _truncate_readme(self, readme: str, max_chars: int = 8000) -> str:
-        """Truncate README content to avoid token limit issues."""
+        """Keep the head and tail of a README; the baseline for the condenser."""
         if len(readme) <= max_chars:
             return readme
         # Keep first half and last half to maintain context
         half = max_chars // 2
         return readme[:half] + '\n\n[... truncated ...]\n\n' + readme[-half:]
 
-    def update_extra_info(self):
-        if self.model_info_path.exists():
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=self.model_info_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf:
-                with (
-                    jsonlines.open(self.model_info_path, 'r') as reader,
-                    jsonlines.Writer(tf) as writer,
-                ):
-                    for line in reader:
-                        identifier = format_identifier_from_dict(line)
-                        # Skip if:
-                        # 1. valid is False (already marked invalid), OR
-                        # 2. valid is True AND modality is not None (already classified)
-                        valid_val = line.get('valid')
-                        has_modality = line.get('modality') is not None
-                        if valid_val is False or (valid_val is True and has_modality):
-                            logger.trace(f'Skipping model {identifier} - already classified or invalid')
-                            writer.write(line)
-                            continue
-                        # Need to classify
-                        readme = ''
-                        if 'huggingface' in line['link']:
-                            readme = self.hf_crawler.fetch_readme_content(identifier, 'model')
-                        elif 'modelscope' in line['link']:
-                            readme = self.ms_crawler.fetch_readme_content(identifier, 'model')
-                        classification = self.classify_model(identifier, line['link'], readme)
-                        line['valid'] = classification['valid']
-                        line['modality'] = classification['modality']
-                        logger.info(
-                            f'Model {identifier}: valid={line["valid"]}, modality={line["modality"]} ({classification.get("reason", "")})'
-                        )
-                        writer.write(line)
-                Path(tf.name).replace(self.model_info_path)
-        if self.dataset_info_path.exists():
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=self.dataset_info_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf:
-                with (
-                    jsonlines.open(self.dataset_info_path, 'r') as reader,
-                    jsonlines.Writer(tf) as writer,
-                ):
-                    for line in reader:
-                        identifier = format_identifier_from_dict(line)
-                        # Skip if:
-                        # 1. valid is False (already marked invalid), OR
-                        # 2. valid is True AND modality is not None AND lifecycle is not None (already classified)
-                        valid_val = line.get('valid')
-                        has_modality = line.get('modality') is not None
-                        has_lifecycle = line.get('lifecycle') is not None
-                        if valid_val is False or (valid_val is True and has_modality and has_lifecycle):
-                            logger.trace(f'Skipping dataset {identifier} - already classified or invalid')
-                            writer.write(line)
-                            continue
-                        # Need to classify
-                        readme = ''
-                        if 'huggingface' in line['link']:
-                            readme = self.hf_crawler.fetch_readme_content(identifier, 'dataset')
-                        elif 'modelscope' in line['link']:
-                            readme = self.ms_crawler.fetch_readme_content(identifier, 'dataset')
-                        classification = self.classify_dataset(identifier, line['link'], readme)
-                        line['valid'] = classification['valid']
-                        line['modality'] = classification['modality']
-                        line['lifecycle'] = classification['lifecycle']
-                        logger.info(
-                            f'Dataset {identifier}: valid={line["valid"]}, modality={line["modality"]}, lifecycle={line["lifecycle"]} ({classification.get("reason", "")})'
-                        )
-                        writer.write(line)
-                Path(tf.name).replace(self.dataset_info_path)
+    def _prepare_readme(
+        self, category: Literal['model', 'dataset'], readme: str, max_tokens: int | None = None
+    ) -> str:
+        """Fit a README into a prompt, recording how much of it was dropped."""
+        max_tokens = max_tokens or self.readme_token_budget
+        if self.condenser is not None:
+            prepared = self.condenser.condense(readme, max_tokens)
+        else:
+            prepared = self._truncate_readme(readme, max_tokens * 4)
+        # Inserted markers are not content, so do not count them as kept
+        self.metrics[category].record_truncation(len(readme), min(len(prepared), len(readme)))
+        return prepared
 
-    def update_raw_data(self, data_path: Path, category: str):
+    def _invoke(self, category: Literal['model', 'dataset'], chain, inputs: dict, n_items: int = 1):
+        """Invoke a chain through the scheduler, with the metrics callbacks attached."""
+        tokens = (
+            self.prompt_overhead[category]
+            + estimate_tokens(''.join(str(v) for v in inputs.values()))
+            + self.completion_tokens_per_item * n_items
+        )
+        return self.scheduler.submit(
+            lambda: chain.invoke(inputs, config={'callbacks': [self.metrics[category]]}),
+            tokens,
+            on_retry=self.metrics[category].record_retry,
+        )
+
+    @staticmethod
+    def _needs_classification(line: dict, category: Literal['model', 'dataset']) -> bool:
+        # Skip if:
+        # 1. valid is False (already marked invalid), OR
+        # 2. valid is True AND modality (and lifecycle for datasets) is not None
+        valid_val = line.get('valid')
+        if valid_val is False:
+            return False
+        classified = line.get('modality') is not None
+        if category == 'dataset':
+            classified = classified and line.get('lifecycle') is not None
+        return not (valid_val is True and classified)
+
+    def _fetch_readme(self, identifier: str, link: str, category: Literal['model', 'dataset']) -> str:
+        if 'huggingface' in link:
+            return self.hf_crawler.fetch_readme_content(identifier, category)
+        elif 'modelscope' in link:
+            return self.ms_crawler.fetch_readme_content(identifier, category)
+        return ''
+
+    @staticmethod
+    def _apply_classification(
+        line: dict,
+        classification: ModelClassification | DatasetClassification,
+        category: Literal['model', 'dataset'],
+    ) -> None:
+        identifier = format_identifier_from_dict(line)
+        line['valid'] = classification['valid']
+        line['modality'] = classification['modality']
         if category == 'model':
-            model_info: dict[str, ModelExtraInfo] = {}
-            if self.model_info_path.exists():
-                with jsonlines.open(self.model_info_path, 'r') as reader:
-                    for line in reader:
-                        model_info[format_identifier_from_dict(line)] = ModelExtraInfo.from_dict(
-                            line
-                        )
-            data = []
-            with jsonlines.open(data_path, 'r') as reader:
-                for line in reader:
-                    identifier = format_identifier_from_dict(line)
-                    if line['modality'] is None:
-                        if identifier in model_info:
-                            line['valid'] = model_info[identifier].valid
-                            line['modality'] = model_info[identifier].modality
+            logger.info(
+                f'Model {identifier}: valid={line["valid"]}, modality={line["modality"]} ({classification.get("reason", "")})'
+            )
+        else:
+            line['lifecycle'] = classification['lifecycle']  # type: ignore
+            logger.info(
+                f'Dataset {identifier}: valid={line["valid"]}, modality={line["modality"]}, lifecycle={line["lifecycle"]} ({classification.get("reason", "")})'
+            )
+
+    def _pack_batches(
+        self, items: list[tuple[str, str, str]]
+    ) -> Iterator[list[tuple[str, str, str]]]:
+        """Split items into batches of at most batch_size items within the token budget."""
+        batch: list[tuple[str, str, str]] = []
+        batch_tokens = 0
+        for item in items:
+            tokens = estimate_tokens(item[0] + item[1]) + min(
+                estimate_tokens(item[2]), self.batch_readme_tokens
+            )
+            if batch and (
+                len(batch) >= self.batch_size or batch_tokens + tokens > self.batch_token_budget
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _knn_classify(
+        self, category: Literal['model', 'dataset'], identifier: str
+    ) -> ModelClassification | DatasetClassification | None:
+        """Resolve a repository from its identifier alone if the k-NN is confident."""
+        clf = self.knn_classifiers.get(category)
+        if clf is None or self.knn_threshold is None:
+            return None
+        prediction = clf.predict(identifier)
+        if prediction is None or prediction.confidence < self.knn_threshold:
+            return None
+        if prediction.label == INVALID_LABEL:
+            return None
+        self.stats[category].add('knn')
+        return classification_from_label(  # type: ignore
+            prediction.label, category, f'k-NN (confidence={prediction.confidence:.2f})'
+        )
+
+    def _pre_classify(
+        self, category: Literal['model', 'dataset'], item: tuple[str, str, str]
+    ) -> ModelClassification | DatasetClassification | None:
+        """Resolve a repository without the LLM if possible."""
+        identifier, link, readme = item
+        if readme == '':
+            self.stats[category].add('no_readme')
+            if category == 'model':
+                return self.classify_model(identifier, link, readme)
+            return self.classify_dataset(identifier, link, readme)
+        if self.rule_classifier is not None:
+            classification = self.rule_classifier.classify(category, readme)
+            if classification is not None:
+                self.stats[category].add('rules')
+                return classification  # type: ignore
+        return None
+
+    def _classify_items(
+        self, category: Literal['model', 'dataset'], items: list[tuple[str, str, str]]
+    ) -> list[ModelClassification | None] | list[DatasetClassification | None]:
+        """Send items to the LLM, batched when batch_size > 1; None marks deferred items."""
+        self.stats[category].add('llm', len(items))
+        if self.batch_size > 1:
+            if category == 'model':
+                return self.classify_models_batch(items)
+            return self.classify_datasets_batch(items)
+        if category == 'model':
+            return [self.classify_model(*item) for item in items]
+        return [self.classify_dataset(*item) for item in items]
+
+    def _run_pipeline(
+        self,
+        category: Literal['model', 'dataset'],
+        lines: list[dict],
+        pending: list[int],
+        apply: Callable[[Callable[[], None]], None] = lambda update: update(),
+    ) -> None:
+        """Classify lines[pending] in place, overlapping README fetches with LLM calls.
+
+        Every update of `lines` goes through `apply`, which may serialize and checkpoint them.
+        """
+        todo = iter(pending)
+        todo_lock = threading.Lock()
+        readme_queue: queue.Queue = queue.Queue(maxsize=self.prefetch_queue_size)
+        done = object()
+        # Set when a worker fails, so that the other stage does not block forever
+        abort = threading.Event()
+
+        def next_pending() -> int | None:
+            with todo_lock:
+                return None if abort.is_set() else next(todo, None)
+
+        def put(entry) -> None:
+            while not abort.is_set():
+                try:
+                    readme_queue.put(entry, timeout=1.0)
+                    return
+                except queue.Full:
+                    continue
+
+        def take():
+            while not abort.is_set():
+                try:
+                    return readme_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+            return done
+
+        def save(idx: int, classification) -> None:
+            apply(lambda: self._apply_classification(lines[idx], classification, category))
+
+        def guarded(worker):
+            def run():
+                try:
+                    worker()
+                except BaseException:
+                    abort.set()
+                    raise
+
+            return run
+
+        def fetch_worker():
+            while (idx := next_pending()) is not None:
+                identifier = format_identifier_from_dict(lines[idx])
+                classification = self._knn_classify(category, identifier)
+                if classification is not None:
+                    save(idx, classification)
+                    continue
+                link = lines[idx]['link']
+                if self.fetch_limiter is not None:
+                    self.fetch_limiter.wait()
+                readme = self._fetch_readme(identifier, link, category)
+                # Blocks while the queue is full, so fetching never runs far ahead of the LLM
+                put((idx, (identifier, link, readme)))
+
+        def classify_worker():
+            finished = False
+            while not finished:
+                batch = []
+                entry = take()
+                while True:
+                    if entry is done:
+                        # Leave the sentinel for the other classification workers
+                        put(done)
+                        finished = True
+                        break
+                    batch.append(entry)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        entry = readme_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        break
+                llm_chunk, llm_items = [], []
+                for idx, item in batch:
+                    classification = self._pre_classify(category, item)
+                    if classification is not None:
+                        save(idx, classification)
+                    else:
+                        llm_chunk.append(idx)
+                        llm_items.append(item)
+                if llm_items:
+                    results = self._classify_items(category, llm_items)
+                    for idx, classification in zip(llm_chunk, results):
+                        if classification is None:
+                            # Rate limited: stays pending for the next run
+                            self.stats[category].add('deferred')
                         else:
-                            model_info[identifier] = ModelExtraInfo.from_dict(line)
-                    data.append(line)
-            # Write model_info to temp file first
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=self.model_info_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf1:
-                with jsonlines.Writer(tf1) as writer1:
-                    for v in model_info.values():
-                        writer1.write(v.to_dict())
-            # Write data to temp file first
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=data_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf2:
-                with jsonlines.Writer(tf2) as writer2:
-                    writer2.write_all(data)
-            # Atomic replace
-            Path(tf1.name).replace(self.model_info_path)
-            Path(tf2.name).replace(data_path)
-        elif category == 'dataset':
-            dataset_info: dict[str, DatasetExtraInfo] = {}
-            if self.dataset_info_path.exists():
-                with jsonlines.open(self.dataset_info_path, 'r') as reader:
-                    for line in reader:
-                        dataset_info[format_identifier_from_dict(line)] = (
-                            DatasetExtraInfo.from_dict(line)
+                            save(idx, classification)
+
+        with ThreadPoolExecutor(self.fetch_concurrency + self.llm_concurrency) as pool:
+            classifiers = [
+                pool.submit(guarded(classify_worker)) for _ in range(self.llm_concurrency)
+            ]
+            fetchers = [pool.submit(guarded(fetch_worker)) for _ in range(self.fetch_concurrency)]
+            try:
+                for future in fetchers:
+                    future.result()
+            except BaseException:
+                abort.set()
+                raise
+            finally:
+                put(done)
+            for future in classifiers:
+                future.result()
+
+    def _update_info_file(self, info_path: Path, category: Literal['model', 'dataset']):
+        cleanup_temp_files(info_path)
+        with jsonlines.open(info_path, 'r') as reader:
+            lines: list[dict] = list(reader)
+
+        # Entries classified by an interrupted run were checkpointed and are skipped here
+        pending = [i for i, line in enumerate(lines) if self._needs_classification(line, category)]
+        stats = self.stats[category] = ClassificationStats(category, pending=len(pending))
+        logger.info(
+            f'{len(pending)} of {len(lines)} {category} entries need classification '
+            f'(batch_size={self.batch_size}, fetch_concurrency={self.fetch_concurrency}, '
+            f'llm_concurrency={self.llm_concurrency})'
+        )
+        checkpointer = _Checkpointer(
+            info_path, lines, self.checkpoint_every, self.checkpoint_interval
+        )
+        try:
+            if self.mirror_threshold is not None:
+                mirrored = propagate_mirror_labels(
+                    lines,
+                    pending,
+                    category,
+                    self.account_orgs,
+                    self.mirror_threshold,
+                    self.mirror_audit_path,
+                )
+                for idx, classification in mirrored.items():
+                    checkpointer.apply(
+                        lambda idx=idx, classification=classification: (
+                            self._apply_classification(lines[idx], classification, category)  # type: ignore
                         )
-            data = []
+                    )
+                stats.add('mirror', len(mirrored))
+                pending = [idx for idx in pending if idx not in mirrored]
+            self._run_pipeline(category, lines, pending, checkpointer.apply)
+        finally:
+            checkpointer.commit()
+        logger.info(f'Classification stats: {stats.summary()}')
+
+    def update_extra_info(self):
+        started = time.time()
+        try:
+            if self.model_info_path.exists():
+                self._update_info_file(self.model_info_path, 'model')
+            if self.dataset_info_path.exists():
+                self._update_info_file(self.dataset_info_path, 'dataset')
+        finally:
+            if self.metrics_path is not None:
+                self.write_metrics(self.metrics_path, time.time() - started)
+
+    def write_metrics(self, path: Path, wall_seconds: float | None = None) -> dict:
+        """Write the LLM call metrics of this run, with the settings they were measured under."""
+        run_info = {
+            'llm_model': self.model_name,
+            'wall_seconds': wall_seconds,
+            'settings': {
+                'batch_size': self.batch_size,
+                'batch_token_budget': self.batch_token_budget,
+                'batch_readme_tokens': self.batch_readme_tokens,
+                'readme_token_budget': self.readme_token_budget,
+                'condense_readme': self.condenser is not None,
+                'fetch_concurrency': self.fetch_concurrency,
+                'llm_concurrency': self.llm_concurrency,
+                'prefetch_queue_size': self.prefetch_queue_size,
+            },
+            'resolved_by': {
+                category: dict(stats.resolved_by) for category, stats in self.stats.items()
+            },
+        }
+        return write_metrics_summary(
+            path,
+            self.metrics,
+            run_info,
+            self.prompt_price,
+            self.completion_price,
+        )
+
+    def _info_path(self, category: Literal['model', 'dataset']) -> Path:
+        return self.model_info_path if category == 'model' else self.dataset_info_path
+
+    def _load_label_index(self, category: Literal['model', 'dataset']) -> dict[str, tuple]:
+        """Map every identifier of the extra-info file to its labels, and nothing else."""
+        index: dict[str, tuple] = {}
+        info_path = self._info_path(category)
+        if info_path.exists():
+            with jsonlines.open(info_path, 'r') as reader:
+                for line in reader:
+                    index[format_identifier_from_dict(line)] = _labels_from_dict(line, category)
+        return index
+
+    def _append_info_entries(self, category: Literal['model', 'dataset'], entries: list[dict]):
+        if not entries:
+            return
+        info_path = self._info_path(category)
+        with open(info_path, 'a', encoding='utf-8') as f:
+            with jsonlines.Writer(f) as writer:
+                writer.write_all(entries)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.info(f'Added {len(entries)} new {category} entries to {info_path}')
+
+    def register_raw_identifiers(
+        self, data_paths: list[Path], category: Literal['model', 'dataset']
+    ) -> int:
+        """Add the unlabelled identifiers of raw data files missing from the extra-info file.
+
+        Run before `update_extra_info` so that new repositories are classified in the same run.
+        """
+        index = self._load_label_index(category)
+        new_entries = []
+        for data_path in data_paths:
             with jsonlines.open(data_path, 'r') as reader:
                 for line in reader:
+                    if _is_labelled(line, category):
+                        continue
                     identifier = format_identifier_from_dict(line)
-                    if not (line['modality'] and line['lifecycle']):
-                        if identifier in dataset_info:
-                            line['valid'] = dataset_info[identifier].valid
-                            line['modality'] = dataset_info[identifier].modality
-                            line['lifecycle'] = dataset_info[identifier].lifecycle
-                        else:
-                            dataset_info[identifier] = DatasetExtraInfo.from_dict(line)
-                    data.append(line)
-            # Write dataset_info to temp file first
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=self.dataset_info_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf1:
-                with jsonlines.Writer(tf1) as writer1:
-                    for v in dataset_info.values():
-                        writer1.write(v.to_dict())
-            # Write data to temp file first
-            with tempfile.NamedTemporaryFile(
-                'w',
-                dir=data_path.parent,
-                suffix='.jsonl',
-                delete=False,
-                encoding='utf-8',
-            ) as tf2:
-                with jsonlines.Writer(tf2) as writer2:
-                    writer2.write_all(data)
-            # Atomic replace
-            Path(tf1.name).replace(self.dataset_info_path)
-            Path(tf2.name).replace(data_path)
-
-    def classify_model(self, identifier: str, link: str, readme: str) -> ModelClassification:
-        """Classify a model repository: validity + modality."""
+                    if identifier not in index:
+                        entry = _new_info_entry(line, category)
+                        index[identifier] = _labels_from_dict(entry, category)
+                        new_entries.append(entry)
+        self._append_info_entries(category, new_entries)
+        return len(new_entries)
+
+    def update_raw_data(self, data_path: Path, category: str):
+        self.update_raw_data_files([data_path], category)  # type: ignore
+
+    def update_raw_data_files(
+        self, data_paths: list[Path], category: Literal['model', 'dataset'], workers: int = 1
+    ) -> None:
+        """Copy labels from the extra-info file into raw data files, streaming line by line.
+
+        Only an identifier -> labels index is kept in memory, so several snapshot files are
+        updated with one load of the extra-info file. Identifiers missing from the extra-info
+        file are appended to it, unlabelled, for the next classification run.
+        """
+        self._apply_labels({category: data_paths}, workers)
+
+    def _apply_labels(self, data_paths: dict[str, list[Path]], workers: int) -> None:
+        indexes = {
+            category: self._load_label_index(category)  # type: ignore
+            for category, paths in data_paths.items()
+            if paths
+        }
+        jobs = [(path, category) for category, paths in data_paths.items() for path in paths]
+        if workers > 1 and len(jobs) > 1:
+            # Raw files are independent; each worker process gets a copy of the index. Workers
+            # come from a fork server: this process may already run classification threads
+            context = multiprocessing.get_context('forkserver')
+            with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=context) as pool:
+                futures = [
+                    pool.submit(_update_raw_file, path, category, indexes[category])
+                    for path, category in jobs
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = [
+                _update_raw_file(path, category, indexes[category]) for path, category in jobs
+            ]
+
+        new_entries: dict[str, dict[str, dict]] = {category: {} for category in indexes}
+        for (_, category), entries in zip(jobs, results):
+            for entry in entries:
+                new_entries[category].setdefault(format_identifier_from_dict(entry), entry)
+        for category, entries in new_entries.items():
+            self._append_info_entries(category, list(entries.values()))  # type: ignore
+
+    def update_snapshots(self, inp_dirs: list[Path], workers: int = 1) -> None:
+        """Classify the unlabelled repositories of several snapshot directories at once.
+
+        The identifiers of all raw files are registered first, so the union is classified by a
+        single `update_extra_info`; the labels are then applied to all raw files in parallel.
+        """
+        data_paths: dict[str, list[Path]] = {'model': [], 'dataset': []}
+        for inp_dir in inp_dirs:
+            for category in data_paths:
+                path = inp_dir / f'raw_{category}_data.jsonl'
+                if path.exists():
+                    data_paths[category].append(path)
+        for category, paths in data_paths.items():
+            if paths:
+                self.register_raw_identifiers(paths, category)  # type: ignore
+        self.update_extra_info()
+        self._apply_labels(data_paths, workers)
+
+    def classify_model(
+        self, identifier: str, link: str, readme: str
+    ) -> ModelClassification | None:
+        """Classify a model repository: validity + modality.
+
+        Returns None if the LLM stayed rate limited, so the repository remains unclassified.
+        """
         if readme == '':
             return {
                 'valid': False,
@@ -315,6 +911,7 @@ class ModalityAIHelper:
         # If LLM is not available, fall back to default
         if self.model_chain is None:
             logger.warning(f'LLM not available, using default classification for {identifier}')
+            self.metrics['model'].record_fallback('llm_unavailable')
             return {
                 'valid': False,
                 'modality': None,
@@ -323,13 +920,16 @@ class ModalityAIHelper:
 
         try:
             modality_options = [m.value for m in Modality]
-            result = self.model_chain.invoke(
+            self.stats['model'].add_llm_request()
+            result = self._invoke(
+                'model',
+                self.model_chain,
                 {
                     'modality_options': ', '.join(modality_options),
                     'identifier': identifier,
                     'link': link,
-                    'readme': self._truncate_readme(readme),
-                }
+                    'readme': self._prepare_readme('model', readme),
+                },
             )
 
             # Validate and normalize result
@@ -345,17 +945,28 @@ class ModalityAIHelper:
                 'modality': modality_str,
                 'reason': reason,
             }
+        except RateLimitExhausted as e:
+            # Not a classification: leave the repository for a later run
+            logger.warning(f'Rate limited, leaving model {identifier} unclassified: {e}')
+            self.metrics['model'].record_fallback('rate_limited')
+            return None
         except Exception:
             error_msg = traceback.format_exc()
             logger.error(f'Failed to classify model {identifier}: {error_msg}')
+            self.metrics['model'].record_fallback('error')
             return {
                 'valid': False,
                 'modality': None,
                 'reason': f'Fallback (error: {error_msg})',
             }
 
-    def classify_dataset(self, identifier: str, link: str, readme: str) -> DatasetClassification:
-        """Classify a dataset repository: validity + modality + lifecycle."""
+    def classify_dataset(
+        self, identifier: str, link: str, readme: str
+    ) -> DatasetClassification | None:
+        """Classify a dataset repository: validity + modality + lifecycle.
+
+        Returns None if the LLM stayed rate limited, so the repository remains unclassified.
+        """
         if readme == '':
             return {
                 'valid': False,
@@ -367,6 +978,7 @@ class ModalityAIHelper:
         # If LLM is not available, fall back to default
         if self.dataset_chain is None:
             logger.warning(f'LLM not available, using default classification for {identifier}')
+            self.metrics['dataset'].record_fallback('llm_unavailable')
             return {
                 'valid': False,
                 'modality': None,
@@ -377,14 +989,17 @@ class ModalityAIHelper:
         try:
             modality_options = [m.value for m in Modality]
             lifecycle_options = [l.value for l in Lifecycle]
-            result = self.dataset_chain.invoke(
+            self.stats['dataset'].add_llm_request()
+            result = self._invoke(
+                'dataset',
+                self.dataset_chain,
                 {
                     'modality_options': ', '.join(modality_options),
                     'lifecycle_options': ', '.join(lifecycle_options),
                     'identifier': identifier,
                     'link': link,
-                    'readme': self._truncate_readme(readme),
-                }
+                    'readme': self._prepare_readme('dataset', readme),
+                },
             )
 
             # Validate and normalize result
@@ -404,9 +1019,15 @@ class ModalityAIHelper:
                 'lifecycle': lifecycle_str,
                 'reason': reason,
             }
+        except RateLimitExhausted as e:
+            # Not a classification: leave the repository for a later run
+            logger.warning(f'Rate limited, leaving dataset {identifier} unclassified: {e}')
+            self.metrics['dataset'].record_fallback('rate_limited')
+            return None
         except Exception:
             error_msg = traceback.format_exc()
             logger.error(f'Failed to classify dataset {identifier}: {error_msg}')
+            self.metrics['dataset'].record_fallback('error')
             return {
                 'valid': False,
                 'modality': None,
@@ -414,18 +1035,173 @@ class ModalityAIHelper:
                 'reason': f'Fallback (error: {error_msg})',
             }
 
+    def _format_batch(
+        self, category: Literal['model', 'dataset'], items: list[tuple[str, str, str]]
+    ) -> str:
+        blocks = []
+        for i, (identifier, link, readme) in enumerate(items, 1):
+            blocks.append(
+                f'### Repository {i}\n'
+                f'Identifier: {identifier}\n'
+                f'Link: {link}\n'
+                f'README content (truncated):\n{self._prepare_readme(category, readme, self.batch_readme_tokens)}'
+            )
+        return '\n\n'.join(blocks)
+
+    @staticmethod
+    def _match_batch_results(result, identifiers: list[str]) -> list[dict] | None:
+        """Align a parsed batch response with the requested identifiers, or None if unusable."""
+        if isinstance(result, dict):
+            # Some models wrap the array, e.g. {"results": [...]}
+            result = next((v for v in result.values() if isinstance(v, list)), None)
+        if not isinstance(result, list) or not all(isinstance(r, dict) for r in result):
+            return None
+        by_identifier = {r.get('identifier'): r for r in result}
+        # Never align by position: a reordered or renamed response would label the wrong repos
+        if all(identifier in by_identifier for identifier in identifiers):
+            return [by_identifier[identifier] for identifier in identifiers]
+        return None
+
+    def _invoke_batch(
+        self,
+        category: Literal['model', 'dataset'],
+        chain,
+        items: list[tuple[str, str, str]],
+        extra_inputs: dict,
+    ) -> list[dict] | None:
+        """Send one batched request; returns None if the response cannot be used."""
+        identifiers = [item[0] for item in items]
+        try:
+            self.stats[category].add_llm_request()
+            result = self._invoke(
+                category,
+                chain,
+                {
+                    **extra_inputs,
+                    'repositories': self._format_batch(category, items),
+                    'count': len(items),
+                },
+                n_items=len(items),
+            )
+        except RateLimitExhausted:
+            # Per-item requests would hit the same limit
+            raise
+        except Exception:
+            self.metrics[category].record_fallback('batch_error')
+            logger.warning(
+                f'Batched classification failed for {len(items)} items, '
+                f'falling back to per-item calls: {traceback.format_exc()}'
+            )
+            return None
+        matched = self._match_batch_results(result, identifiers)
+        if matched is None:
+            self.metrics[category].record_fallback('batch_unparseable')
+            logger.warning(
+                f'Unparseable batch response for {len(items)} items, falling back to per-item calls'
+            )
+        return matched
+
+    def classify_models_batch(
+        self, items: list[tuple[str, str, str]]
+    ) -> list[ModelClassification | None]:
+        """Classify several model repositories (identifier, link, readme) per LLM request."""
+        results: dict[str, ModelClassification | None] = {}
+        to_send = []
+        for identifier, link, readme in items:
+            if readme == '' or self.model_batch_chain is None:
+                results[identifier] = self.classify_model(identifier, link, readme)
+            else:
+                to_send.append((identifier, link, readme))
+
+        modality_options = [m.value for m in Modality]
+        for batch in self._pack_batches(to_send):
+            matched = None
+            if len(batch) > 1:
+                try:
+                    matched = self._invoke_batch(
+                        'model',
+                        self.model_batch_chain,
+                        batch,
+                        {'modality_options': ', '.join(modality_options)},
+                    )
+                except RateLimitExhausted as e:
+                    logger.warning(f'Rate limited, leaving {len(batch)} models unclassified: {e}')
+                    self.metrics['model'].record_fallback('rate_limited')
+                    results.update((identifier, None) for identifier, _, _ in batch)
+                    continue
+            if matched is None:
+                for identifier, link, readme in batch:
+                    results[identifier] = self.classify_model(identifier, link, readme)
+                continue
+            for (identifier, _, _), result in zip(batch, matched):
+                modality_str = result.get('modality')
+                results[identifier] = {
+                    'valid': bool(result.get('valid', False)),
+                    'modality': modality_str if modality_str in modality_options else None,
+                    'reason': result.get('reason', ''),
+                }
+        return [results[identifier] for identifier, _, _ in items]
+
+    def classify_datasets_batch(
+        self, items: list[tuple[str, str, str]]
+    ) -> list[DatasetClassification | None]:
+        """Classify several dataset repositories (identifier, link, readme) per LLM request."""
+        results: dict[str, DatasetClassification | None] = {}
+        to_send = []
+        for identifier, link, readme in items:
+            if readme == '' or self.dataset_batch_chain is None:
+                results[identifier] = self.classify_dataset(identifier, link, readme)
+            else:
+                to_send.append((identifier, link, readme))
+
+        modality_options = [m.value for m in Modality]
+        lifecycle_options = [l.value for l in Lifecycle]
+        for batch in self._pack_batches(to_send):
+            matched = None
+            if len(batch) > 1:
+                try:
+                    matched = self._invoke_batch(
+                        'dataset',
+                        self.dataset_batch_chain,
+                        batch,
+                        {
+                            'modality_options': ', '.join(modality_options),
+                            'lifecycle_options': ', '.join(lifecycle_options),
+                        },
+                    )
+                except RateLimitExhausted as e:
+                    logger.warning(
+                        f'Rate limited, leaving {len(batch)} datasets unclassified: {e}'
+                    )
+                    self.metrics['dataset'].record_fallback('rate_limited')
+                    results.update((identifier, None) for identifier, _, _ in batch)
+                    continue
+            if matched is None:
+                for identifier, link, readme in batch:
+                    results[identifier] = self.classify_dataset(identifier, link, readme)
+                continue
+            for (identifier, _, _), result in zip(batch, matched):
+                modality_str = result.get('modality')
+                lifecycle_str = result.get('lifecycle')
+                results[identifier] = {
+                    'valid': bool(result.get('valid', False)),
+                    'modality': modality_str if modality_str in modality_options else None,
+                    'lifecycle': lifecycle_str if lifecycle_str in lifecycle_options else None,
+                    'reason': result.get('reason', ''),
+                }
+        return [results[identifier] for identifier, _, _ in items]
+
     def gen_modality(self, identifier, category, link, readme) -> Modality | None:
         """Deprecated: use classify_model or classify_dataset instead."""
         if category == 'model':
             result = self.classify_model(identifier, link, readme)
-            return Modality(result['modality']) if result['modality'] else None
         else:
             result = self.classify_dataset(identifier, link, readme)
-            return Modality(result['modality']) if result['modality'] else None
+        return Modality(result['modality']) if result and result['modality'] else None
 
     def gen_lifecycle(self, identifier, category, link, readme) -> Lifecycle | None:
         """Deprecated: use classify_dataset instead."""
         if category == 'model':
             return None
         result = self.classify_dataset(identifier, link, readme)
-        return Lifecycle(result['lifecycle']) if result['lifecycle'] else None
+        return Lifecycle(result['lifecycle']) if result and result['lifecycle'] else None
@@ -0,0 +1,309 @@
+"""Compare classifier configurations on labelled extra-info entries: accuracy against the stored
+labels, confusion matrix, LLM cost and latency, so that the fastest configuration meeting an
+accuracy bar can be chosen."""
+
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Literal
+
+import jsonlines
+from loguru import logger
+
+from oslm_analyst.crawlers.crawl_utils import format_identifier_from_dict
+from oslm_analyst.processors.modality import ModalityAIHelper, write_jsonl_atomic
+from oslm_analyst.processors.modality_knn import KnnModalityClassifier, label_from_dict
+
+UNRESOLVED_LABEL = 'unresolved'
+
+
+@dataclass
+class EvalConfig:
+    """One classifier configuration; `llm=False` evaluates the local stages alone."""
+
+    name: str
+    model: str | None = None
+    batch_size: int = 1
+    readme_token_budget: int = 2000
+    condense_readme: bool = False
+    use_rules: bool = False
+    knn_threshold: float | None = None
+    mirror_threshold: float | None = None
+    llm: bool = True
+    llm_concurrency: int = 4
+
+
+def _parse_value(raw: str, default):
+    if raw.lower() == 'none':
+        return None
+    if isinstance(default, bool):
+        return raw.lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(raw)
+    if default is None or isinstance(default, float):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def parse_eval_config(spec: str) -> EvalConfig:
+    """Parse `name:key=value,key=value`, e.g. `rules-only:llm=false` or `b8:batch_size=8`."""
+    name, _, options = spec.partition(':')
+    defaults = {f.name: f.default for f in fields(EvalConfig) if f.name != 'name'}
+    config = EvalConfig(name=name)
+    for option in filter(None, (o.strip() for o in options.split(','))):
+        key, sep, raw = option.partition('=')
+        key = key.strip().replace('-', '_')
+        if not sep or key not in defaults:
+            raise ValueError(f'Invalid option {option!r} in configuration {spec!r}')
+        setattr(config, key, _parse_value(raw.strip(), defaults[key]))
+    return config
+
+
+def sample_labelled(
+    info_path: Path, category: Literal['model', 'dataset'], n: int, seed: int = 0
+) -> tuple[list[dict], list[dict]]:
+    """Split the labelled entries of an extra-info file into a random sample of `n` and the rest."""
+    with jsonlines.open(info_path) as reader:
+        labelled = [line for line in reader if label_from_dict(line, category) is not None]
+    indices = list(range(len(labelled)))
+    random.Random(seed).shuffle(indices)
+    chosen = set(indices[:n])
+    sample = [labelled[i] for i in sorted(chosen)]
+    rest = [line for i, line in enumerate(labelled) if i not in chosen]
+    return sample, rest
+
+
+def _unlabelled(line: dict, category: Literal['model', 'dataset']) -> dict:
+    line = {**line, 'valid': None, 'modality': None}
+    if category == 'dataset':
+        line['lifecycle'] = None
+    return line
+
+
+def prefetch_readmes(
+    helper: ModalityAIHelper,
+    sample: list[dict],
+    category: Literal['model', 'dataset'],
+    concurrency: int = 4,
+) -> dict[str, str]:
+    """Fetch the README of every sampled entry once, to be shared by all configurations."""
+
+    def fetch(line: dict) -> tuple[str, str]:
+        identifier = format_identifier_from_dict(line)
+        return identifier, helper._fetch_readme(identifier, line['link'], category)
+
+    with ThreadPoolExecutor(max(1, concurrency)) as pool:
+        return dict(pool.map(fetch, sample))
+
+
+@dataclass
+class EvalResult:
+    config: EvalConfig
+    category: str
+    total: int
+    confusion: Counter
+    resolved_by: dict
+    wall_seconds: float
+    llm: dict
+
+    def _accuracy(self, gold_filter=None, key=lambda label: label) -> float | None:
+        total = correct = 0
+        for (gold, pred), n in self.confusion.items():
+            if gold_filter is None or gold_filter(gold):
+                total += n
+                correct += n * (key(gold) == key(pred))
+        return correct / total if total else None
+
+    def to_dict(self) -> dict:
+        resolved = sum(n for (_, pred), n in self.confusion.items() if pred != UNRESOLVED_LABEL)
+        matrix: dict[str, dict[str, int]] = {}
+        for (gold, pred), n in sorted(self.confusion.items()):
+            matrix.setdefault(gold, {})[pred] = n
+        latency = self.llm['latency_seconds']
+        return {
+            'config': asdict(self.config),
+            'category': self.category,
+            'items': self.total,
+            'coverage': resolved / self.total if self.total else 0.0,
+            # Unresolved entries count as errors
+            'accuracy': self._accuracy(),
+            'validity_accuracy': self._accuracy(key=lambda label: label != 'invalid'),
+            'modality_accuracy': self._accuracy(
+                lambda gold: gold != 'invalid', lambda label: label.split('|')[0]
+            ),
+            'lifecycle_accuracy': (
+                self._accuracy(
+                    lambda gold: gold != 'invalid',
+                    lambda label: label.split('|')[1] if '|' in label else None,
+                )
+                if self.category == 'dataset'
+                else None
+            ),
+            'confusion_matrix': matrix,
+            'resolved_by': self.resolved_by,
+            'wall_seconds': self.wall_seconds,
+            'items_per_second': self.total / self.wall_seconds if self.wall_seconds else None,
+            'llm_calls': self.llm['calls'],
+            'total_tokens': self.llm['total_tokens'],
+            'estimated_cost': self.llm.get('estimated_cost'),
+            'latency_p50': latency['p50'],
+            'latency_p95': latency['p95'],
+        }
+
+
+def run_eval(
+    config: EvalConfig,
+    sample: list[dict],
+    rest: list[dict],
+    readmes: dict[str, str],
+    category: Literal['model', 'dataset'] = 'model',
+    api_key: str | None = None,
+    base_url: str | None = None,
+    prompt_price: float | None = None,
+    completion_price: float | None = None,
+    work_dir: Path | None = None,
+) -> EvalResult:
+    """Classify the sample with its labels removed under `config` and compare with the labels.
+
+    The k-NN stage is trained on `rest` only and mirrors are looked up among `rest`, so no
+    stage sees the labels it is evaluated against. READMEs come from `readmes`, which keeps
+    fetch latency out of the timings.
+    """
+    helper = ModalityAIHelper(
+        api_key=api_key,
+        base_url=base_url,
+        model=config.model,
+        batch_size=config.batch_size,
+        readme_token_budget=config.readme_token_budget,
+        condense_readme=config.condense_readme,
+        use_rules=config.use_rules,
+        knn_threshold=None,
+        mirror_threshold=config.mirror_threshold,
+        llm_concurrency=config.llm_concurrency,
+        prompt_price=prompt_price,
+        completion_price=completion_price,
+    )
+    if config.knn_threshold is not None:
+        identifiers = [format_identifier_from_dict(line) for line in rest]
+        labels = [label_from_dict(line, category) for line in rest]
+        helper.knn_classifiers[category] = KnnModalityClassifier().fit(identifiers, labels)  # type: ignore
+        helper.knn_threshold = config.knn_threshold
+    helper._fetch_readme = lambda identifier, link, category: readmes.get(identifier, '')  # type: ignore
+    if not config.llm:
+        # Whatever the local stages leave is deferred, i.e. stays unresolved
+        helper._classify_items = lambda category, items: [None] * len(items)  # type: ignore
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        info_path = Path(tmp) / f'{category}_info.jsonl'
+        helper.model_info_path = info_path if category == 'model' else Path(tmp) / 'missing'
+        helper.dataset_info_path = info_path if category == 'dataset' else Path(tmp) / 'missing'
+        helper.mirror_audit_path = Path(tmp) / 'mirror_audit.jsonl'
+        context = rest if config.mirror_threshold is not None else []
+        write_jsonl_atomic(info_path, [_unlabelled(line, category) for line in sample] + context)
+        start = time.perf_counter()
+        helper.update_extra_info()
+        wall_seconds = time.perf_counter() - start
+        with jsonlines.open(info_path) as reader:
+            predicted = [line for _, line in zip(sample, reader)]
+
+    confusion: Counter = Counter()
+    for gold, pred in zip(sample, predicted):
+        confusion[
+            (label_from_dict(gold, category), label_from_dict(pred, category) or UNRESOLVED_LABEL)
+        ] += 1
+    return EvalResult(
+        config,
+        category,
+        len(sample),
+        confusion,
+        dict(helper.stats[category].resolved_by),
+        wall_seconds,
+        helper.metrics[category].summary(prompt_price, completion_price),
+    )
+
+
+def recommend(results: list[dict], min_accuracy: float) -> dict | None:
+    """The fastest configuration whose accuracy meets `min_accuracy`."""
+    eligible = [r for r in results if (r['accuracy'] or 0.0) >= min_accuracy]
+    return max(eligible, key=lambda r: r['items_per_second'] or 0.0, default=None)
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if value is not None else '-'
+
+
+def format_report(results: list[dict]) -> str:
+    """Plain-text table of the main figures of every configuration."""
+    header = (
+        f'{"config":<20} {"acc":>6} {"modal":>6} {"cover":>6} {"items/s":>8} '
+        f'{"p50":>6} {"p95":>6} {"calls":>6} {"cost":>8}'
+    )
+    rows = [header]
+    for r in results:
+        rows.append(
+            f'{r["config"]["name"]:<20} {_fmt(r["accuracy"], "6.3f")} '
+            f'{_fmt(r["modality_accuracy"], "6.3f")} {r["coverage"]:6.3f} '
+            f'{_fmt(r["items_per_second"], "8.1f")} {_fmt(r["latency_p50"], "6.2f")} '
+            f'{_fmt(r["latency_p95"], "6.2f")} {r["llm_calls"]:>6} '
+            f'{_fmt(r["estimated_cost"], "8.4f")}'
+        )
+    return '\n'.join(rows)
+
+
+def run_evaluation(
+    configs: list[EvalConfig],
+    category: Literal['model', 'dataset'] = 'model',
+    n_items: int = 200,
+    seed: int = 0,
+    info_path: Path | None = None,
+    api_key: str | None = None,
+    base_url: str | None = None,
+    prompt_price: float | None = None,
+    completion_price: float | None = None,
+    min_accuracy: float | None = None,
+    out_path: Path | None = None,
+) -> dict:
+    """Evaluate every configuration on the same sample of labelled entries."""
+    fetcher = ModalityAIHelper(knn_threshold=None, mirror_threshold=None)
+    info_path = info_path or fetcher._info_path(category)
+    sample, rest = sample_labelled(info_path, category, n_items, seed)
+    logger.info(f'Evaluating {len(configs)} configurations on {len(sample)} {category} entries')
+    readmes = prefetch_readmes(fetcher, sample, category, fetcher.fetch_concurrency)
+
+    results = []
+    for config in configs:
+        result = run_eval(
+            config,
+            sample,
+            rest,
+            readmes,
+            category,
+            api_key,
+            base_url,
+            prompt_price,
+            completion_price,
+        ).to_dict()
+        logger.info(
+            f'{config.name}: accuracy={result["accuracy"]}, coverage={result["coverage"]:.3f}, '
+            f'{result["wall_seconds"]:.1f}s'
+        )
+        results.append(result)
+    report = {'category': category, 'items': len(sample), 'seed': seed, 'results': results}
+    if min_accuracy is not None:
+        best = recommend(results, min_accuracy)
+        report['min_accuracy'] = min_accuracy
+        report['recommended'] = best['config']['name'] if best else None
+    if out_path is not None:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f'Wrote evaluation report to {out_path}')
+    return report
@@ -0,0 +1,279 @@
+"""Offline nearest-neighbour modality classifier trained on the labelled extra-info files.
+
+Repositories are represented by hashed TF-IDF vectors of their identifiers (account token, word
+tokens and character n-grams of the name). Only identifiers are used because the labelled corpus
+in `config/model_info.jsonl` / `config/dataset_info.jsonl` does not store README texts; this also
+lets the classifier run before any README is fetched.
+"""
+
+import random
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import jsonlines
+import numpy as np
+from loguru import logger
+
+from oslm_analyst.crawlers.crawl_utils import format_identifier_from_dict
+
+INVALID_LABEL = 'invalid'
+
+_WORD_RE = re.compile(r'[a-z]+|\d+[a-z]?')
+
+
+def label_from_dict(line: dict, category: Literal['model', 'dataset']) -> str | None:
+    """Return the training label of an extra-info entry, or None if it is not labelled."""
+    if line.get('valid') is False:
+        return INVALID_LABEL
+    if line.get('valid') is not True or not line.get('modality'):
+        return None
+    if category == 'model':
+        return line['modality']
+    if not line.get('lifecycle'):
+        return None
+    return f'{line["modality"]}|{line["lifecycle"]}'
+
+
+def classification_from_label(
+    label: str, category: Literal['model', 'dataset'], reason: str
+) -> dict:
+    """Convert a label back into a `ModelClassification`/`DatasetClassification` dict."""
+    if label == INVALID_LABEL:
+        result = {'valid': False, 'modality': None, 'reason': reason}
+        if category == 'dataset':
+            result['lifecycle'] = None
+        return result
+    if category == 'model':
+        return {'valid': True, 'modality': label, 'reason': reason}
+    modality, lifecycle = label.split('|')
+    return {'valid': True, 'modality': modality, 'lifecycle': lifecycle, 'reason': reason}
+
+
+@dataclass
+class KnnPrediction:
+    label: str
+    confidence: float
+    similarity: float
+
+
+@dataclass
+class KnnEvaluation:
+    total: int
+    correct: int
+    confident: int
+    confident_correct: int
+    threshold: float
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.total if self.total else 0.0
+
+    @property
+    def coverage(self) -> float:
+        return self.confident / self.total if self.total else 0.0
+
+    @property
+    def confident_accuracy(self) -> float:
+        return self.confident_correct / self.confident if self.confident else 0.0
+
+    def summary(self) -> str:
+        return (
+            f'accuracy={self.accuracy:.3f} on {self.total} held-out entries; '
+            f'at confidence>={self.threshold}: coverage={self.coverage:.3f}, '
+            f'accuracy={self.confident_accuracy:.3f}'
+        )
+
+
+class KnnModalityClassifier:
+    """Cosine k-NN over hashed TF-IDF identifier vectors, using only NumPy."""
+
+    def __init__(self, n_features: int = 2**18, k: int = 7, ngram_range: tuple[int, int] = (3, 5)):
+        self.n_features = n_features
+        self.k = k
+        self.ngram_range = ngram_range
+        self.labels: list[str] = []
+        self.idf = np.zeros(0, dtype=np.float32)
+        # Inverted index (feature-major sparse matrix): rows of feature j are
+        # post_rows[post_ptr[j]:post_ptr[j + 1]] with weights post_weights[...]
+        self.post_ptr = np.zeros(1, dtype=np.int32)
+        self.post_rows = np.zeros(0, dtype=np.int32)
+        self.post_weights = np.zeros(0, dtype=np.float16)
+        self.row_labels = np.zeros(0, dtype=np.int16)
+
+    def _hash(self, feature: str) -> int:
+        return zlib.crc32(feature.encode('utf-8')) % self.n_features
+
+    def _features(self, identifier: str) -> Counter:
+        repo, _, name = identifier.lower().partition('/')
+        features = Counter({f'repo:{repo}': 1})
+        features.update(f'w:{w}' for w in _WORD_RE.findall(name))
+        padded = f'^{name}$'
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            features.update(f'c:{padded[i : i + n]}' for i in range(len(padded) - n + 1))
+        return features
+
+    def _hashed_tf(self, identifier: str) -> dict[int, float]:
+        tf: dict[int, float] = {}
+        for feature, count in self._features(identifier).items():
+            j = self._hash(feature)
+            tf[j] = tf.get(j, 0.0) + 1.0 + float(np.log(count))
+        return tf
+
+    def _vectorize(self, identifier: str) -> tuple[np.ndarray, np.ndarray]:
+        tf = self._hashed_tf(identifier)
+        cols = np.fromiter(tf.keys(), dtype=np.int64, count=len(tf))
+        vals = np.fromiter(tf.values(), dtype=np.float32, count=len(tf)) * self.idf[cols]
+        norm = np.linalg.norm(vals)
+        return cols, vals / norm if norm > 0 else vals
+
+    def fit(self, identifiers: list[str], labels: list[str]) -> 'KnnModalityClassifier':
+        self.labels = sorted(set(labels))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        self.row_labels = np.array([label_index[label] for label in labels], dtype=np.int16)
+
+        tfs = [self._hashed_tf(identifier) for identifier in identifiers]
+        df = np.zeros(self.n_features, dtype=np.int64)
+        for tf in tfs:
+            df[list(tf.keys())] += 1
+        self.idf = (np.log((1 + len(tfs)) / (1 + df)) + 1).astype(np.float32)
+
+        rows, cols, vals = [], [], []
+        for row, tf in enumerate(tfs):
+            c = np.fromiter(tf.keys(), dtype=np.int64, count=len(tf))
+            v = np.fromiter(tf.values(), dtype=np.float32, count=len(tf)) * self.idf[c]
+            v /= np.linalg.norm(v) or 1.0
+            rows.append(np.full(len(c), row, dtype=np.int32))
+            cols.append(c)
+            vals.append(v)
+        rows_arr = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        cols_arr = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+        vals_arr = np.concatenate(vals) if vals else np.zeros(0, dtype=np.float32)
+
+        order = np.argsort(cols_arr, kind='stable')
+        self.post_rows = rows_arr[order]
+        self.post_weights = vals_arr[order].astype(np.float16)
+        self.post_ptr = np.zeros(self.n_features + 1, dtype=np.int32)
+        np.cumsum(np.bincount(cols_arr, minlength=self.n_features), out=self.post_ptr[1:])
+        return self
+
+    def _similarities(self, identifier: str) -> np.ndarray:
+        cols, vals = self._vectorize(identifier)
+        scores = np.zeros(len(self.row_labels), dtype=np.float32)
+        for j, w in zip(cols, vals):
+            start, end = self.post_ptr[j], self.post_ptr[j + 1]
+            if start != end:
+                scores[self.post_rows[start:end]] += w * self.post_weights[start:end]
+        return scores
+
+    def predict(self, identifier: str) -> KnnPrediction | None:
+        if len(self.row_labels) == 0:
+            return None
+        scores = self._similarities(identifier)
+        k = min(self.k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[scores[top] > 0]
+        if len(top) == 0:
+            return None
+        votes = np.bincount(self.row_labels[top], weights=scores[top], minlength=len(self.labels))
+        best = int(votes.argmax())
+        return KnnPrediction(
+            label=self.labels[best],
+            confidence=float(votes[best] / votes.sum()) * float(scores[top].max()),
+            similarity=float(scores[top].max()),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            n_features=np.int64(self.n_features),
+            k=np.int64(self.k),
+            ngram_range=np.array(self.ngram_range, dtype=np.int64),
+            labels=np.array(self.labels),
+            idf=self.idf.astype(np.float16),
+            post_ptr=self.post_ptr,
+            post_rows=self.post_rows,
+            post_weights=self.post_weights,
+            row_labels=self.row_labels,
+        )
+        logger.info(f'Saved k-NN modality classifier ({len(self.row_labels)} entries) to {path}')
+
+    @classmethod
+    def load(cls, path: Path) -> 'KnnModalityClassifier':
+        with np.load(path) as data:
+            clf = cls(
+                n_features=int(data['n_features']),
+                k=int(data['k']),
+                ngram_range=tuple(int(n) for n in data['ngram_range']),  # type: ignore
+            )
+            clf.labels = [str(label) for label in data['labels']]
+            clf.idf = data['idf'].astype(np.float32)
+            clf.post_ptr = data['post_ptr']
+            clf.post_rows = data['post_rows']
+            clf.post_weights = data['post_weights']
+            clf.row_labels = data['row_labels']
+        return clf
+
+
+def load_labelled_corpus(
+    info_path: Path, category: Literal['model', 'dataset']
+) -> tuple[list[str], list[str]]:
+    """Load (identifiers, labels) of all labelled entries in an extra-info file."""
+    identifiers, labels = [], []
+    with jsonlines.open(info_path) as reader:
+        for line in reader:
+            label = label_from_dict(line, category)
+            if label is not None:
+                identifiers.append(format_identifier_from_dict(line))
+                labels.append(label)
+    return identifiers, labels
+
+
+def evaluate(
+    identifiers: list[str],
+    labels: list[str],
+    holdout: float = 0.1,
+    threshold: float = 0.8,
+    seed: int = 0,
+    **kwargs,
+) -> KnnEvaluation:
+    """Train on a random split of the corpus and evaluate on the held-out part."""
+    indices = list(range(len(identifiers)))
+    random.Random(seed).shuffle(indices)
+    n_test = max(1, int(len(indices) * holdout))
+    test, train = indices[:n_test], indices[n_test:]
+    clf = KnnModalityClassifier(**kwargs).fit(
+        [identifiers[i] for i in train], [labels[i] for i in train]
+    )
+    result = KnnEvaluation(len(test), 0, 0, 0, threshold)
+    for i in test:
+        prediction = clf.predict(identifiers[i])
+        if prediction is None:
+            continue
+        correct = prediction.label == labels[i]
+        result.correct += correct
+        if prediction.confidence >= threshold:
+            result.confident += 1
+            result.confident_correct += correct
+    return result
+
+
+def train_from_info_file(
+    info_path: Path,
+    artifact_path: Path,
+    category: Literal['model', 'dataset'],
+    holdout: float = 0.1,
+    threshold: float = 0.8,
+) -> KnnEvaluation:
+    """Report held-out accuracy, then train on the full corpus and persist the artifact."""
+    identifiers, labels = load_labelled_corpus(info_path, category)
+    logger.info(f'Loaded {len(identifiers)} labelled {category} entries from {info_path}')
+    evaluation = evaluate(identifiers, labels, holdout=holdout, threshold=threshold)
+    logger.info(f'k-NN {category} classifier: {evaluation.summary()}')
+    KnnModalityClassifier().fit(identifiers, labels).save(artifact_path)
+    return evaluation
@@ -0,0 +1,171 @@
+"""Per-call instrumentation of the LLM requests sent by `ModalityAIHelper`."""
+
+import json
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from loguru import logger
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    return float(np.percentile(values, q)) if values else None
+
+
+class LLMCallMetrics(BaseCallbackHandler):
+    """LangChain callback handler collecting latency, token usage, errors, retries and cache hits.
+
+    Events that LangChain does not see (fallbacks to per-item requests, README truncation) are
+    recorded by the helper through `record_fallback` and `record_truncation`.
+    """
+
+    def __init__(self, category: str):
+        self.category = category
+        self._lock = threading.Lock()
+        self._started: dict[UUID, float] = {}
+        self.latencies: list[float] = []
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.fallbacks: Counter = Counter()
+        self.truncated_readmes = 0
+        self.truncated_chars = 0
+
+    def _start(self, run_id: UUID) -> None:
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _stop(self, run_id: UUID) -> float | None:
+        start = self._started.pop(run_id, None)
+        return None if start is None else time.perf_counter() - start
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens, cached = self._usage(response)
+        with self._lock:
+            latency = self._stop(run_id)
+            self.calls += 1
+            if cached:
+                self.cache_hits += 1
+            elif latency is not None:
+                # Cache hits would drag the percentiles towards zero
+                self.latencies.append(latency)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._stop(run_id)
+            self.calls += 1
+            self.errors += 1
+
+    def on_retry(self, retry_state, *, run_id: UUID, **kwargs: Any) -> None:
+        self.record_retry()
+
+    @staticmethod
+    def _usage(response: LLMResult) -> tuple[int, int, bool]:
+        """Return (prompt tokens, completion tokens, served from cache) of one LLM response."""
+        prompt_tokens = completion_tokens = 0
+        cached = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+                if not usage:
+                    continue
+                prompt_tokens += usage.get('input_tokens', 0)
+                completion_tokens += usage.get('output_tokens', 0)
+                # LangChain zeroes the cost of generations replayed from its cache
+                cached = cached or usage.get('total_cost', None) == 0
+        if not (prompt_tokens or completion_tokens) and response.llm_output:
+            token_usage = response.llm_output.get('token_usage') or {}
+            prompt_tokens = token_usage.get('prompt_tokens', 0) or 0
+            completion_tokens = token_usage.get('completion_tokens', 0) or 0
+        return prompt_tokens, completion_tokens, cached
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_fallback(self, kind: str) -> None:
+        with self._lock:
+            self.fallbacks[kind] += 1
+
+    def record_truncation(self, original_chars: int, kept_chars: int) -> None:
+        if original_chars <= kept_chars:
+            return
+        with self._lock:
+            self.truncated_readmes += 1
+            self.truncated_chars += original_chars - kept_chars
+
+    def summary(
+        self, prompt_price: float | None = None, completion_price: float | None = None
+    ) -> dict:
+        """Summarize the run; prices are per 1000 tokens and only used to estimate the cost."""
+        with self._lock:
+            latencies = list(self.latencies)
+            result = {
+                'calls': self.calls,
+                'errors': self.errors,
+                'error_rate': self.errors / self.calls if self.calls else 0.0,
+                'retries': self.retries,
+                'cache_hits': self.cache_hits,
+                'fallbacks': dict(self.fallbacks),
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'total_tokens': self.prompt_tokens + self.completion_tokens,
+                'latency_seconds': {
+                    'mean': float(np.mean(latencies)) if latencies else None,
+                    'p50': _percentile(latencies, 50),
+                    'p95': _percentile(latencies, 95),
+                    'max': max(latencies) if latencies else None,
+                    'total': float(sum(latencies)),
+                },
+                'truncation': {
+                    'readmes': self.truncated_readmes,
+                    'chars_dropped': self.truncated_chars,
+                    # Same 4 characters per token estimate as the batch packing
+                    'estimated_tokens_dropped': self.truncated_chars // 4,
+                },
+            }
+            if prompt_price is not None or completion_price is not None:
+                result['estimated_cost'] = (
+                    self.prompt_tokens * (prompt_price or 0.0)
+                    + self.completion_tokens * (completion_price or 0.0)
+                ) / 1000
+        return result
+
+
+def write_metrics_summary(
+    path: Path,
+    metrics: dict[str, LLMCallMetrics],
+    run_info: dict,
+    prompt_price: float | None = None,
+    completion_price: float | None = None,
+) -> dict:
+    """Write the summary of every category's metrics, plus run settings, as JSON."""
+    summary = {
+        **run_info,
+        **{
+            category: m.summary(prompt_price, completion_price)
+            for category, m in metrics.items()
+        },
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    logger.info(f'Wrote LLM call metrics to {path}')
+    return summary
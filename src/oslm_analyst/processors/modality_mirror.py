@@ -0,0 +1,197 @@
+"""Link mirrored repositories (e.g. a HuggingFace model re-published on ModelScope) so that
+labels can be propagated between them instead of classifying every copy with the LLM."""
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import jsonlines
+from loguru import logger
+
+from oslm_analyst.crawlers.crawl_utils import format_identifier_from_dict
+from oslm_analyst.processors.modality_knn import (
+    INVALID_LABEL,
+    classification_from_label,
+    label_from_dict,
+)
+from oslm_analyst.utils import OrgInfo, today
+
+_SEPARATORS_RE = re.compile(r'[\s._\-]+')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_name(name: str) -> str:
+    """Case and separator insensitive form of a repository or account name."""
+    # ModelScope replaces '.' with '___' in repository names, e.g. Qwen2___5-7B
+    name = name.replace('___', '.').lower()
+    return _SEPARATORS_RE.sub('-', name).strip('-')
+
+
+def _ngrams(name: str, n: int = 3) -> set[str]:
+    padded = f'^{name}$'
+    return {padded[i : i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def load_account_orgs(orgs_path: Path) -> dict[str, str]:
+    """Map every normalized HuggingFace/ModelScope account in orgs.yaml to its organization."""
+    if not orgs_path.exists():
+        return {}
+    account_orgs = {}
+    for org_info in OrgInfo.build_org_info_list_from_yaml(orgs_path):
+        for account in org_info.hf_accounts + org_info.ms_accounts:
+            account_orgs[normalize_name(account)] = org_info.org
+    return account_orgs
+
+
+@dataclass
+class MirrorMatch:
+    source: str
+    label: str
+    confidence: float
+    match: Literal['exact', 'fuzzy']
+
+
+class MirrorIndex:
+    """Index of the labelled entries of an extra-info file by owner and normalized name.
+
+    Entries are linked when their owners are the same organization in orgs.yaml (or the same
+    account up to case and separators) and their names are equal after normalization, or
+    nearly equal with the same numbers in them (so that e.g. `7B` never matches `72B`).
+
+    The confidence of an exact link is the measured agreement of the labelled exact mirrors
+    of the file, unless `exact_confidence` is given, and that of a near one this agreement
+    times the n-gram Jaccard similarity. Without labelled mirror pairs to measure, it is 0.
+    """
+
+    def __init__(
+        self,
+        lines: list[dict],
+        category: Literal['model', 'dataset'],
+        account_orgs: dict[str, str] | None = None,
+        exact_confidence: float | None = None,
+    ):
+        self.category = category
+        self.account_orgs = account_orgs or {}
+        self._exact: dict[tuple[str, str], list[tuple[str, str]]] = defaultdict(list)
+        self._grams: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._entries: list[tuple[str, str, str, set[str]]] = []
+        for line in lines:
+            label = label_from_dict(line, category)
+            # A mirror is often an empty copy of a valid repository (or the other way round),
+            # so invalidity is never propagated
+            if label is None or label == INVALID_LABEL:
+                continue
+            identifier = format_identifier_from_dict(line)
+            owner, name = self._key(line)
+            self._exact[(owner, name)].append((identifier, label))
+            grams = _ngrams(name)
+            for gram in grams:
+                self._grams[(owner, gram)].append(len(self._entries))
+            self._entries.append((identifier, label, name, grams))
+        self.exact_agreement = self._exact_agreement()
+        if exact_confidence is None:
+            exact_confidence = self.exact_agreement or 0.0
+        self.exact_confidence = exact_confidence
+
+    def _exact_agreement(self) -> float | None:
+        """Share of the pairs of labelled exact mirrors whose labels agree."""
+        pairs = agreeing = 0
+        for entries in self._exact.values():
+            counts = Counter(label for _, label in entries)
+            n = len(entries)
+            pairs += n * (n - 1) // 2
+            agreeing += sum(c * (c - 1) // 2 for c in counts.values())
+        if pairs == 0:
+            return None
+        logger.info(
+            f'Labels of {self.category} exact mirrors agree on {agreeing} of {pairs} pairs'
+        )
+        return agreeing / pairs
+
+    def _key(self, line: dict) -> tuple[str, str]:
+        account = normalize_name(line['repo'])
+        owner = self.account_orgs.get(account)
+        return (f'org:{owner}' if owner else f'account:{account}'), normalize_name(line['name'])
+
+    def _fuzzy(self, owner: str, name: str, identifier: str) -> list[MirrorMatch]:
+        grams = _ngrams(name)
+        shared = Counter(i for gram in grams for i in self._grams.get((owner, gram), ()))
+        digits = _DIGITS_RE.findall(name)
+        matches = []
+        for i, n_shared in shared.items():
+            source, label, source_name, source_grams = self._entries[i]
+            if source == identifier or _DIGITS_RE.findall(source_name) != digits:
+                continue
+            similarity = n_shared / len(grams | source_grams)
+            # A near mirror is no more likely to share the label than an exact one
+            confidence = similarity * self.exact_confidence
+            matches.append(MirrorMatch(source, label, confidence, 'fuzzy'))
+        return matches
+
+    def find(self, line: dict, threshold: float) -> MirrorMatch | None:
+        """Best labelled mirror of `line` at or above `threshold`, if all such mirrors agree."""
+        identifier = format_identifier_from_dict(line)
+        owner, name = self._key(line)
+        matches = [
+            MirrorMatch(source, label, self.exact_confidence, 'exact')
+            for source, label in self._exact.get((owner, name), ())
+            if source != identifier
+        ]
+        if not matches or self.exact_confidence < threshold:
+            matches += self._fuzzy(owner, name, identifier)
+        matches = [m for m in matches if m.confidence >= threshold]
+        if not matches:
+            return None
+        if len({m.label for m in matches}) > 1:
+            logger.debug(f'Conflicting labels among mirrors of {identifier}, not propagating')
+            return None
+        return max(matches, key=lambda m: m.confidence)
+
+
+def propagate_mirror_labels(
+    lines: list[dict],
+    pending: list[int],
+    category: Literal['model', 'dataset'],
+    account_orgs: dict[str, str],
+    threshold: float,
+    audit_path: Path | None = None,
+    exact_confidence: float | None = None,
+) -> dict[int, dict]:
+    """Classifications for the pending lines that have a confidently linked labelled mirror.
+
+    Every propagated label is appended to the audit log at `audit_path`.
+    """
+    index = MirrorIndex(lines, category, account_orgs, exact_confidence)
+    results: dict[int, dict] = {}
+    audit = []
+    for idx in pending:
+        match = index.find(lines[idx], threshold)
+        if match is None:
+            continue
+        target = format_identifier_from_dict(lines[idx])
+        results[idx] = classification_from_label(
+            match.label,
+            category,
+            f'Mirror of {match.source} ({match.match}, confidence={match.confidence:.2f})',
+        )
+        audit.append(
+            {
+                'date': today(),
+                'category': category,
+                'target': target,
+                'source': match.source,
+                'label': match.label,
+                'match': match.match,
+                'confidence': round(match.confidence, 4),
+            }
+        )
+    if audit and audit_path is not None:
+        audit_path.parent.mkdir(parents=True, exist_ok=True)
+        with jsonlines.open(audit_path, 'a') as writer:
+            writer.write_all(audit)
+    logger.info(
+        f'Propagated labels from mirrors to {len(results)} of {len(pending)} {category} entries'
+    )
+    return results
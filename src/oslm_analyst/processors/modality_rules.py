@@ -0,0 +1,208 @@
+"""Deterministic modality/lifecycle rules based on repository card metadata."""
+
+import re
+from typing import Literal
+
+import yaml
+from loguru import logger
+
+from oslm_analyst.data_utils import Lifecycle, Modality
+
+# Hub task names (HF pipeline_tag / task_categories, ModelScope tasks) -> modality.
+TASK_MODALITY_MAP: dict[str, Modality] = {
+    # Language
+    'text-generation': Modality.Language,
+    'text2text-generation': Modality.Language,
+    'fill-mask': Modality.Language,
+    'token-classification': Modality.Language,
+    'text-classification': Modality.Language,
+    'question-answering': Modality.Language,
+    'table-question-answering': Modality.Language,
+    'summarization': Modality.Language,
+    'translation': Modality.Language,
+    'zero-shot-classification': Modality.Language,
+    'conversational': Modality.Language,
+    'chat': Modality.Language,
+    # Vector
+    'feature-extraction': Modality.Vector,
+    'sentence-similarity': Modality.Vector,
+    'text-ranking': Modality.Vector,
+    'sentence-embedding': Modality.Vector,
+    # Speech
+    'automatic-speech-recognition': Modality.Speech,
+    'text-to-speech': Modality.Speech,
+    'text-to-audio': Modality.Speech,
+    'audio-classification': Modality.Speech,
+    'audio-to-audio': Modality.Speech,
+    'voice-activity-detection': Modality.Speech,
+    'auto-speech-recognition': Modality.Speech,
+    # Vision
+    'image-classification': Modality.Vision,
+    'object-detection': Modality.Vision,
+    'image-segmentation': Modality.Vision,
+    'depth-estimation': Modality.Vision,
+    'unconditional-image-generation': Modality.Vision,
+    'image-to-image': Modality.Vision,
+    'keypoint-detection': Modality.Vision,
+    'mask-generation': Modality.Vision,
+    'video-classification': Modality.Vision,
+    'image-feature-extraction': Modality.Vision,
+    # Multimodal
+    'image-text-to-text': Modality.Multimodal,
+    'image-to-text': Modality.Multimodal,
+    'text-to-image': Modality.Multimodal,
+    'text-to-video': Modality.Multimodal,
+    'image-to-video': Modality.Multimodal,
+    'visual-question-answering': Modality.Multimodal,
+    'document-question-answering': Modality.Multimodal,
+    'video-text-to-text': Modality.Multimodal,
+    'any-to-any': Modality.Multimodal,
+    'zero-shot-image-classification': Modality.Multimodal,
+    'zero-shot-object-detection': Modality.Multimodal,
+    'audio-text-to-text': Modality.Multimodal,
+    # 3D
+    'image-to-3d': Modality.ThreeDim,
+    'text-to-3d': Modality.ThreeDim,
+    # Embodied
+    'robotics': Modality.Embodied,
+}
+
+LIBRARY_MODALITY_MAP: dict[str, Modality] = {
+    'sentence-transformers': Modality.Vector,
+    'timm': Modality.Vision,
+    'open_clip': Modality.Multimodal,
+    'lerobot': Modality.Embodied,
+    'speechbrain': Modality.Speech,
+    'espnet': Modality.Speech,
+}
+
+TAG_MODALITY_MAP: dict[str, Modality] = {
+    'protein': Modality.Protein,
+    'lerobot': Modality.Embodied,
+    'modality:text': Modality.Language,
+    'modality:audio': Modality.Speech,
+    'modality:image': Modality.Vision,
+    'modality:video': Modality.Vision,
+    'modality:3d': Modality.ThreeDim,
+}
+
+TAG_LIFECYCLE_MAP: dict[str, Lifecycle] = {
+    'pretraining': Lifecycle.Pretraining,
+    'pre-training': Lifecycle.Pretraining,
+    'instruction-tuning': Lifecycle.Finetuning,
+    'instruction-finetuning': Lifecycle.Finetuning,
+    'sft': Lifecycle.Finetuning,
+    'fine-tuning': Lifecycle.Finetuning,
+    'finetuning': Lifecycle.Finetuning,
+    'rlhf': Lifecycle.Preference,
+    'dpo': Lifecycle.Preference,
+    'preference': Lifecycle.Preference,
+    'reward-modeling': Lifecycle.Preference,
+    'alignment': Lifecycle.Preference,
+    'benchmark': Lifecycle.Evaluation,
+    'evaluation': Lifecycle.Evaluation,
+    'leaderboard': Lifecycle.Evaluation,
+}
+
+_FRONT_MATTER_RE = re.compile(r'^\s*---\s*\n(.*?)\n---\s*(?:\n|$)', re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+
+
+def split_front_matter(readme: str) -> tuple[dict, str]:
+    """Split a README into its YAML front matter (as dict) and markdown body."""
+    match = _FRONT_MATTER_RE.match(readme)
+    if not match:
+        return {}, readme
+    try:
+        metadata = yaml.safe_load(match.group(1))
+    except yaml.YAMLError:
+        logger.debug('Unparseable README front matter')
+        metadata = None
+    return (metadata if isinstance(metadata, dict) else {}), readme[match.end() :]
+
+
+def _as_list(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip().lower() for v in value if v is not None]
+    return [str(value).strip().lower()]
+
+
+class MetadataRuleClassifier:
+    """Map hub card metadata to Modality/Lifecycle without calling the LLM.
+
+    `classify` returns a classification dict shaped like `ModelClassification` /
+    `DatasetClassification`, or None when the metadata is missing or ambiguous, in which case
+    the repository should be sent to the LLM.
+    """
+
+    def __init__(self, min_body_chars: int = 20):
+        self.min_body_chars = min_body_chars
+
+    def _modality_votes(self, metadata: dict) -> set[Modality]:
+        votes: set[Modality] = set()
+        tasks = (
+            _as_list(metadata.get('pipeline_tag'))
+            + _as_list(metadata.get('task_categories'))
+            + _as_list(metadata.get('tasks'))
+        )
+        for task in tasks:
+            if task in TASK_MODALITY_MAP:
+                votes.add(TASK_MODALITY_MAP[task])
+        for library in _as_list(metadata.get('library_name')):
+            if library in LIBRARY_MODALITY_MAP:
+                votes.add(LIBRARY_MODALITY_MAP[library])
+        tags = _as_list(metadata.get('tags'))
+        tags += [f'modality:{m}' for m in _as_list(metadata.get('modality'))]
+        tag_votes = {TAG_MODALITY_MAP[t] for t in tags if t in TAG_MODALITY_MAP}
+        # Several dataset modality tags (e.g. image + text) describe a multimodal dataset
+        if len(tag_votes - {Modality.Protein, Modality.Embodied}) > 1:
+            tag_votes = {Modality.Multimodal}
+        votes |= tag_votes
+        return votes
+
+    def _lifecycle_votes(self, metadata: dict) -> set[Lifecycle]:
+        tags = _as_list(metadata.get('tags')) + _as_list(metadata.get('task_categories'))
+        return {TAG_LIFECYCLE_MAP[t] for t in tags if t in TAG_LIFECYCLE_MAP}
+
+    def _is_empty_or_script_only(self, metadata: dict, body: str) -> bool:
+        prose = _CODE_BLOCK_RE.sub('', body)
+        prose = re.sub(r'^\s*#+.*$', '', prose, flags=re.MULTILINE).strip()
+        return not metadata and len(prose) < self.min_body_chars
+
+    def classify(self, category: Literal['model', 'dataset'], readme: str) -> dict | None:
+        if readme == '':
+            # classify_model/classify_dataset already handle this without an LLM call
+            return None
+        metadata, body = split_front_matter(readme)
+        if self._is_empty_or_script_only(metadata, body):
+            result = {
+                'valid': False,
+                'modality': None,
+                'reason': 'Rule: empty or script-only repository card',
+            }
+            if category == 'dataset':
+                result['lifecycle'] = None
+            return result
+
+        modalities = self._modality_votes(metadata)
+        if len(modalities) != 1:
+            return None
+        modality = modalities.pop()
+        if category == 'model':
+            return {
+                'valid': True,
+                'modality': modality.value,
+                'reason': 'Rule: card metadata',
+            }
+
+        lifecycles = self._lifecycle_votes(metadata)
+        if len(lifecycles) != 1:
+            return None
+        return {
+            'valid': True,
+            'modality': modality.value,
+            'lifecycle': lifecycles.pop().value,
+            'reason': 'Rule: card metadata',
+        }
@@ -1,13 +1,20 @@
 """OSIR-LMTS data aggregation and processing pipeline."""
 
 from datetime import datetime, timedelta
-from typing import Literal
+from typing import Any, Literal
 
+import copy
 import csv
+import io
 import json
+import multiprocessing
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from dataclasses import asdict, dataclass, field
+from collections.abc import Callable, Collection, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from itertools import repeat
 from pathlib import Path
 
 import jsonlines
@@ -17,6 +24,7 @@ from .osir_lmts_data import (
     RawDataPoint,
     ModelInfo,
     DatasetInfo,
+    ExtraLabels,
     ModelSummaryRow,
     ModelSummaryTable,
     DatasetSummaryRow,
@@ -26,15 +34,128 @@ from .osir_lmts_data import (
     EvalSummaryRow,
     EvalSummaryTable,
     BaseSummaryTable,
+    intern_label,
 )
+from .osir_lmts_cache import load_raw_columns
+from .osir_lmts_columnar import aggregate_month, load_raw_frame, summary_tables
+from .osir_lmts_pipeline import PROFILE_NAME, Pipeline, PipelineReport, Stage
+from .osir_lmts_universe import UNIVERSES_FILE, org_universes, rank_universes
 from ..data_utils import Lifecycle, Modality
 from ..utils import OrgInfo
 from .osir_lmts_rank import (
     OsirLmtsRankStrategy,
     DefaultRankStrategy,
+    get_rank_strategy_for_month,
 )
 
 
+def _read_raw_data_file(
+    file_path: Path, target_month: str, parse_cache: bool = False
+) -> dict[str, RawDataPoint]:
+    """Parse a raw_*_data.jsonl file of a snapshot directory, without the extra info.
+
+    With `parse_cache`, the parsed columns are read from (or written to) the file's sidecar
+    cache, see osir_lmts_cache.
+    """
+    result = {}
+    if not file_path.exists():
+        return result
+    platform = intern_label(file_path.parent.name.split('_')[0])
+    columns = load_raw_columns(file_path) if parse_cache else None
+    if columns is not None:
+        return columns.data_points(platform, target_month)
+
+    with jsonlines.open(file_path) as f:
+        for line in f:
+            if not line.get('valid', True):
+                continue
+
+            repo = line.get('repo', '')
+            name = line.get('name', '')
+            identifier = f'{repo}/{name}' if repo and name else name or repo
+
+            if not identifier:
+                continue
+
+            likes = line.get('likes', 0)
+            if likes and likes < 0:
+                likes = 0
+
+            result[identifier] = RawDataPoint(
+                identifier=identifier,
+                repo=intern_label(repo),
+                name=name,
+                platform=platform,
+                date_crawl=intern_label(line.get('date_crawl', target_month)),
+                downloads_last_month=line.get('downloads_last_month'),
+                downloads_total=line.get('downloads'),
+                likes=likes,
+                discussions=line.get('discussions', 0),
+                modality=intern_label(line.get('modality')),
+                lifecycle=intern_label(line.get('lifecycle')),
+                valid=line.get('valid', True),
+            )
+
+    return result
+
+
+def _accumulate[Info: (ModelInfo, DatasetInfo)](info: Info, prev: Info | None) -> Info:
+    """Acc data of an identifier from its monthly data and the previous month's acc data."""
+    acc_downloads = info.downloads_last_month or 0
+    if prev and prev.downloads_last_month is not None:
+        acc_downloads += prev.downloads_last_month
+
+    acc_likes = info.likes
+    if prev and prev.likes is not None:
+        if acc_likes is None:
+            acc_likes = prev.likes
+        else:
+            acc_likes = max(acc_likes, prev.likes)
+
+    acc_discussions = info.discussions
+    if prev and prev.discussions is not None:
+        if acc_discussions is None:
+            acc_discussions = prev.discussions
+        else:
+            acc_discussions = max(acc_discussions, prev.discussions)
+
+    return replace(
+        info,
+        downloads_last_month=acc_downloads if acc_downloads > 0 else None,
+        likes=acc_likes,
+        discussions=acc_discussions,
+    )
+
+
+def month_range(start: str, end: str) -> list[str]:
+    """The months from `start` to `end` included, in YYYY-MM format."""
+    months = pd.period_range(start, end, freq='M')
+    if months.empty:
+        raise ValueError(f'Empty month range {start} to {end}')
+    return [str(month) for month in months]
+
+
+# The stages that only depend on raw files and configuration
+DATA_STAGES = ('model_data', 'dataset_data')
+
+
+def _run_data_stages(
+    processor: 'OsirLmtsProcessor', force: bool, profile: bool = False
+) -> PipelineReport:
+    """Generate the model/dataset data of a month, in a worker process of a backfill."""
+    processor.workers = 1
+    _, report = processor._run_pipeline(
+        DefaultRankStrategy(), force=force, only=set(DATA_STAGES), profile=profile
+    )
+    return report
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers are started by a fork server, not forked from this process,
+    which already runs NumPy/BLAS and pipeline threads."""
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('forkserver'))
+
+
 class OsirLmtsProcessor:
     def __init__(
         self,
@@ -42,28 +163,64 @@ class OsirLmtsProcessor:
         target_orgs: list[str] | None = None,
         output_root: Path = Path('./output'),
         config_root: Path = Path('./config'),
+        engine: Literal['python', 'columnar'] = 'python',
+        workers: int = 1,
+        parse_cache: bool = True,
     ):
         self.output_root = Path(output_root)
         self.config_root = Path(config_root)
-
-        self.target_month = target_month
+        # 'columnar' aggregates model/dataset data with pandas (see osir_lmts_columnar), which
+        # writes the same files as the row-wise 'python' engine in a fraction of the time
+        if engine not in ('python', 'columnar'):
+            raise ValueError(f'Unknown aggregation engine: {engine}')
+        self.engine = engine
+        # Processes parsing the raw files of the snapshot directories in `gen_month_data`
+        self.workers = workers
+        # Keep the parsed raw files in sidecar raw_*_data.cache.npz files (see osir_lmts_cache)
+        self.parse_cache = parse_cache
+        self._pool: ProcessPoolExecutor | None = None
         self.target_orgs = target_orgs
-        self.target_date = datetime.strptime(self.target_month, '%Y-%m')
-        self.year = self.target_date.year
-        self.month = self.target_date.month
-        self.out_dir = self.output_root / f'osir-lmts_{self.target_month}'
-        self.out_dir.mkdir(parents=True, exist_ok=True)
+        # Set in a cascade, where the acc data of later months is patched
+        self._track_acc_changes = False
+        self._set_target_month(target_month)
 
         self._org_map: dict[str, str] = {}
         self._org_metadata: dict[str, dict] = {}
         self._model_descendants: dict[str, int] = {}
         self._dataset_descendants: dict[str, int] = {}
-        self._model_extra_info: dict[str, dict] = {}
-        self._dataset_extra_info: dict[str, dict] = {}
+        self._model_extra_info: dict[str, ExtraLabels] = {}
+        self._dataset_extra_info: dict[str, ExtraLabels] = {}
         self._org_list: list[OrgInfo] = []
+        # Organization universes ranked on their own, e.g. CN (see osir_lmts_universe)
+        self._universes: dict[str, set[str]] = {}
 
         self._load_configs()
 
+    def _set_target_month(self, target_month: str) -> None:
+        self.target_month = target_month
+        self.target_date = datetime.strptime(self.target_month, '%Y-%m')
+        self.year = self.target_date.year
+        self.month = self.target_date.month
+        self.out_dir = self.output_root / f'osir-lmts_{self.target_month}'
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        self._previous_month_data: dict[tuple[str, str], dict[str, RawDataPoint]] = {}
+        # CSV text of the summaries and ranks written for this month
+        self._written_csv: dict[str, str] = {}
+        # What the previous month's processor computed, in a backfill
+        self._previous_csv: dict[str, str] = {}
+        self._previous_result: Callable[[str], Any] | None = None
+        # Acc entries changed by this month / the previous month of a cascade, None if removed
+        self._acc_changes: dict[str, dict[str, Any]] = {}
+        self._previous_acc_changes: dict[str, dict[str, Any]] = {}
+
+    def for_month(self, target_month: str) -> 'OsirLmtsProcessor':
+        """A processor for another month, sharing the configuration loaded by this one."""
+        processor = copy.copy(self)
+        processor._pool = None
+        processor._set_target_month(target_month)
+        return processor
+
     def _load_configs(self):
         """Load configuration files."""
         self._org_list = OrgInfo.build_org_info_list_from_yaml(self.config_root / 'orgs.yaml')
@@ -71,6 +228,7 @@ class OsirLmtsProcessor:
         ms_org_map = OrgInfo.build_repo_org_map(self._org_list, 'modelscope')
         self._org_map.update(ms_org_map)
         self._org_metadata = OrgInfo.build_org_metadata(self._org_list)
+        self._universes = org_universes(self._org_list, self.config_root)
 
         descendants_path = self.config_root / 'model_descendants.jsonl'
         if descendants_path.exists():
@@ -91,14 +249,14 @@ class OsirLmtsProcessor:
             with jsonlines.open(info_path) as f:
                 for line in f:
                     key = f'{line["repo"]}/{line["name"]}'
-                    self._model_extra_info[key] = line
+                    self._model_extra_info[key] = ExtraLabels.from_dict(line)
 
         info_path = self.config_root / 'dataset_info.jsonl'
         if info_path.exists():
             with jsonlines.open(info_path) as f:
                 for line in f:
                     key = f'{line["repo"]}/{line["name"]}'
-                    self._dataset_extra_info[key] = line
+                    self._dataset_extra_info[key] = ExtraLabels.from_dict(line)
 
     def _find_month_directories(self) -> list[Path]:
         """Find all output directories for the target month."""
@@ -118,13 +276,12 @@ class OsirLmtsProcessor:
                     continue
         return sorted(dirs)
 
-    def _find_previous_month_data(
-        self, identifier: str, platform: str, category: str
-    ) -> RawDataPoint | None:
-        """Find data from the previous month for a specific platform."""
+    def _previous_month_directories(self, platform: str) -> list[Path]:
+        """Output directories of a platform for the month before the target month."""
         first_day_of_month = self.target_date.replace(day=1)
         prev_month_date = first_day_of_month - timedelta(days=1)
 
+        dirs = []
         for child in self.output_root.iterdir():
             if not child.is_dir():
                 continue
@@ -133,78 +290,65 @@ class OsirLmtsProcessor:
             try:
                 date_str = child.name.split('_', 1)[1]
                 dir_date = datetime.strptime(date_str, '%Y-%m-%d')
-                if (
-                    dir_date.year == prev_month_date.year
-                    and dir_date.month == prev_month_date.month
-                ):
-                    data = self._load_raw_data_from_dir(child, category)  # type: ignore
-                    if identifier in data:
-                        return data[identifier]
             except (ValueError, IndexError):
                 continue
-        return None
+            if dir_date.year == prev_month_date.year and dir_date.month == prev_month_date.month:
+                dirs.append(child)
+        return dirs
+
+    def _find_previous_month_data(
+        self, identifier: str, platform: str, category: str
+    ) -> RawDataPoint | None:
+        """Find data from the previous month for a specific platform."""
+        key = (platform, category)
+        if key not in self._previous_month_data:
+            # The first directory listing an identifier wins, as they are searched in order
+            merged: dict[str, RawDataPoint] = {}
+            for data in self._load_raw_data_from_dirs(
+                self._previous_month_directories(platform), category  # type: ignore
+            ):
+                for dp_identifier, dp in data.items():
+                    merged.setdefault(dp_identifier, dp)
+            self._previous_month_data[key] = merged
+        return self._previous_month_data[key].get(identifier)
+
+    def _map_files(self, func: Callable, file_paths: list[Path], *args) -> list:
+        """`func(file_path, *args)` for every file, in order, in the worker pool if open."""
+        if self._pool is None or len(file_paths) < 2:
+            return [func(file_path, *args) for file_path in file_paths]
+        return list(self._pool.map(func, file_paths, *(repeat(arg) for arg in args)))
+
+    def _apply_extra_info(
+        self, data: dict[str, RawDataPoint], category: Literal['model', 'dataset']
+    ) -> dict[str, RawDataPoint]:
+        extra_infos = self._model_extra_info if category == 'model' else self._dataset_extra_info
+        for identifier, dp in data.items():
+            extra_info = extra_infos.get(identifier)
+            if extra_info:
+                if extra_info.modality:
+                    dp.modality = extra_info.modality
+                if extra_info.lifecycle:
+                    dp.lifecycle = extra_info.lifecycle
+                dp.valid = extra_info.valid
+        return data
+
+    def _load_raw_data_from_dirs(
+        self, dirs: list[Path], category: Literal['model', 'dataset']
+    ) -> list[dict[str, RawDataPoint]]:
+        """Load raw data from several directories, in the order of `dirs`."""
+        loaded = self._map_files(
+            _read_raw_data_file,
+            [dir_path / f'raw_{category}_data.jsonl' for dir_path in dirs],
+            self.target_month,
+            self.parse_cache,
+        )
+        return [self._apply_extra_info(data, category) for data in loaded]
 
     def _load_raw_data_from_dir(
         self, dir_path: Path, category: Literal['model', 'dataset']
     ) -> dict[str, RawDataPoint]:
         """Load raw data from a single directory."""
-        result = {}
-        platform = dir_path.name.split('_')[0]
-        file_path = dir_path / f'raw_{category}_data.jsonl'
-
-        if not file_path.exists():
-            return result
-
-        with jsonlines.open(file_path) as f:
-            for line in f:
-                if not line.get('valid', True):
-                    continue
-
-                repo = line.get('repo', '')
-                name = line.get('name', '')
-                identifier = f'{repo}/{name}' if repo and name else name or repo
-
-                if not identifier:
-                    continue
-
-                downloads_last_month = line.get('downloads_last_month')
-                downloads_total = line.get('downloads')
-
-                likes = line.get('likes', 0)
-                if likes and likes < 0:
-                    likes = 0
-
-                dp = RawDataPoint(
-                    identifier=identifier,
-                    repo=repo,
-                    name=name,
-                    platform=platform,
-                    date_crawl=line.get('date_crawl', self.target_month),
-                    downloads_last_month=downloads_last_month,
-                    downloads_total=downloads_total,
-                    likes=likes,
-                    discussions=line.get('discussions', 0),
-                    modality=line.get('modality'),
-                    lifecycle=line.get('lifecycle'),
-                    valid=line.get('valid', True),
-                )
-
-                extra_info = None
-                if category == 'model' and identifier in self._model_extra_info:
-                    extra_info = self._model_extra_info[identifier]
-                elif category == 'dataset' and identifier in self._dataset_extra_info:
-                    extra_info = self._dataset_extra_info[identifier]
-
-                if extra_info:
-                    if extra_info.get('modality'):
-                        dp.modality = extra_info['modality']
-                    if extra_info.get('lifecycle'):
-                        dp.lifecycle = extra_info['lifecycle']
-                    dp.valid = extra_info.get('valid', True)
-
-                result[identifier] = dp
-
-        return result
+        return self._load_raw_data_from_dirs([dir_path], category)[0]
 
     def _aggregate_raw_data(
         self, category: Literal['model', 'dataset']
@@ -213,8 +357,7 @@ class OsirLmtsProcessor:
         aggregated: dict[str, list[RawDataPoint]] = defaultdict(list)
         dirs = self._find_month_directories()
 
-        for dir_path in dirs:
-            data = self._load_raw_data_from_dir(dir_path, category)
+        for data in self._load_raw_data_from_dirs(dirs, category):
             for identifier, dp in data.items():
                 aggregated[identifier].append(dp)
 
@@ -235,8 +378,7 @@ class OsirLmtsProcessor:
 
         return None
 
-    def gen_model_data(self) -> list[ModelInfo]:
-        """Generate model_data.jsonl."""
+    def _aggregate_model_infos(self) -> list[ModelInfo]:
         aggregated = self._aggregate_raw_data('model')
         model_infos = []
 
@@ -274,8 +416,8 @@ class OsirLmtsProcessor:
 
             if identifier in self._model_extra_info:
                 extra = self._model_extra_info[identifier]
-                if extra.get('modality'):
-                    modality = extra['modality']
+                if extra.modality:
+                    modality = extra.modality
 
             descendants = self._model_descendants.get(identifier, 0)
 
@@ -290,6 +432,25 @@ class OsirLmtsProcessor:
             )
             model_infos.append(model_info)
 
+        return model_infos
+
+    def gen_model_data(self) -> list[ModelInfo]:
+        """Generate model_data.jsonl."""
+        if self.engine == 'columnar':
+            model_infos = aggregate_month(
+                'model',
+                self._find_month_directories(),
+                self._previous_month_directories,
+                self.target_month,
+                self._model_extra_info,
+                self._model_descendants,
+                self._org_map,
+                self.target_orgs,
+                self._load_raw_frames,
+            )
+        else:
+            model_infos = self._aggregate_model_infos()
+
         with jsonlines.open(self.out_dir / 'model_data.jsonl', 'w') as f:
             for mi in model_infos:
                 f.write(mi.to_dict())
@@ -297,8 +458,7 @@ class OsirLmtsProcessor:
         logger.info(f'Generated model_data.jsonl with {len(model_infos)} entries')
         return model_infos
 
-    def gen_dataset_data(self) -> list[DatasetInfo]:
-        """Generate dataset_data.jsonl."""
+    def _aggregate_dataset_infos(self) -> list[DatasetInfo]:
         aggregated = self._aggregate_raw_data('dataset')
         dataset_infos = []
 
@@ -339,10 +499,10 @@ class OsirLmtsProcessor:
 
             if identifier in self._dataset_extra_info:
                 extra = self._dataset_extra_info[identifier]
-                if extra.get('modality'):
-                    modality = extra['modality']
-                if extra.get('lifecycle'):
-                    lifecycle = extra['lifecycle']
+                if extra.modality:
+                    modality = extra.modality
+                if extra.lifecycle:
+                    lifecycle = extra.lifecycle
 
             descendants = self._dataset_descendants.get(identifier, 0)
 
@@ -358,6 +518,28 @@ class OsirLmtsProcessor:
             )
             dataset_infos.append(dataset_info)
 
+        return dataset_infos
+
+    def _load_raw_frames(self, file_paths: list[Path]) -> list[pd.DataFrame]:
+        return self._map_files(load_raw_frame, file_paths, self.target_month, self.parse_cache)
+
+    def gen_dataset_data(self) -> list[DatasetInfo]:
+        """Generate dataset_data.jsonl."""
+        if self.engine == 'columnar':
+            dataset_infos = aggregate_month(
+                'dataset',
+                self._find_month_directories(),
+                self._previous_month_directories,
+                self.target_month,
+                self._dataset_extra_info,
+                self._dataset_descendants,
+                self._org_map,
+                self.target_orgs,
+                self._load_raw_frames,
+            )
+        else:
+            dataset_infos = self._aggregate_dataset_infos()
+
         with jsonlines.open(self.out_dir / 'dataset_data.jsonl', 'w') as f:
             for di in dataset_infos:
                 f.write(di.to_dict())
@@ -365,16 +547,48 @@ class OsirLmtsProcessor:
         logger.info(f'Generated dataset_data.jsonl with {len(dataset_infos)} entries')
         return dataset_infos
 
+    @contextmanager
+    def _worker_pool(self) -> Iterator[None]:
+        """Parse raw files in a pool of `workers` processes within the context."""
+        if self.workers <= 1 or self._pool is not None:
+            yield
+            return
+        with _process_pool(self.workers) as pool:
+            self._pool = pool
+            try:
+                yield
+            finally:
+                self._pool = None
+
+    def gen_month_data(self) -> tuple[list[ModelInfo], list[DatasetInfo]]:
+        """Generate model_data.jsonl and dataset_data.jsonl.
+
+        With several workers, the raw files are parsed in a process pool and both are
+        aggregated at the same time.
+        """
+        if self.workers <= 1:
+            return self.gen_model_data(), self.gen_dataset_data()
+
+        with self._worker_pool(), ThreadPoolExecutor(2) as threads:
+            model_future = threads.submit(self.gen_model_data)
+            dataset_future = threads.submit(self.gen_dataset_data)
+            return model_future.result(), dataset_future.result()
+
+    def _previous_out_dir(self) -> Path:
+        """Output directory of the month before the target month."""
+        prev_month_date = self.target_date.replace(day=1) - timedelta(days=1)
+        return self.output_root / f'osir-lmts_{prev_month_date.strftime("%Y-%m")}'
+
     def _load_previous_acc_data(
         self, category: Literal['model', 'dataset']
     ) -> dict[str, ModelInfo | DatasetInfo]:
         """Load accumulated data from previous month."""
         result = {}
-        first_day_of_month = self.target_date.replace(day=1)
-        prev_month_date = first_day_of_month - timedelta(days=1)
-        prev_month_str = prev_month_date.strftime('%Y-%m')
-        prev_dir = self.output_root / f'osir-lmts_{prev_month_str}'
-        file_path = prev_dir / f'acc_{category}_data.jsonl'
+        if self._previous_result is not None:
+            for info in self._previous_result(f'acc_{category}_data'):
+                result[info.identifier] = info
+            return result
+        file_path = self._previous_out_dir() / f'acc_{category}_data.jsonl'
 
         if not file_path.exists():
             return result
@@ -391,93 +605,75 @@ class OsirLmtsProcessor:
 
         return result
 
-    def gen_acc_model_data(self, model_infos: list[ModelInfo]) -> list[ModelInfo]:
-        """Generate acc_model_data.jsonl with accumulated downloads."""
-        prev_acc = self._load_previous_acc_data('model')
-        acc_infos: list[ModelInfo] = []
-
-        for mi in model_infos:
-            prev = prev_acc.get(mi.identifier)
-
-            acc_downloads = mi.downloads_last_month or 0
-            if prev and prev.downloads_last_month is not None:
-                acc_downloads += prev.downloads_last_month
-
-            acc_likes = mi.likes
-            if prev and prev.likes is not None:
-                if acc_likes is None:
-                    acc_likes = prev.likes
-                else:
-                    acc_likes = max(acc_likes, prev.likes)
-
-            acc_discussions = mi.discussions
-            if prev and prev.discussions is not None:
-                if acc_discussions is None:
-                    acc_discussions = prev.discussions
-                else:
-                    acc_discussions = max(acc_discussions, prev.discussions)
-
-            acc_info = ModelInfo(
-                identifier=mi.identifier,
-                date_crawl=mi.date_crawl,
-                downloads_last_month=acc_downloads if acc_downloads > 0 else None,
-                likes=acc_likes,
-                discussions=acc_discussions,
-                descendants=mi.descendants,
-                modality=mi.modality,
-            )
-            acc_infos.append(acc_info)
-
-        with jsonlines.open(self.out_dir / 'acc_model_data.jsonl', 'w') as f:
+    def _write_acc_data(
+        self, category: Literal['model', 'dataset'], acc_infos: list[ModelInfo] | list[DatasetInfo]
+    ) -> None:
+        filename = f'acc_{category}_data.jsonl'
+        if self._track_acc_changes:
+            # Entries that differ from the file being replaced, for the next month to patch
+            old = {}
+            if (self.out_dir / filename).exists():
+                info_cls = ModelInfo if category == 'model' else DatasetInfo
+                old = {ai.identifier: ai for ai in self._read_infos(filename, info_cls.from_acc_dict)}
+            changes: dict[str, ModelInfo | DatasetInfo | None] = {
+                ai.identifier: ai for ai in acc_infos if old.pop(ai.identifier, None) != ai
+            }
+            changes.update(dict.fromkeys(old))
+            self._acc_changes[category] = changes
+
+        with jsonlines.open(self.out_dir / filename, 'w') as f:
             for ai in acc_infos:
                 f.write(ai.to_acc_dict())
 
+    def gen_acc_model_data(self, model_infos: list[ModelInfo]) -> list[ModelInfo]:
+        """Generate acc_model_data.jsonl with accumulated downloads."""
+        prev_acc = self._load_previous_acc_data('model')
+        acc_infos = [_accumulate(mi, prev_acc.get(mi.identifier)) for mi in model_infos]
+        self._write_acc_data('model', acc_infos)
         logger.info(f'Generated acc_model_data.jsonl with {len(acc_infos)} entries')
         return acc_infos
 
     def gen_acc_dataset_data(self, dataset_infos: list[DatasetInfo]) -> list[DatasetInfo]:
         """Generate acc_dataset_data.jsonl with accumulated downloads."""
         prev_acc = self._load_previous_acc_data('dataset')
-        acc_infos: list[DatasetInfo] = []
-
-        for di in dataset_infos:
-            prev = prev_acc.get(di.identifier)
-
-            acc_downloads = di.downloads_last_month or 0
-            if prev and prev.downloads_last_month is not None:
-                acc_downloads += prev.downloads_last_month
-
-            acc_likes = di.likes
-            if prev and prev.likes is not None:
-                if acc_likes is None:
-                    acc_likes = prev.likes
-                else:
-                    acc_likes = max(acc_likes, prev.likes)
-
-            acc_discussions = di.discussions
-            if prev and prev.discussions is not None:
-                if acc_discussions is None:
-                    acc_discussions = prev.discussions
-                else:
-                    acc_discussions = max(acc_discussions, prev.discussions)
-
-            acc_info = DatasetInfo(
-                identifier=di.identifier,
-                date_crawl=di.date_crawl,
-                downloads_last_month=acc_downloads if acc_downloads > 0 else None,
-                likes=acc_likes,
-                discussions=acc_discussions,
-                descendants=di.descendants,
-                modality=di.modality,
-                lifecycle=di.lifecycle,
-            )
-            acc_infos.append(acc_info)
+        acc_infos = [_accumulate(di, prev_acc.get(di.identifier)) for di in dataset_infos]
+        self._write_acc_data('dataset', acc_infos)
+        logger.info(f'Generated acc_dataset_data.jsonl with {len(acc_infos)} entries')
+        return acc_infos
 
-        with jsonlines.open(self.out_dir / 'acc_dataset_data.jsonl', 'w') as f:
-            for ai in acc_infos:
-                f.write(ai.to_acc_dict())
+    def patch_acc_data(
+        self,
+        category: Literal['model', 'dataset'],
+        infos: list[ModelInfo] | list[DatasetInfo],
+        changed_inputs: list[str],
+    ) -> list[ModelInfo] | list[DatasetInfo] | None:
+        """Update acc data for the entries of the previous month's acc data that changed.
+
+        Only applies when the previous acc data is the only changed input and the previous
+        processor of a cascade recorded its changes; returns None otherwise.
+        """
+        previous_path = self._previous_out_dir() / f'acc_{category}_data.jsonl'
+        changes = self._previous_acc_changes.get(category)
+        if changes is None or changed_inputs != [str(previous_path)]:
+            return None
+        filename = f'acc_{category}_data.jsonl'
+        info_cls = ModelInfo if category == 'model' else DatasetInfo
+        acc_infos = self._read_infos(filename, info_cls.from_acc_dict)
+        if [ai.identifier for ai in acc_infos] != [info.identifier for info in infos]:
+            return None
 
-        logger.info(f'Generated acc_dataset_data.jsonl with {len(acc_infos)} entries')
+        own_changes = {}
+        for idx, info in enumerate(infos):
+            if info.identifier in changes:
+                acc_info = _accumulate(info, changes[info.identifier])
+                if acc_info != acc_infos[idx]:
+                    acc_infos[idx] = own_changes[info.identifier] = acc_info
+        self._acc_changes[category] = own_changes
+        if own_changes:
+            with jsonlines.open(self.out_dir / filename, 'w') as f:
+                for ai in acc_infos:
+                    f.write(ai.to_acc_dict())
+        logger.info(f'Patched {len(own_changes)} entries of {filename}')
         return acc_infos
 
     def _get_org_for_identifier(self, identifier: str) -> str:
@@ -505,6 +701,7 @@ class OsirLmtsProcessor:
     ) -> ModelSummaryTable:
         """Generate model_summary.csv."""
         org_data = ModelSummaryRow.get_defaultdict()
+        modality_key_map = ModelSummaryRow.get_modality_key_map()
 
         for mi in model_infos:
             org = self._get_org_for_identifier(mi.identifier)
@@ -519,7 +716,6 @@ class OsirLmtsProcessor:
             org_data[org]['issue'] += discussions
             org_data[org]['descendants'] += descendants
 
-            modality_key_map = ModelSummaryRow.get_modality_key_map()
             mod_key = modality_key_map.get(modality)
             if mod_key:
                 org_data[org][f'downloads_{mod_key}'] += downloads
@@ -545,7 +741,7 @@ class OsirLmtsProcessor:
 
         if write_csv:
             filename = f'{prefix}model_summary.csv' if prefix else 'model_summary.csv'
-            table.to_csv(self.out_dir / filename, others_as_float=False)
+            self._write_table(table, filename, others_as_float=False)
             logger.info(f'Generated {filename} with {len(rows)} rows')
 
         return table
@@ -558,6 +754,8 @@ class OsirLmtsProcessor:
     ) -> DatasetSummaryTable:
         """Generate dataset_summary.csv using pandas."""
         org_data = DatasetSummaryRow.get_defaultdict()
+        modality_key_map = DatasetSummaryRow.get_modality_key_map()
+        lifecycle_key_map = DatasetSummaryRow.get_lifecycle_key_map()
 
         for di in dataset_infos:
             org = self._get_org_for_identifier(di.identifier)
@@ -567,37 +765,30 @@ class OsirLmtsProcessor:
             downloads = di.downloads_last_month or 0
             org_data[org]['dataset_usage'] += 1
 
-            modality_key_map = DatasetSummaryRow.get_modality_key_map()
             mod_key = modality_key_map.get(modality)
             if mod_key:
                 org_data[org][f'num_{mod_key}'] += 1
                 org_data[org][f'downloads_{mod_key}'] += downloads
 
-            lifecycle_key_map = DatasetSummaryRow.get_lifecycle_key_map()
             lc_key = lifecycle_key_map.get(lifecycle)
             if lc_key:
                 org_data[org][f'num_{lc_key}'] += 1
                 org_data[org][f'downloads_{lc_key}'] += downloads
 
         other_datasets = self._load_other_source_datasets()
+        config_orgs = {org_info.org for org_info in self._org_list}
         for ds in other_datasets:
             org = ds.get('org', 'Unknown')
             modality = ds.get('modality', 'Unknown')
             lifecycle = ds.get('lifecycle', 'Unknown')
 
-            if org not in org_data:
-                for org_info in self._org_list:
-                    if org_info.org == org:
-                        break
-                else:
-                    continue
+            if org not in org_data and org not in config_orgs:
+                continue
 
-            modality_key_map = DatasetSummaryRow.get_modality_key_map()
             mod_key = modality_key_map.get(modality)
             if mod_key:
                 org_data[org][f'num_{mod_key}'] += 1
 
-            lifecycle_key_map = DatasetSummaryRow.get_lifecycle_key_map()
             lc_key = lifecycle_key_map.get(lifecycle)
             if lc_key:
                 org_data[org][f'num_{lc_key}'] += 1
@@ -622,11 +813,50 @@ class OsirLmtsProcessor:
 
         if write_csv:
             filename = f'{prefix}dataset_summary.csv' if prefix else 'dataset_summary.csv'
-            table.to_csv(self.out_dir / filename, others_as_float=False)
+            self._write_table(table, filename, others_as_float=False)
             logger.info(f'Generated {filename} with {len(rows)} rows')
 
         return table
 
+    def summary_data(
+        self,
+        category: Literal['model', 'dataset'],
+        infos: list[ModelInfo] | list[DatasetInfo],
+        acc_infos: list[ModelInfo] | list[DatasetInfo],
+        write_csv: bool = True,
+    ) -> tuple[BaseSummaryTable, BaseSummaryTable]:
+        """Generate {category}_summary.csv and acc_{category}_summary.csv.
+
+        The columnar engine builds both tables in one pivot over the month and accumulated infos.
+        """
+        if self.engine != 'columnar':
+            summarize = (
+                self.summary_model_data if category == 'model' else self.summary_dataset_data
+            )
+            return (
+                summarize(infos, write_csv=write_csv),  # type: ignore
+                summarize(acc_infos, prefix='acc_', write_csv=write_csv),  # type: ignore
+            )
+
+        orgs = [
+            org_info.org
+            for org_info in self._org_list
+            if not self.target_orgs or org_info.org in self.target_orgs
+        ]
+        tables = summary_tables(
+            category,
+            {'': infos, 'acc_': acc_infos},
+            self._org_map,
+            orgs,
+            self._org_metadata,
+            self._load_other_source_datasets() if category == 'dataset' else None,
+        )
+        if write_csv:
+            for prefix, table in tables.items():
+                self._write_table(table, f'{prefix}{category}_summary.csv', others_as_float=False)
+                logger.info(f'Generated {prefix}{category}_summary.csv with {len(table.rows)} rows')
+        return tables[''], tables['acc_']
+
     def summary_infra_data(
         self,
         infra_source_path: Path | None = None,
@@ -679,13 +909,20 @@ class OsirLmtsProcessor:
 
         return table
 
+    def _write_table(
+        self, table: BaseSummaryTable, filename: str, others_as_float: bool = True
+    ) -> None:
+        """Write a summary or rank table, keeping its CSV text for the next month."""
+        text = table.to_dataframe(others_as_float).to_csv()
+        with open(self.out_dir / filename, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        self._written_csv[filename] = text
+
     def _load_prev_month_summary(self, filename: str) -> pd.DataFrame | None:
         """Load summary data from previous month."""
-        first_day_of_month = self.target_date.replace(day=1)
-        prev_month_date = first_day_of_month - timedelta(days=1)
-        prev_month_str = prev_month_date.strftime('%Y-%m')
-        prev_dir = self.output_root / f'osir-lmts_{prev_month_str}'
-        prev_file = prev_dir / filename
+        if filename in self._previous_csv:
+            return pd.read_csv(io.StringIO(self._previous_csv[filename]), index_col='org')
+        prev_file = self._previous_out_dir() / filename
 
         if not prev_file.exists():
             logger.warning(
@@ -765,9 +1002,9 @@ class OsirLmtsProcessor:
             dataset_rank = self._add_rank_metadata(dataset_rank, last_month_dataset_rank_df)
             overall_rank = self._add_rank_metadata(overall_rank, last_month_overall_rank_df)
 
-            model_rank.to_csv(self.out_dir / 'acc_model_rank.csv')
-            dataset_rank.to_csv(self.out_dir / 'acc_dataset_rank.csv')
-            overall_rank.to_csv(self.out_dir / 'acc_overall_rank.csv')
+            self._write_table(model_rank, 'acc_model_rank.csv')
+            self._write_table(dataset_rank, 'acc_dataset_rank.csv')
+            self._write_table(overall_rank, 'acc_overall_rank.csv')
         else:
             last_month_model_rank_df = self._load_prev_month_summary('model_rank.csv')
             last_month_dataset_rank_df = self._load_prev_month_summary('dataset_rank.csv')
@@ -781,11 +1018,37 @@ class OsirLmtsProcessor:
             eval_rank = self._add_rank_metadata(eval_rank, last_month_eval_rank_df)
             overall_rank = self._add_rank_metadata(overall_rank, last_month_overall_rank_df)
 
-            model_rank.to_csv(self.out_dir / 'model_rank.csv')
-            dataset_rank.to_csv(self.out_dir / 'dataset_rank.csv')
-            infra_rank.to_csv(self.out_dir / 'infra_rank.csv')
-            eval_rank.to_csv(self.out_dir / 'eval_rank.csv')
-            overall_rank.to_csv(self.out_dir / 'overall_rank.csv')
+            self._write_table(model_rank, 'model_rank.csv')
+            self._write_table(dataset_rank, 'dataset_rank.csv')
+            self._write_table(infra_rank, 'infra_rank.csv')
+            self._write_table(eval_rank, 'eval_rank.csv')
+            self._write_table(overall_rank, 'overall_rank.csv')
+
+    def gen_rank_for_universes(
+        self,
+        strategy: OsirLmtsRankStrategy,
+        model_table: ModelSummaryTable,
+        dataset_table: DatasetSummaryTable,
+        infra_table: InfraSummaryTable,
+        eval_table: EvalSummaryTable,
+        universes: dict[str, set[str]] | None = None,
+        acc: bool = False,
+    ) -> None:
+        """Write the overall ranking of every organization universe, e.g. CN_overall_rank.csv.
+
+        `universes` maps names to organizations, every country, organization type and custom
+        list of config/org_universes.json by default. Universes without ranked organizations
+        are not written.
+        """
+        if universes is None:
+            universes = self._universes
+        tables = (model_table, dataset_table, infra_table, eval_table)
+        prefix = 'acc_' if acc else ''
+        for name, overall_rank in rank_universes(strategy, tables, universes, acc).items():
+            filename = f'{name}_{prefix}overall_rank.csv'
+            last_month_overall_rank_df = self._load_prev_month_summary(filename)
+            overall_rank = self._add_rank_metadata(overall_rank, last_month_overall_rank_df)
+            self._write_table(overall_rank, filename)
 
     def gen_rank_for_country(
         self,
@@ -798,87 +1061,322 @@ class OsirLmtsProcessor:
         acc: bool = False,
     ) -> None:
         target_orgs = {org_info.org for org_info in self._org_list if org_info.country == country}
+        self.gen_rank_for_universes(
+            strategy,
+            model_table,
+            dataset_table,
+            infra_table,
+            eval_table,
+            {country: target_orgs},
+            acc,
+        )
 
-        filtered_model_table = ModelSummaryTable()
-        for row in model_table.rows:
-            if row.org in target_orgs:
-                filtered_model_table.rows.append(row)
-
-        filtered_dataset_table = DatasetSummaryTable()
-        for row in dataset_table.rows:
-            if row.org in target_orgs:
-                filtered_dataset_table.rows.append(row)
-
-        filtered_infra_table = InfraSummaryTable()
-        for row in infra_table.rows:
-            if row.org in target_orgs:
-                filtered_infra_table.rows.append(row)
-
-        filtered_eval_table = EvalSummaryTable()
-        for row in eval_table.rows:
-            if row.org in target_orgs:
-                filtered_eval_table.rows.append(row)
-
-        model_rank = strategy.rank_model_dim(filtered_model_table, acc=acc)
-        dataset_rank = strategy.rank_dataset_dim(filtered_dataset_table, acc=acc)
-        infra_rank = strategy.rank_infra_dim(filtered_infra_table, acc=acc)
-        eval_rank = strategy.rank_eval_dim(filtered_eval_table, acc=acc)
-        overall_rank = strategy.rank_overall(
-            model_rank, dataset_rank, infra_rank, eval_rank, acc=acc
+    def _summary_source(self, filename: str, source_path: Path | None) -> Path:
+        """The file `summary_infra_data`/`summary_eval_data` read for `source_path`."""
+        if source_path is not None:
+            return source_path
+        if (self.out_dir / filename).exists():
+            return self.out_dir / filename
+        return Path(__file__).parents[3] / filename
+
+    def _read_infos(self, filename: str, from_dict: Callable) -> list:
+        with jsonlines.open(self.out_dir / filename) as f:
+            return [from_dict(line) for line in f]
+
+    def build_stages(
+        self,
+        strategy: OsirLmtsRankStrategy,
+        infra_source_path: Path | None = None,
+        eval_source_path: Path | None = None,
+    ) -> list[Stage]:
+        """The stages of `run`, with the files, stages and parameters each one depends on."""
+        config = self.config_root
+        prev = self._previous_out_dir()
+        strategy_params = {'strategy': strategy.identity()}
+        month_dirs = self._find_month_directories()
+        prev_month_dirs = [
+            child
+            for platform in ['huggingface', 'modelscope', 'baai-datahub']
+            for child in self._previous_month_directories(platform)
+        ]
+        out = self.out_dir
+
+        def no_result() -> None:
+            return None
+
+        stages = []
+        for category, info_cls, summary_cls in (
+            ('model', ModelInfo, ModelSummaryTable),
+            ('dataset', DatasetInfo, DatasetSummaryTable),
+        ):
+            gen_data = self.gen_model_data if category == 'model' else self.gen_dataset_data
+            gen_acc = self.gen_acc_model_data if category == 'model' else self.gen_acc_dataset_data
+            delta = self.delta_model_data if category == 'model' else self.delta_dataset_data
+            summary_files = [config / 'orgs.yaml']
+            if category == 'dataset':
+                summary_files.append(config / 'other_source_datasets.jsonl')
+            stages += [
+                Stage(
+                    f'{category}_data',
+                    run=lambda r, gen_data=gen_data: gen_data(),
+                    load=lambda c=category, cls=info_cls: self._read_infos(
+                        f'{c}_data.jsonl', cls.from_dict
+                    ),
+                    outputs=[f'{category}_data.jsonl'],
+                    files=[d / f'raw_{category}_data.jsonl' for d in month_dirs + prev_month_dirs]
+                    + [
+                        config / 'orgs.yaml',
+                        config / f'{category}_info.jsonl',
+                        config / f'{category}_descendants.jsonl',
+                    ],
+                    params={'target_orgs': self.target_orgs},
+                ),
+                Stage(
+                    f'acc_{category}_data',
+                    run=lambda r, c=category, gen_acc=gen_acc: gen_acc(r[f'{c}_data']),
+                    load=lambda c=category, cls=info_cls: self._read_infos(
+                        f'acc_{c}_data.jsonl', cls.from_acc_dict
+                    ),
+                    outputs=[f'acc_{category}_data.jsonl'],
+                    files=[prev / f'acc_{category}_data.jsonl'],
+                    deps=[f'{category}_data'],
+                    patch=lambda r, changed, c=category: self.patch_acc_data(
+                        c, r[f'{c}_data'], changed
+                    ),
+                ),
+                # The month and accumulated summaries, as a (summary, acc summary) pair
+                Stage(
+                    f'{category}_summary',
+                    run=lambda r, c=category: self.summary_data(
+                        c, r[f'{c}_data'], r[f'acc_{c}_data']
+                    ),
+                    load=lambda c=category, cls=summary_cls: (
+                        cls.from_csv(out / f'{c}_summary.csv'),
+                        cls.from_csv(out / f'acc_{c}_summary.csv'),
+                    ),
+                    outputs=[f'{category}_summary.csv', f'acc_{category}_summary.csv'],
+                    files=summary_files,
+                    deps=[f'{category}_data', f'acc_{category}_data'],
+                    params={'target_orgs': self.target_orgs},
+                ),
+                Stage(
+                    f'delta_{category}_summary',
+                    run=lambda r, c=category, delta=delta: delta(r[f'{c}_summary'][0]),
+                    load=no_result,
+                    outputs=[f'delta_{category}_summary.csv'],
+                    files=[prev / f'{category}_summary.csv'],
+                    deps=[f'{category}_summary'],
+                ),
+            ]
+
+        infra_source = self._summary_source('infra_summary.csv', infra_source_path)
+        eval_source = self._summary_source('eval_summary.csv', eval_source_path)
+        stages += [
+            Stage(
+                'infra_summary',
+                run=lambda r: self.summary_infra_data(infra_source_path),
+                load=lambda: InfraSummaryTable.from_csv(out / 'infra_summary.csv', raw_csv=False),
+                outputs=['infra_summary.csv'],
+                files=[infra_source],
+            ),
+            Stage(
+                'eval_summary',
+                run=lambda r: self.summary_eval_data(eval_source_path),
+                load=lambda: EvalSummaryTable.from_csv(out / 'eval_summary.csv', raw_csv=False),
+                outputs=['eval_summary.csv'],
+                files=[eval_source],
+            ),
+        ]
+
+        dims = ['model', 'dataset', 'infra', 'eval', 'overall']
+        acc_dims = ['model', 'dataset', 'overall']
+        deps = ['model_summary', 'dataset_summary', 'infra_summary', 'eval_summary']
+
+        def tables(r: dict[str, Any], acc: bool) -> list:
+            return [r['model_summary'][acc], r['dataset_summary'][acc], *(r[d] for d in deps[2:])]
+
+        universe_files = {
+            acc: [f'{name}_{prefix}overall_rank.csv' for name in self._universes]
+            for acc, prefix in ((False, ''), (True, 'acc_'))
+        }
+
+        for acc in (False, True):
+            prefix = 'acc_' if acc else ''
+            stages += [
+                Stage(
+                    f'{prefix}rank',
+                    run=lambda r, acc=acc: self.gen_rank(strategy, *tables(r, acc), acc),
+                    load=no_result,
+                    outputs=[f'{prefix}{dim}_rank.csv' for dim in (acc_dims if acc else dims)],
+                    files=[prev / f'{prefix}{dim}_rank.csv' for dim in (acc_dims if acc else dims)],
+                    deps=deps,
+                    params=strategy_params,
+                ),
+                Stage(
+                    f'universe_{prefix}rank',
+                    run=lambda r, acc=acc: self.gen_rank_for_universes(
+                        strategy, *tables(r, acc), acc=acc
+                    ),
+                    load=no_result,
+                    outputs=universe_files[acc],
+                    files=[
+                        config / 'orgs.yaml',
+                        config / UNIVERSES_FILE,
+                        *(prev / filename for filename in universe_files[acc]),
+                    ],
+                    deps=deps,
+                    params=strategy_params,
+                ),
+            ]
+        return stages
+
+    def _run_pipeline(
+        self,
+        strategy: OsirLmtsRankStrategy,
+        infra_source_path: Path | None = None,
+        eval_source_path: Path | None = None,
+        force: bool | Collection[str] = False,
+        only: set[str] | None = None,
+        profile: bool = False,
+    ) -> tuple[Pipeline, PipelineReport]:
+        pipeline = Pipeline(
+            self.out_dir,
+            self.build_stages(strategy, infra_source_path, eval_source_path),
+            force=force,
+            profile=profile,
         )
-        if acc:
-            last_month_overall_rank_df = self._load_prev_month_summary(
-                f'{country}_acc_overall_rank.csv'
-            )
-            overall_rank = self._add_rank_metadata(overall_rank, last_month_overall_rank_df)
-            overall_rank.to_csv(self.out_dir / f'{country}_acc_overall_rank.csv')
-        else:
-            last_month_overall_rank_df = self._load_prev_month_summary(
-                f'{country}_overall_rank.csv'
-            )
-            overall_rank = self._add_rank_metadata(overall_rank, last_month_overall_rank_df)
-            overall_rank.to_csv(self.out_dir / f'{country}_overall_rank.csv')
+        with self._worker_pool():
+            # Independent stages, e.g. model and dataset data, run at the same time
+            report = pipeline.run(parallel=self.workers > 1, only=only)
+        return pipeline, report
 
     def run(
         self,
         strategy: OsirLmtsRankStrategy | None = None,
         infra_source_path: Path | None = None,
         eval_source_path: Path | None = None,
-    ) -> None:
-        """Run the complete OSIR-LMTS pipeline."""
+        force: bool = False,
+        profile: bool = False,
+    ) -> PipelineReport:
+        """Run the complete OSIR-LMTS pipeline.
+
+        Stages whose inputs did not change since the last run are skipped (see
+        `osir_lmts_pipeline`), unless `force` is set. The time taken by every stage is written
+        to pipeline_profile.json; with `profile`, with its peak memory and a cProfile dump of
+        the slowest stage.
+        """
         if strategy is None:
             strategy = DefaultRankStrategy()
 
         logger.info(f'Starting OSIR-LMTS pipeline for {self.target_month}')
+        _, report = self._run_pipeline(
+            strategy, infra_source_path, eval_source_path, force, profile=profile
+        )
+        self._write_profile(report)
+        logger.info(f'OSIR-LMTS pipeline complete. Output in {self.out_dir}')
+        return report
 
-        model_infos = self.gen_model_data()
-        dataset_infos = self.gen_dataset_data()
-
-        acc_model_infos = self.gen_acc_model_data(model_infos)
-        acc_dataset_infos = self.gen_acc_dataset_data(dataset_infos)
-
-        # Generate summary tables
-        model_table = self.summary_model_data(model_infos)
-        dataset_table = self.summary_dataset_data(dataset_infos)
-
-        acc_model_table = self.summary_model_data(acc_model_infos, prefix='acc_')
-        acc_dataset_table = self.summary_dataset_data(acc_dataset_infos, prefix='acc_')
-
-        self.delta_model_data(model_table)
-        self.delta_dataset_data(dataset_table)
-
-        infra_table = self.summary_infra_data(infra_source_path)
-        eval_table = self.summary_eval_data(eval_source_path)
-
-        # Generate rankings
-        self.gen_rank(strategy, model_table, dataset_table, infra_table, eval_table)
-        self.gen_rank(strategy, acc_model_table, acc_dataset_table, infra_table, eval_table, True)
+    def _write_profile(self, report: PipelineReport) -> None:
+        with open(self.out_dir / PROFILE_NAME, 'w', encoding='utf-8') as f:
+            json.dump({'month': self.target_month, **report.profile_dict()}, f, indent=2)
 
-        self.gen_rank_for_country(
-            strategy, model_table, dataset_table, infra_table, eval_table, 'CN'
-        )
-        self.gen_rank_for_country(
-            strategy, acc_model_table, acc_dataset_table, infra_table, eval_table, 'CN', True
-        )
+    def backfill(
+        self,
+        months: list[str],
+        strategy_for_month: Callable[[str], OsirLmtsRankStrategy] = get_rank_strategy_for_month,
+        force: bool = False,
+        profile: bool = False,
+    ) -> dict[str, PipelineReport]:
+        """Run the pipeline for consecutive months, in order, with the configuration loaded once.
+
+        The acc data, summaries and ranks of a month are passed to the next one in memory.
+        The model/dataset data only depend on raw files, so with several workers they are
+        generated for all the months at once first.
+        """
+        early: dict[str, PipelineReport] = {}
+        rest_force: bool | Collection[str] = force
+        if self.workers > 1 and len(months) > 1:
+            logger.info(f'Generating model/dataset data of {len(months)} months')
+            with _process_pool(min(self.workers, len(months))) as pool:
+                processors = [self.for_month(month) for month in months]
+                for month, report in zip(
+                    months, pool.map(_run_data_stages, processors, repeat(force), repeat(profile))
+                ):
+                    early[month] = report
+            if force:
+                # The data stages were just rebuilt, the months only force the later ones
+                stages = self.build_stages(strategy_for_month(months[0]))
+                rest_force = {stage.name for stage in stages} - set(DATA_STAGES)
+
+        reports = self._run_months(months, strategy_for_month, rest_force, profile=profile)
+        for month, report in reports.items():
+            if month in early:
+                ran = early[month].ran
+                reports[month] = PipelineReport(
+                    ran + report.ran,
+                    [name for name in report.skipped if name not in ran],
+                    report.patched,
+                    early[month].changed + report.changed,
+                    {**early[month].profiles, **report.profiles},
+                )
+                self.for_month(month)._write_profile(reports[month])
+        logger.info(f'OSIR-LMTS backfill of {months[0]} to {months[-1]} complete')
+        return reports
 
-        logger.info(f'OSIR-LMTS pipeline complete. Output in {self.out_dir}')
+    def _run_months(
+        self,
+        months: list[str],
+        strategy_for_month: Callable[[str], OsirLmtsRankStrategy],
+        force: bool | Collection[str] = False,
+        cascade: bool = False,
+        profile: bool = False,
+    ) -> dict[str, PipelineReport]:
+        """Run consecutive months in order, passing each month's results to the next in memory.
+
+        With `cascade`, acc data is patched from the previous month's changes, and months after
+        one whose outputs did not change are left alone.
+        """
+        reports = {}
+        previous: OsirLmtsProcessor | None = None
+        previous_pipeline: Pipeline | None = None
+        for month in months:
+            processor = self.for_month(month)
+            processor._track_acc_changes = cascade
+            if previous is not None and previous_pipeline is not None:
+                processor._previous_csv = previous._written_csv
+                processor._previous_acc_changes = previous._acc_changes
+                processor._previous_result = previous_pipeline.result
+            logger.info(f'Starting OSIR-LMTS pipeline for {month}')
+            pipeline, report = processor._run_pipeline(
+                strategy_for_month(month), force=force, profile=profile
+            )
+            processor._write_profile(report)
+            reports[month] = report
+            # Only the previous month is kept in memory
+            processor._previous_result = None
+            previous, previous_pipeline = processor, pipeline
+            if cascade and month != months[0] and not report.changed:
+                logger.info(f'Outputs of {month} unchanged, later months are not affected')
+                break
+        return reports
+
+    def cascade(
+        self,
+        strategy_for_month: Callable[[str], OsirLmtsRankStrategy] = get_rank_strategy_for_month,
+        force: bool = False,
+        profile: bool = False,
+    ) -> dict[str, PipelineReport]:
+        """Rerun the target month after a correction, then the later months it affects.
+
+        Later months are the consecutive ones with an output directory. In each, only the
+        stages whose inputs changed are rerun, and the acc data is patched for the
+        identifiers whose previous acc data changed rather than rebuilt.
+        """
+        months = [self.target_month]
+        while True:
+            month = (pd.Period(months[-1], freq='M') + 1).strftime('%Y-%m')
+            if not (self.output_root / f'osir-lmts_{month}').is_dir():
+                break
+            months.append(month)
+        logger.info(f'Cascading from {months[0]} through {months[-1]}')
+        return self._run_months(months, strategy_for_month, force, cascade=True, profile=profile)
@@ -0,0 +1,283 @@
+"""Binary cache of the parsed raw_*_data.jsonl files of the snapshot directories.
+
+The raw files do not change after the crawl, but every run of `OsirLmtsProcessor` used to
+JSON-decode all of them again. The columns the processor reads are now kept in a sidecar
+`raw_*_data.cache.npz` next to each file: strings are dictionary-encoded (a vocabulary joined in
+one UTF-8 buffer, and one code per row), counts are int64 with a null mask. The arrays are
+memory-mapped on load. The cache is keyed by the size, modification time and SHA-256 of the
+source file, and rebuilt when the source changes.
+"""
+
+import json
+import os
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from .osir_lmts_data import RawDataPoint, intern_label
+from .osir_lmts_pipeline import file_digest
+
+# Bump when the cached columns or the parsing rules change
+CACHE_VERSION = 1
+
+STRING_COLUMNS = ('identifier', 'repo', 'date_crawl', 'modality', 'lifecycle')
+COUNT_COLUMNS = ('downloads_last_month', 'downloads_total', 'likes', 'discussions')
+# Code of a date_crawl missing from its line, which defaults to the target month
+MISSING_DATE = -2
+_SEPARATOR = '\x00'
+_MISSING = object()
+
+
+def cache_path(file_path: Path) -> Path:
+    """The sidecar cache of a raw file, e.g. raw_model_data.cache.npz."""
+    return file_path.with_name(f'{file_path.stem}.cache.npz')
+
+
+class _Unencodable(ValueError):
+    """A line with values the cache cannot represent; such files are parsed every time."""
+
+
+def _encode_strings(values: list[str | None], missing: int = -1) -> dict[str, np.ndarray]:
+    """Vocabulary and codes of a string column; None is coded -1."""
+    vocab: dict[str, int] = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        elif value is _MISSING:
+            codes[i] = missing
+        elif type(value) is not str or _SEPARATOR in value:
+            raise _Unencodable(f'Unexpected value {value!r}')
+        else:
+            codes[i] = vocab.setdefault(value, len(vocab))
+    data = _SEPARATOR.join(vocab).encode('utf-8')
+    return {'codes': codes, 'vocab': np.frombuffer(data, dtype=np.uint8), 'size': len(vocab)}
+
+
+def _encode_counts(values: list[int | None]) -> tuple[np.ndarray, np.ndarray]:
+    mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if any(type(value) is not int for value, null in zip(values, mask) if not null):
+        raise _Unencodable('Counts must be integers')
+    counts = np.fromiter((value or 0 for value in values), dtype=np.int64, count=len(values))
+    return counts, mask
+
+
+@dataclass
+class RawColumns:
+    """The rows of a raw file kept by the processor: valid lines with an identifier, one per
+    identifier, at the position of its first line with the values of its last one."""
+
+    arrays: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.arrays['identifier_codes'])
+
+    def strings(self, column: str, missing: str | None = None) -> list[str | None]:
+        """Decoded values of a string column; `missing` for a date_crawl missing from its line."""
+        vocab = bytes(self.arrays[f'{column}_vocab']).decode('utf-8').split(_SEPARATOR)
+        if int(self.arrays[f'{column}_size']) == 0:
+            vocab = []
+        elif column != 'identifier':
+            # Shared with the other files' rows, see `intern_label`
+            vocab = list(map(intern_label, vocab))
+        # Codes -1 and -2 pick the trailing None and `missing`
+        lookup = np.asarray(vocab + [missing, None], dtype=object)
+        return lookup[self.arrays[f'{column}_codes']].tolist()
+
+    def counts(self, column: str) -> tuple[np.ndarray, np.ndarray]:
+        """Values and null mask of a count column."""
+        return self.arrays[column], self.arrays[f'{column}_null']
+
+    def count_list(self, column: str) -> list[int | None]:
+        values, mask = self.counts(column)
+        return [None if null else value for value, null in zip(values.tolist(), mask.tolist())]
+
+    @classmethod
+    def parse(cls, file_path: Path) -> 'RawColumns':
+        """Parse a raw file with the rules of `osir_lmts._read_raw_data_file`.
+
+        Raises `_Unencodable` for lines whose values the columns cannot represent exactly.
+        """
+        rows: dict[str, tuple] = {}
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for raw in f:
+                line = json.loads(raw)
+                valid = line.get('valid', True)
+                if not valid:
+                    continue
+                if valid is not True:
+                    raise _Unencodable(f'Unexpected valid value {valid!r}')
+                repo = line.get('repo', '')
+                name = line.get('name', '')
+                identifier = f'{repo}/{name}' if repo and name else name or repo
+                if not identifier:
+                    continue
+                if type(repo) is not str or type(name) is not str:
+                    raise _Unencodable('Repository and name must be strings')
+                likes = line.get('likes', 0)
+                if likes and likes < 0:
+                    likes = 0
+                rows[identifier] = (
+                    repo,
+                    line.get('date_crawl', _MISSING),
+                    line.get('modality'),
+                    line.get('lifecycle'),
+                    line.get('downloads_last_month'),
+                    line.get('downloads'),
+                    likes,
+                    line.get('discussions', 0),
+                )
+
+        columns = list(zip(*rows.values())) or [()] * 8
+        arrays: dict[str, np.ndarray] = {}
+        strings = {'identifier': list(rows), **dict(zip(STRING_COLUMNS[1:], columns[:4]))}
+        for column, values in strings.items():
+            missing = MISSING_DATE if column == 'date_crawl' else -1
+            for key, array in _encode_strings(list(values), missing).items():
+                arrays[f'{column}_{key}'] = np.asarray(array)
+        for column, values in zip(COUNT_COLUMNS, columns[4:]):
+            arrays[column], arrays[f'{column}_null'] = _encode_counts(list(values))
+        return cls(arrays)
+
+    def data_points(self, platform: str, target_month: str) -> dict[str, RawDataPoint]:
+        """The rows as `osir_lmts._read_raw_data_file` returns them."""
+        identifiers = self.strings('identifier')
+        repos = self.strings('repo')
+        # identifier is repo/name, or whichever of the two is not empty
+        names = [
+            (identifier[len(repo) + 1 :] if identifier != repo else '') if repo else identifier
+            for identifier, repo in zip(identifiers, repos)
+        ]
+        return {
+            identifier: RawDataPoint(
+                identifier=identifier,
+                repo=repo,  # type: ignore
+                name=name,
+                platform=platform,
+                date_crawl=date_crawl,  # type: ignore
+                downloads_last_month=downloads_last_month,
+                downloads_total=downloads_total,
+                likes=likes,
+                discussions=discussions,
+                modality=modality,  # type: ignore
+                lifecycle=lifecycle,  # type: ignore
+            )
+            for (
+                identifier,
+                repo,
+                name,
+                date_crawl,
+                modality,
+                lifecycle,
+                downloads_last_month,
+                downloads_total,
+                likes,
+                discussions,
+            ) in zip(
+                identifiers,
+                repos,
+                names,
+                self.strings('date_crawl', missing=target_month),
+                self.strings('modality'),
+                self.strings('lifecycle'),
+                *(self.count_list(column) for column in COUNT_COLUMNS),
+            )
+        }
+
+
+def _mmap_npz(path: Path) -> dict[str, np.ndarray]:
+    """Arrays of an uncompressed .npz file, memory-mapped rather than read."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f'Compressed member {info.filename}')
+            # The member data follows its local header and the name and extra fields
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename.removesuffix('.npy')
+            if dtype.hasobject:
+                raise ValueError(f'Object member {name}')
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode='r',
+                offset=f.tell(),
+                shape=shape,
+                order='F' if fortran_order else 'C',
+            )
+    return arrays
+
+
+def _write_cache(path: Path, arrays: dict[str, np.ndarray], key: dict) -> None:
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                **arrays,
+                cache_key=np.frombuffer(json.dumps(key).encode('utf-8'), dtype=np.uint8),
+            )
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f'Could not write parse cache {path}: {e}')
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_raw_columns(file_path: Path) -> RawColumns | None:
+    """The parsed columns of a raw file, from its cache if up to date, else parsed and cached.
+
+    None if the file does not exist or has values the cache cannot represent, in which case
+    the caller parses it directly.
+    """
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    path = cache_path(file_path)
+    arrays = None
+    cached_key = None
+    if path.exists():
+        try:
+            arrays = _mmap_npz(path)
+            cached_key = json.loads(bytes(arrays.pop('cache_key')).decode('utf-8'))
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.debug(f'Ignoring unreadable parse cache {path}: {e}')
+            arrays = None
+
+    key = {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if arrays is not None and cached_key.get('version') == CACHE_VERSION:
+        fresh = cached_key['size'] == key['size'] and cached_key['mtime_ns'] == key['mtime_ns']
+        if not fresh and cached_key['size'] == key['size']:
+            # Touched or copied: the cache is still good if the content is the same
+            key['sha256'] = file_digest(file_path)
+            if cached_key['sha256'] == key['sha256']:
+                arrays = {name: np.asarray(array) for name, array in arrays.items()}
+                _write_cache(path, arrays, {**cached_key, **key})
+                fresh = True
+        if fresh:
+            # A file the columns cannot represent is cached as such, to be parsed directly
+            return None if cached_key.get('unencodable') else RawColumns(arrays)
+
+    key['sha256'] = key.get('sha256') or file_digest(file_path)
+    try:
+        columns = RawColumns.parse(file_path)
+    except _Unencodable as e:
+        logger.debug(f'Not caching the columns of {file_path}: {e}')
+        _write_cache(path, {}, {**key, 'unencodable': True})
+        return None
+    _write_cache(path, columns.arrays, key)
+    return columns
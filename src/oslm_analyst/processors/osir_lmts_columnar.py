@@ -0,0 +1,408 @@
+"""Columnar engine for the per-identifier aggregation of `OsirLmtsProcessor`.
+
+The month's raw files are loaded into one pandas frame, and the per-identifier sums, previous
+month lookup, extra-info override and descendants join are done with groupby/merge instead of
+Python loops over `RawDataPoint`s. The results are the same `ModelInfo`/`DatasetInfo` lists, in
+the same order, as the row-wise implementation, so the written files are byte-identical.
+
+The summaries by organization are built the same way: the infos of the month and the
+accumulated ones go into one frame, and the modality/lifecycle buckets of every organization are
+summed by a single pivot table.
+"""
+
+import json
+from collections.abc import Callable, Sequence
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+
+from .osir_lmts_cache import RawColumns, load_raw_columns
+from .osir_lmts_data import (
+    DatasetInfo,
+    DatasetSummaryRow,
+    DatasetSummaryTable,
+    ExtraLabels,
+    ModelInfo,
+    ModelSummaryRow,
+    ModelSummaryTable,
+    intern_label,
+)
+
+# Parses raw files in order, e.g. in a process pool; `load_raw_frame` one by one by default
+LoadFrames = Callable[[list[Path]], list[pd.DataFrame]]
+
+COUNT_COLUMNS = ('downloads_last_month', 'downloads_total', 'likes', 'discussions')
+LABEL_COLUMNS = ('modality', 'lifecycle')
+# Summed by organization in the summaries, as downloads, likes, issue and descendants
+SUMMED_COLUMNS = ('downloads', 'likes', 'issue', 'descendants')
+SUMMED_ATTRS = ('downloads_last_month', 'likes', 'discussions', 'descendants')
+
+
+def _frame_from_columns(columns: RawColumns, target_month: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'identifier': pd.Series(columns.strings('identifier'), dtype=object),
+            'date_crawl': pd.Series(columns.strings('date_crawl', target_month), dtype=object),
+            **{
+                c: pd.arrays.IntegerArray(*(np.array(a) for a in columns.counts(c)))
+                for c in COUNT_COLUMNS
+            },
+            **{c: pd.Series(columns.strings(c), dtype=object) for c in LABEL_COLUMNS},
+            'pos': np.arange(len(columns)),
+        }
+    )
+
+
+def load_raw_frame(file_path: Path, target_month: str, parse_cache: bool = False) -> pd.DataFrame:
+    """Parse a raw_*_data.jsonl file with the rules of `osir_lmts._read_raw_data_file`.
+
+    Lines marked invalid are skipped; an identifier repeated in the file keeps the position of
+    its first line and the values of its last one. `pos` holds that position. With
+    `parse_cache`, the columns come from the file's sidecar cache, see osir_lmts_cache.
+    """
+    raw_columns = load_raw_columns(file_path) if parse_cache else None
+    if raw_columns is not None:
+        return _frame_from_columns(raw_columns, target_month)
+    columns: dict[str, list] = {
+        name: [] for name in ('identifier', 'date_crawl', *COUNT_COLUMNS, *LABEL_COLUMNS)
+    }
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            line = json.loads(raw)
+            if not line.get('valid', True):
+                continue
+            repo = line.get('repo', '')
+            name = line.get('name', '')
+            identifier = f'{repo}/{name}' if repo and name else name or repo
+            if not identifier:
+                continue
+            likes = line.get('likes', 0)
+            if likes and likes < 0:
+                likes = 0
+            columns['identifier'].append(identifier)
+            columns['date_crawl'].append(line.get('date_crawl', target_month))
+            columns['downloads_last_month'].append(line.get('downloads_last_month'))
+            columns['downloads_total'].append(line.get('downloads'))
+            columns['likes'].append(likes)
+            columns['discussions'].append(line.get('discussions', 0))
+            columns['modality'].append(line.get('modality'))
+            columns['lifecycle'].append(line.get('lifecycle'))
+
+    df = pd.DataFrame(
+        {
+            'identifier': pd.Series(columns['identifier'], dtype=object),
+            'date_crawl': pd.Series(columns['date_crawl'], dtype=object),
+            **{c: pd.array(columns[c], dtype='Int64') for c in COUNT_COLUMNS},
+            **{c: pd.Series(columns[c], dtype=object) for c in LABEL_COLUMNS},
+        }
+    )
+    df['pos'] = np.arange(len(df))
+    first_pos = df.groupby('identifier', sort=False)['pos'].transform('min')
+    df['pos'] = first_pos
+    return df.drop_duplicates('identifier', keep='last')
+
+
+def _load_dirs(
+    dirs: list[Path], category: str, target_month: str, load_frames: LoadFrames | None = None
+) -> pd.DataFrame:
+    found = [
+        (dir_idx, dir_path)
+        for dir_idx, dir_path in enumerate(dirs)
+        if (dir_path / f'raw_{category}_data.jsonl').exists()
+    ]
+    file_paths = [dir_path / f'raw_{category}_data.jsonl' for _, dir_path in found]
+    if load_frames is None:
+        loaded = [load_raw_frame(file_path, target_month) for file_path in file_paths]
+    else:
+        loaded = load_frames(file_paths)
+    frames = []
+    for (dir_idx, dir_path), df in zip(found, loaded):
+        df['dir_idx'] = dir_idx
+        df['platform'] = dir_path.name.split('_')[0]
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['identifier', 'dir_idx', 'pos', 'platform'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _previous_totals(
+    platforms: list[str],
+    previous_dirs: Callable[[str], list[Path]],
+    category: str,
+    target_month: str,
+    load_frames: LoadFrames | None = None,
+) -> pd.DataFrame:
+    """(platform, identifier, prev_total) from the first previous month directory listing it."""
+    frames = []
+    for platform in platforms:
+        df = _load_dirs(previous_dirs(platform), category, target_month, load_frames)
+        if df.empty:
+            continue
+        df = df.sort_values(['dir_idx', 'pos'], kind='stable')
+        df = df.drop_duplicates('identifier', keep='first')
+        frames.append(
+            pd.DataFrame(
+                {
+                    'platform': platform,
+                    'identifier': df['identifier'].to_numpy(),
+                    'prev_total': df['downloads_total'].array,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(
+            {
+                'platform': pd.Series(dtype=object),
+                'identifier': pd.Series(dtype=object),
+                'prev_total': pd.array([], dtype='Int64'),
+            }
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _extra_info_frame(extra_info: dict[str, ExtraLabels]) -> pd.DataFrame:
+    labels = list(extra_info.values())
+    return pd.DataFrame(
+        {
+            'identifier': pd.Series(list(extra_info), dtype=object),
+            'extra_valid': pd.Series([bool(l.valid) for l in labels], dtype=bool),
+            'extra_modality': pd.Series(list(map(attrgetter('modality'), labels)), dtype=object),
+            'extra_lifecycle': pd.Series(list(map(attrgetter('lifecycle'), labels)), dtype=object),
+        }
+    )
+
+
+def _optional(value):
+    return None if value is None or value is pd.NA or value != value else value
+
+
+def aggregate_month(
+    category: Literal['model', 'dataset'],
+    dirs: list[Path],
+    previous_dirs: Callable[[str], list[Path]],
+    target_month: str,
+    extra_info: dict[str, ExtraLabels],
+    descendants: dict[str, int],
+    org_map: dict[str, str],
+    target_orgs: list[str] | None = None,
+    load_frames: LoadFrames | None = None,
+) -> list[ModelInfo] | list[DatasetInfo]:
+    """Aggregate the raw data of `dirs` into one `ModelInfo`/`DatasetInfo` per identifier.
+
+    `previous_dirs(platform)` returns the previous month's directories of a platform, in the
+    order they are searched for the downloads total of an identifier.
+    """
+    df = _load_dirs(dirs, category, target_month, load_frames)
+    if df.empty:
+        return []
+    # Identifiers come out in the order they first appear in the directories
+    df = df.sort_values(['dir_idx', 'pos'], kind='stable', ignore_index=True)
+
+    df = df.merge(_extra_info_frame(extra_info), on='identifier', how='left', sort=False)
+    df = df[df['extra_valid'].fillna(True).astype(bool)]
+    if target_orgs:
+        repos = df['identifier'].str.split('/', n=1).str[0]
+        orgs = repos.map(org_map).fillna(repos)
+        df = df[orgs.isin(target_orgs)]
+    if df.empty:
+        return []
+
+    # Monthly downloads: downloads_last_month, else the growth of the downloads total since the
+    # previous month (the total itself when the previous month does not know the identifier)
+    needs_prev = df['downloads_last_month'].isna() & df['downloads_total'].notna()
+    if needs_prev.any():
+        prev = _previous_totals(
+            sorted(df.loc[needs_prev, 'platform'].unique()),
+            previous_dirs,
+            category,
+            target_month,
+            load_frames,
+        )
+        df = df.merge(prev, on=['platform', 'identifier'], how='left', sort=False)
+    else:
+        df['prev_total'] = pd.array([pd.NA] * len(df), dtype='Int64')
+    growth = (df['downloads_total'] - df['prev_total']).clip(lower=0)
+    monthly = df['downloads_last_month'].fillna(growth.fillna(df['downloads_total']))
+    df['monthly'] = monthly
+
+    for column in LABEL_COLUMNS:
+        df[column] = df[column].where(df[column].astype(bool) & df[column].notna(), None)
+
+    grouped = df.groupby('identifier', sort=False)
+    result = pd.DataFrame(
+        {
+            'downloads': grouped['monthly'].sum(),
+            'likes': grouped['likes'].sum(),
+            'discussions': grouped['discussions'].sum(),
+            'modality': grouped['modality'].first(),
+            'lifecycle': grouped['lifecycle'].first(),
+        }
+    )
+    last = df.drop_duplicates('identifier', keep='last').set_index('identifier')
+    result['date_crawl'] = last['date_crawl']
+    result['extra_modality'] = last['extra_modality']
+    result['extra_lifecycle'] = last['extra_lifecycle']
+    result['modality'] = result['extra_modality'].where(
+        result['extra_modality'].notna(), result['modality']
+    )
+    result['lifecycle'] = result['extra_lifecycle'].where(
+        result['extra_lifecycle'].notna(), result['lifecycle']
+    )
+
+    infos = []
+    for identifier, downloads, likes, discussions, modality, lifecycle, date_crawl in zip(
+        result.index,
+        result['downloads'].tolist(),
+        result['likes'].tolist(),
+        result['discussions'].tolist(),
+        result['modality'].tolist(),
+        result['lifecycle'].tolist(),
+        result['date_crawl'].tolist(),
+    ):
+        common = {
+            'identifier': identifier,
+            'date_crawl': intern_label(_optional(date_crawl)),
+            'downloads_last_month': int(downloads),
+            'likes': int(likes),
+            'discussions': int(discussions),
+            'descendants': descendants.get(identifier, 0),
+            'modality': intern_label(_optional(modality)),
+        }
+        if category == 'model':
+            infos.append(ModelInfo(**common))
+        else:
+            infos.append(DatasetInfo(**common, lifecycle=intern_label(_optional(lifecycle))))
+    return infos
+
+
+def _codes(values: Sequence, func: Callable[[Any], int]) -> np.ndarray:
+    """`func` of every value as an int array, calling it once per distinct value."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    # Missing values are coded -1 by factorize, which picks the trailing -1
+    return np.asarray([func(value) for value in uniques] + [-1], dtype=np.int64)[codes]
+
+
+def _bucket_codes(key_map: dict[str, str]) -> tuple[list[str], dict[str, int]]:
+    """The distinct keys of a label -> key map, and the position of the key of every label."""
+    keys = list(dict.fromkeys(key_map.values()))
+    return keys, {label: keys.index(key) for label, key in key_map.items()}
+
+
+def _info_frame(
+    infos_by_prefix: dict[str, list[ModelInfo] | list[DatasetInfo]],
+    org_map: dict[str, str],
+    org_pos: dict[str, int],
+    label_codes: dict[str, dict[str, int]],
+) -> pd.DataFrame:
+    """One row per info of an organization of `org_pos`, as integer codes and counts.
+
+    `prefix` is the position of the prefix in `infos_by_prefix`, `org` the position of the
+    organization and the columns of `label_codes` the positions of the bucket keys of the
+    labels, -1 for labels without a bucket.
+    """
+    infos = [info for prefix_infos in infos_by_prefix.values() for info in prefix_infos]
+    prefix_sizes = [len(prefix_infos) for prefix_infos in infos_by_prefix.values()]
+    repos = [identifier.partition('/')[0] for identifier in map(attrgetter('identifier'), infos)]
+    columns = {
+        'prefix': np.repeat(np.arange(len(prefix_sizes)), prefix_sizes),
+        'org': _codes(repos, lambda repo: org_pos.get(org_map.get(repo, repo), -1)),
+    }
+    for column, codes in label_codes.items():
+        columns[column] = _codes(list(map(attrgetter(column), infos)), lambda l: codes.get(l, -1))
+    for column, attr in zip(SUMMED_COLUMNS, SUMMED_ATTRS):
+        values = pd.array(list(map(attrgetter(attr), infos)), dtype='Int64')
+        columns[column] = values.fillna(0).to_numpy(np.int64)
+    df = pd.DataFrame(columns)
+    return df[df['org'] >= 0]
+
+
+def _bucket_sums(
+    df: pd.DataFrame, column: str, keys: list[str], downloads: bool = True
+) -> pd.DataFrame:
+    """num_{key} (and downloads_{key}) by (prefix, org), for the bucket keys of `column`."""
+    df = df[df[column] >= 0].assign(n=1)
+    if df.empty:
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=['prefix', 'org']))
+    values = ['n', 'downloads'] if downloads else ['n']
+    pivot = df.pivot_table(
+        index=['prefix', 'org'], columns=column, values=values, aggfunc='sum', fill_value=0
+    )
+    names = {'n': 'num', 'downloads': 'downloads'}
+    pivot.columns = [f'{names[value]}_{keys[key]}' for value, key in pivot.columns]
+    return pivot
+
+
+def summary_tables(
+    category: Literal['model', 'dataset'],
+    infos_by_prefix: dict[str, list[ModelInfo] | list[DatasetInfo]],
+    org_map: dict[str, str],
+    orgs: list[str],
+    org_metadata: dict[str, dict],
+    other_datasets: list[dict] | None = None,
+) -> dict[str, ModelSummaryTable | DatasetSummaryTable]:
+    """Summary table by prefix of the infos in `infos_by_prefix`, e.g. '' and 'acc_', in one pass.
+
+    Rows are those of `orgs`, in order, as in `OsirLmtsProcessor.summary_model_data` and
+    `summary_dataset_data`; `other_datasets` adds the datasets listed outside the platforms to
+    the counts of the dataset summaries.
+    """
+    row_cls = ModelSummaryRow if category == 'model' else DatasetSummaryRow
+    table_cls = ModelSummaryTable if category == 'model' else DatasetSummaryTable
+    key_maps = {'modality': row_cls.get_modality_key_map()}
+    if category == 'dataset':
+        key_maps['lifecycle'] = DatasetSummaryRow.get_lifecycle_key_map()
+    buckets = {column: _bucket_codes(key_map) for column, key_map in key_maps.items()}
+    label_codes = {column: codes for column, (_, codes) in buckets.items()}
+    unique_orgs = list(dict.fromkeys(orgs))
+    org_pos = {org: pos for pos, org in enumerate(unique_orgs)}
+    df = _info_frame(infos_by_prefix, org_map, org_pos, label_codes)
+
+    parts = [_bucket_sums(df, column, keys) for column, (keys, _) in buckets.items()]
+    if category == 'model':
+        parts.append(df.groupby(['prefix', 'org'])[['likes', 'issue', 'descendants']].sum())
+    else:
+        parts.append(df.groupby(['prefix', 'org']).size().rename('dataset_usage').to_frame())
+        # Datasets listed outside the platforms count for every prefix, without downloads
+        other_datasets = other_datasets or []
+        other = pd.DataFrame(
+            {
+                'org': [org_pos.get(ds.get('org', 'Unknown'), -1) for ds in other_datasets],
+                **{
+                    column: [codes.get(ds.get(column, 'Unknown'), -1) for ds in other_datasets]
+                    for column, codes in label_codes.items()
+                },
+            },
+            dtype=np.int64,
+        )
+        other = pd.concat(
+            [other[other['org'] >= 0].assign(prefix=p) for p in range(len(infos_by_prefix))],
+            ignore_index=True,
+        )
+        parts += [
+            _bucket_sums(other, column, keys, downloads=False)
+            for column, (keys, _) in buckets.items()
+        ]
+
+    metadata_key = 'chips' if category == 'model' else 'dataset_ops'
+    metadata_field = 'num_adapted_chips' if category == 'model' else 'operators'
+    fields = list(row_cls.get_defaultdict()[''])
+    tables = {}
+    for prefix_pos, prefix in enumerate(infos_by_prefix):
+        summed = pd.DataFrame(0, index=range(len(unique_orgs)), columns=fields)
+        for part in parts:
+            if prefix_pos not in part.index.get_level_values('prefix'):
+                continue
+            part = part.xs(prefix_pos, level='prefix').reindex(summed.index, fill_value=0)
+            columns = list(part.columns)
+            summed[columns] = summed[columns].to_numpy() + part.to_numpy()
+        summed[metadata_field] = [
+            org_metadata.get(org, {}).get(metadata_key, 0) for org in unique_orgs
+        ]
+        values = summed[fields].to_numpy().tolist()
+        tables[prefix] = table_cls(
+            rows=[row_cls(org=org, **dict(zip(fields, values[org_pos[org]]))) for org in orgs]
+        )
+    return tables
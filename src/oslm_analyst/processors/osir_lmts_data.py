@@ -1,5 +1,6 @@
 from itertools import dropwhile
 import csv
+import sys
 from collections import defaultdict
 from pathlib import Path
 from abc import ABC, abstractmethod
@@ -10,7 +11,53 @@ import pandas as pd
 from oslm_analyst.data_utils import Lifecycle, Modality
 
 
-@dataclass
+def intern_label[T](value: T) -> T:
+    """The interned copy of a string repeated across many entries (repository, platform,
+    date, modality, lifecycle), so they all share one object; other values as they are.
+
+    Identifiers and names are unique per entry and not interned.
+    """
+    return sys.intern(value) if type(value) is str else value  # type: ignore
+
+
+def _intern_labels(d: dict) -> dict:
+    for key in ('date_crawl', 'modality', 'lifecycle'):
+        if key in d:
+            d[key] = intern_label(d[key])
+    return d
+
+
+@dataclass(slots=True, frozen=True)
+class ExtraLabels:
+    """What the processor keeps of a model_info/dataset_info.jsonl entry.
+
+    Entries share one instance per distinct (valid, modality, lifecycle), see `of`, so the
+    extra info of an identifier costs one reference rather than its whole JSON line.
+    """
+
+    valid: bool | None = True
+    # Interned label strings, as read from the info files
+    modality: str | None = None
+    lifecycle: str | None = None
+
+    @classmethod
+    def of(cls, valid: bool | None, modality: str | None, lifecycle: str | None) -> 'ExtraLabels':
+        key = (valid, modality, lifecycle)
+        labels = _EXTRA_LABELS.get(key)
+        if labels is None:
+            labels = _EXTRA_LABELS[key] = cls(*map(intern_label, key))  # type: ignore
+        return labels
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'ExtraLabels':
+        # Empty labels are no labels
+        return cls.of(d.get('valid', True), d.get('modality') or None, d.get('lifecycle') or None)
+
+
+_EXTRA_LABELS: dict[tuple, ExtraLabels] = {}
+
+
+@dataclass(slots=True)
 class ModelInfo:
     identifier: str
     date_crawl: str
@@ -25,7 +72,7 @@ class ModelInfo:
 
     @classmethod
     def from_dict(cls, d: dict) -> 'ModelInfo':
-        return cls(**d)
+        return cls(**_intern_labels(d))
 
     def to_acc_dict(self) -> dict:
         d = asdict(self)
@@ -41,7 +88,7 @@ class ModelInfo:
         return cls.from_dict(d)
 
 
-@dataclass
+@dataclass(slots=True)
 class DatasetInfo:
     identifier: str
     date_crawl: str
@@ -57,7 +104,7 @@ class DatasetInfo:
 
     @classmethod
     def from_dict(cls, d: dict) -> 'DatasetInfo':
-        return cls(**d)
+        return cls(**_intern_labels(d))
 
     def to_acc_dict(self) -> dict:
         d = asdict(self)
@@ -73,7 +120,7 @@ class DatasetInfo:
         return cls.from_dict(d)
 
 
-@dataclass
+@dataclass(slots=True)
 class RawDataPoint:
     identifier: str
     repo: str
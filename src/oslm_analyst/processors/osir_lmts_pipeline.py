@@ -0,0 +1,347 @@
+"""Stage DAG for `OsirLmtsProcessor.run` with outputs memoized by a content hash of the inputs.
+
+Every stage declares the files it reads, the stages it uses and its parameters. Its key is a
+hash of the content of those files, the content of the outputs of those stages and the
+parameters. A stage whose key and outputs are unchanged since the last run is skipped, and its
+result is loaded back from its outputs only if a stage downstream has to run.
+
+The hashes of the inputs of every stage are kept in the manifest as its lineage, so that a
+stage with a `patch` function can update its previous outputs for the inputs that changed.
+
+Every stage that runs is timed; with `profile`, its peak memory is traced and the slowest stage
+is profiled with cProfile, see `StageProfile`.
+"""
+
+import cProfile
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+from collections.abc import Callable, Collection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Bump to invalidate every cached stage when the outputs of the pipeline change
+PIPELINE_VERSION = 3
+MANIFEST_NAME = 'pipeline_manifest.json'
+PROFILE_NAME = 'pipeline_profile.json'
+
+
+@dataclass
+class Stage:
+    name: str
+    # Computes the stage (writing its outputs) from the results of `deps`, by stage name
+    run: Callable[[dict[str, Any]], Any]
+    # Rebuilds the result of a skipped stage from its outputs
+    load: Callable[[], Any]
+    outputs: list[str]
+    files: list[Path] = field(default_factory=list)
+    deps: list[str] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    # Updates the previous outputs in place from the results of `deps` and the names of the
+    # inputs that changed (file paths, stage names or 'params'); returns None to run instead
+    patch: Callable[[dict[str, Any], list[str]], Any] | None = None
+
+
+@dataclass
+class StageProfile:
+    """Resources used by a stage that ran.
+
+    CPU time is that of the whole process, so it includes the other stages of a wave run in
+    parallel, and not the worker processes parsing raw files. Peak memory, traced with
+    `profile` only, is the peak of the memory allocated by Python during the stage over what
+    was allocated when it started.
+    """
+
+    wall_seconds: float
+    cpu_seconds: float
+    # Length of the result: infos or rows of the summary tables
+    rows: int | None = None
+    peak_memory: int | None = None
+    # cProfile stats of the slowest stage, with `profile`
+    cprofile_path: str | None = None
+
+
+@dataclass
+class PipelineReport:
+    ran: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    # Stages among `ran` that were patched rather than rerun
+    patched: list[str] = field(default_factory=list)
+    # Stages among `ran` whose outputs differ from the previous run
+    changed: list[str] = field(default_factory=list)
+    # Stages among `ran`, by name
+    profiles: dict[str, StageProfile] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            f'{len(self.ran)} stages ran ({len(self.patched)} patched, {len(self.changed)} '
+            f'changed), {len(self.skipped)} skipped'
+            + (f' ({", ".join(self.skipped)})' if self.skipped else '')
+        )
+
+    def profile_dict(self) -> dict:
+        """The profiles of the stages that ran, as written to pipeline_profile.json."""
+        return {
+            'wall_seconds': sum(p.wall_seconds for p in self.profiles.values()),
+            'stages': {
+                name: {**asdict(self.profiles[name]), 'patched': name in self.patched}
+                for name in self.ran
+                if name in self.profiles
+            },
+            'skipped': self.skipped,
+        }
+
+    def profile_table(self) -> str:
+        """Plain-text table of the stages that ran, slowest first."""
+        header = f'{"stage":<24} {"wall s":>8} {"cpu s":>8} {"rows":>9} {"peak MiB":>9}'
+        rows = [header]
+        for name, p in sorted(self.profiles.items(), key=lambda item: -item[1].wall_seconds):
+            peak = f'{p.peak_memory / 2**20:9.1f}' if p.peak_memory is not None else f'{"-":>9}'
+            rows.append(
+                f'{name:<24} {p.wall_seconds:8.3f} {p.cpu_seconds:8.3f} '
+                f'{p.rows if p.rows is not None else "-":>9} {peak}'
+            )
+        return '\n'.join(rows)
+
+
+def _count_rows(result: Any) -> int | None:
+    if isinstance(result, tuple):
+        counts = [_count_rows(item) for item in result]
+        return None if None in counts else sum(counts)  # type: ignore
+    rows = getattr(result, 'rows', result)
+    return len(rows) if isinstance(rows, list) else None
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Pipeline:
+    """Runs stages in dependency order, skipping those whose inputs did not change.
+
+    The manifest in `out_dir` records the key and output hashes of every stage, and the
+    hashes of the files read, by size and modification time, so that unchanged files are not
+    hashed again.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        stages: list[Stage],
+        force: bool | Collection[str] = False,
+        profile: bool = False,
+    ):
+        self.out_dir = out_dir
+        self.stages = {stage.name: stage for stage in stages}
+        # Stages rerun whatever their inputs: all of them with force=True, else the named ones
+        self.forced = set(self.stages) if force is True else set(force or ())
+        self.profile = profile
+        self._profilers: dict[str, cProfile.Profile] = {}
+        self.manifest_path = out_dir / MANIFEST_NAME
+        self._manifest = self._read_manifest()
+        self._file_hashes: dict[str, list] = self._manifest.get('files', {})
+        self._results: dict[str, Any] = {}
+
+        depth: dict[str, int] = {}
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in depth]
+            if missing:
+                raise ValueError(f'Stage {stage.name} depends on unknown or later stages {missing}')
+            depth[stage.name] = 1 + max((depth[dep] for dep in stage.deps), default=-1)
+        # Stages of a wave only depend on stages of earlier waves
+        self.waves = [
+            [name for name in self.stages if depth[name] == level]
+            for level in range(max(depth.values(), default=-1) + 1)
+        ]
+
+    def _read_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f'Ignoring unreadable pipeline manifest {self.manifest_path}: {e}')
+            return {}
+        if manifest.get('version') != PIPELINE_VERSION:
+            return {}
+        return manifest
+
+    def _write_manifest(self) -> None:
+        self._manifest['version'] = PIPELINE_VERSION
+        self._manifest['files'] = self._file_hashes
+        tmp_path = self.manifest_path.with_name(f'.{MANIFEST_NAME}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def file_hash(self, path: Path) -> str | None:
+        """Content hash of a file, None if it does not exist."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path.resolve())
+        cached = self._file_hashes.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(path)
+        self._file_hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def _output_hashes(self, stage: Stage) -> dict[str, str | None]:
+        return {name: self.file_hash(self.out_dir / name) for name in stage.outputs}
+
+    def _stage_inputs(self, stage: Stage) -> dict:
+        """Hashes of everything the stage depends on, recorded as its lineage."""
+        stages = self._manifest.setdefault('stages', {})
+        params = json.dumps(stage.params, sort_keys=True, default=str).encode('utf-8')
+        return {
+            'params': hashlib.sha256(params).hexdigest(),
+            'files': {str(path): self.file_hash(path) for path in stage.files},
+            'deps': {dep: stages[dep]['outputs'] for dep in stage.deps},
+        }
+
+    @staticmethod
+    def _stage_key(stage: Stage, inputs: dict) -> str:
+        encoded = json.dumps({'name': stage.name, **inputs}, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _changed_inputs(self, stage: Stage, inputs: dict) -> list[str] | None:
+        """Inputs that differ from the last run, None if the previous outputs are not usable."""
+        entry = self._manifest.get('stages', {}).get(stage.name)
+        if stage.name in self.forced or entry is None or 'inputs' not in entry:
+            return None
+        if entry['outputs'] != self._output_hashes(stage):
+            return None
+        previous = entry['inputs']
+        changed = ['params'] if previous['params'] != inputs['params'] else []
+        for kind in ('files', 'deps'):
+            names = set(previous[kind]) | set(inputs[kind])
+            changed += sorted(n for n in names if previous[kind].get(n) != inputs[kind].get(n))
+        return changed
+
+    def _is_fresh(self, stage: Stage, key: str) -> bool:
+        if stage.name in self.forced:
+            return False
+        entry = self._manifest.get('stages', {}).get(stage.name)
+        if entry is None or entry['key'] != key:
+            return False
+        # Outputs deleted or edited by hand are regenerated
+        return entry['outputs'] == self._output_hashes(stage)
+
+    def result(self, name: str) -> Any:
+        """Result of a stage, loaded from its outputs if it was skipped."""
+        if name not in self._results:
+            self._results[name] = self.stages[name].load()
+        return self._results[name]
+
+    def _compute(self, stage: Stage, changed_inputs: list[str] | None) -> tuple[Any, bool]:
+        results = {dep: self._results[dep] for dep in stage.deps}
+        if stage.patch is not None and changed_inputs:
+            result = stage.patch(results, changed_inputs)
+            if result is not None:
+                logger.info(f'Patched stage {stage.name} for changes in {changed_inputs}')
+                return result, True
+        logger.info(f'Running stage {stage.name}')
+        return stage.run(results), False
+
+    def _run_stage(
+        self, stage: Stage, changed_inputs: list[str] | None
+    ) -> tuple[Any, bool, StageProfile]:
+        profiler = None
+        if self.profile:
+            profiler = self._profilers[stage.name] = cProfile.Profile()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result, patched = self._compute(stage, changed_inputs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        profile = StageProfile(
+            time.perf_counter() - start_wall, time.process_time() - start_cpu, _count_rows(result)
+        )
+        if self.profile:
+            profile.peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+        return result, patched, profile
+
+    def _dump_slowest(self, report: PipelineReport) -> None:
+        name = max(report.profiles, key=lambda name: report.profiles[name].wall_seconds)
+        path = self.out_dir / f'pipeline_profile_{name}.prof'
+        self._profilers[name].dump_stats(path)
+        report.profiles[name].cprofile_path = path.name
+        logger.info(f'Wrote cProfile stats of the slowest stage, {name}, to {path}')
+
+    def run(self, parallel: bool = False, only: set[str] | None = None) -> PipelineReport:
+        """Run the stale stages; with `parallel`, the stale stages of a wave run in threads.
+
+        With `only`, the other stages are left out; their dependencies must be in `only`. With
+        `profile`, stages run one at a time, so that their memory and profiles do not mix.
+        """
+        report = PipelineReport()
+        parallel = parallel and not self.profile
+        started_tracing = self.profile and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            self._run_waves(report, parallel, only)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        if self.profile and report.profiles:
+            self._dump_slowest(report)
+        logger.info(f'Pipeline: {report.summary()}')
+        return report
+
+    def _run_waves(self, report: PipelineReport, parallel: bool, only: set[str] | None) -> None:
+        stages = self._manifest.setdefault('stages', {})
+        for wave in self.waves:
+            stale = []
+            for name in wave:
+                if only is not None and name not in only:
+                    continue
+                stage = self.stages[name]
+                inputs = self._stage_inputs(stage)
+                key = self._stage_key(stage, inputs)
+                if self._is_fresh(stage, key):
+                    report.skipped.append(name)
+                else:
+                    stale.append((stage, key, inputs, self._changed_inputs(stage, inputs)))
+            for stage, *_ in stale:
+                for dep in stage.deps:
+                    self.result(dep)
+
+            jobs = [(stage, changed_inputs) for stage, _, _, changed_inputs in stale]
+            if parallel and len(stale) > 1:
+                with ThreadPoolExecutor(len(stale)) as pool:
+                    results = list(pool.map(lambda job: self._run_stage(*job), jobs))
+            else:
+                results = [self._run_stage(*job) for job in jobs]
+
+            for (stage, key, inputs, _), (result, patched, profile) in zip(stale, results):
+                self._results[stage.name] = result
+                report.profiles[stage.name] = profile
+                previous = stages.get(stage.name)
+                outputs = self._output_hashes(stage)
+                stages[stage.name] = {'key': key, 'inputs': inputs, 'outputs': outputs}
+                report.ran.append(stage.name)
+                if patched:
+                    report.patched.append(stage.name)
+                if previous is None or previous['outputs'] != outputs:
+                    report.changed.append(stage.name)
+            self._write_manifest()
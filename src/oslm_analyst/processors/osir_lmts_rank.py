@@ -1,4 +1,6 @@
 from datetime import datetime
+import hashlib
+import inspect
 import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
@@ -42,6 +44,22 @@ class OsirLmtsRankStrategy(ABC):
     ) -> OverallSummaryTable:
         pass
 
+    def identity(self) -> dict:
+        """What the rankings depend on besides the tables: the class, its code and attributes."""
+        h = hashlib.sha256()
+        for cls in type(self).__mro__:
+            if cls in (OsirLmtsRankStrategy, ABC, object):
+                continue
+            try:
+                h.update(inspect.getsource(cls).encode('utf-8'))
+            except (OSError, TypeError):
+                h.update(cls.__qualname__.encode('utf-8'))
+        return {
+            'strategy': f'{type(self).__module__}.{type(self).__qualname__}',
+            'code': h.hexdigest(),
+            'attributes': {k: repr(v) for k, v in sorted(vars(self).items())},
+        }
+
     def _normalize(self, table: BaseSummaryTable) -> BaseSummaryTable:
         df = table.to_dataframe()
         col_max = df.max()
@@ -76,35 +94,44 @@ class OsirLmtsRankStrategy(ABC):
 
 
 class DefaultRankStrategy(OsirLmtsRankStrategy):
-    """Default ranking strategy with average weights."""
+    """Default ranking strategy with average weights.
 
-    def rank_model_dim(self, model_table: ModelSummaryTable, acc: bool = False) -> ModelSummaryTable:
-        table = self._normalize(model_table)
-        df = table.to_dataframe()
-        df['score'] = df.mean(axis=1)
+    Every dimension is scored from its normalized columns as `score_weights` says, so
+    subclasses reweight a dimension by overriding `score_weights` alone; `rank_universes`
+    relies on it to rank many organization universes at once.
+    """
+
+    def score_weights(self, dim: str, acc: bool = False) -> dict[str, float] | None:
+        """Weights of the normalized columns of a dimension in its score, None for their mean.
+
+        `dim` is 'model', 'dataset', 'infra', 'eval' or 'overall'.
+        """
+        return None
+
+    def _score_and_rank(self, df: pd.DataFrame, dim: str, acc: bool) -> pd.DataFrame:
+        weights = self.score_weights(dim, acc)
+        if weights is None:
+            df['score'] = df.mean(axis=1)
+        else:
+            df['score'] = df[list(weights.keys())].mul(pd.Series(weights)).sum(axis=1)
         df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return ModelSummaryTable.from_dataframe(df)
+        return df
+
+    def rank_model_dim(self, model_table: ModelSummaryTable, acc: bool = False) -> ModelSummaryTable:
+        df = self._normalize(model_table).to_dataframe()
+        return ModelSummaryTable.from_dataframe(self._score_and_rank(df, 'model', acc))
 
     def rank_dataset_dim(self, dataset_table: DatasetSummaryTable, acc: bool = False) -> DatasetSummaryTable:
-        table = self._normalize(dataset_table)
-        df = table.to_dataframe()
-        df['score'] = df.mean(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return DatasetSummaryTable.from_dataframe(df)
+        df = self._normalize(dataset_table).to_dataframe()
+        return DatasetSummaryTable.from_dataframe(self._score_and_rank(df, 'dataset', acc))
 
     def rank_infra_dim(self, infra_table: InfraSummaryTable, acc: bool = False) -> InfraSummaryTable:
-        table = self._normalize(infra_table)
-        df = table.to_dataframe()
-        df['score'] = df.mean(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return InfraSummaryTable.from_dataframe(df)
+        df = self._normalize(infra_table).to_dataframe()
+        return InfraSummaryTable.from_dataframe(self._score_and_rank(df, 'infra', acc))
 
     def rank_eval_dim(self, eval_table: EvalSummaryTable, acc: bool = False) -> EvalSummaryTable:
-        table = self._normalize(eval_table)
-        df = table.to_dataframe()
-        df['score'] = df.mean(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return EvalSummaryTable.from_dataframe(df)
+        df = self._normalize(eval_table).to_dataframe()
+        return EvalSummaryTable.from_dataframe(self._score_and_rank(df, 'eval', acc))
 
     def rank_overall(
         self,
@@ -115,17 +142,21 @@ class DefaultRankStrategy(OsirLmtsRankStrategy):
         acc: bool = False,
     ) -> OverallSummaryTable:
         table = self._normalize_overall(model_table, dataset_table, infra_table, eval_table)
-        df = table.to_dataframe()
-        df['score'] = df.mean(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
+        df = self._score_and_rank(table.to_dataframe(), 'overall', acc)
         return OverallSummaryTable.from_dataframe(df)
 
 
 class RankStrategyUpdated2603(DefaultRankStrategy):
-    def rank_model_dim(self, model_table: ModelSummaryTable, acc: bool = False) -> ModelSummaryTable:
-        table = self._normalize(model_table)
-        df = table.to_dataframe()
-
+    def score_weights(self, dim: str, acc: bool = False) -> dict[str, float] | None:
+        if dim == 'overall':
+            return {
+                'model_influence': 0.5,
+                'dataset_influence': 0.5 / 3,
+                'infra_influence': 0.5 / 3,
+                'eval_influence': 0.5 / 3,
+            }
+        if dim != 'model':
+            return None
         if acc:
             # Accumulated weights
             weights = {
@@ -170,30 +201,7 @@ class RankStrategyUpdated2603(DefaultRankStrategy):
                 'issue': 0.1,
                 'num_adapted_chips': 0.1,
             }
-
-        df['score'] = df[list(weights.keys())].mul(pd.Series(weights)).sum(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return ModelSummaryTable.from_dataframe(df)
-
-    def rank_overall(
-        self,
-        model_table: ModelSummaryTable,
-        dataset_table: DatasetSummaryTable,
-        infra_table: InfraSummaryTable,
-        eval_table: EvalSummaryTable,
-        acc: bool = False,
-    ) -> OverallSummaryTable:
-        table = self._normalize_overall(model_table, dataset_table, infra_table, eval_table)
-        df = table.to_dataframe()
-        weights = {
-            'model_influence': 0.5,
-            'dataset_influence': 0.5 / 3,
-            'infra_influence': 0.5 / 3,
-            'eval_influence': 0.5 / 3,
-        }
-        df['score'] = df[list(weights.keys())].mul(pd.Series(weights)).sum(axis=1)
-        df['rank'] = df['score'].rank(ascending=False, method='dense').astype(int)
-        return OverallSummaryTable.from_dataframe(df)
+        return weights
 
 
 def get_rank_strategy_for_month(target_month: str) -> OsirLmtsRankStrategy:
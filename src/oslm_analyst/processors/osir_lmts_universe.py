@@ -0,0 +1,219 @@
+"""Overall rankings of organization universes: every country, every organization type and the
+custom lists of config/org_universes.json, e.g. CN_overall_rank.csv.
+
+Ranking a universe used to filter the four summary tables row by row and run the strategy on
+them, once per universe. When the strategy ranks as `DefaultRankStrategy` does, only with
+its own `score_weights`, the universes are instead ranked together: the columns of a
+dimension form one matrix shared by every universe, which a membership mask splits into
+per-universe maxima, normalized scores and dense ranks.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..utils import OrgInfo
+from .osir_lmts_data import (
+    BaseSummaryTable,
+    DatasetSummaryTable,
+    EvalSummaryTable,
+    InfraSummaryTable,
+    ModelSummaryTable,
+    OverallSummaryRow,
+    OverallSummaryTable,
+)
+from .osir_lmts_rank import DefaultRankStrategy, OsirLmtsRankStrategy
+
+# Custom universes, a JSON object of name -> organizations
+UNIVERSES_FILE = 'org_universes.json'
+DIMS = ('model', 'dataset', 'infra', 'eval')
+# The influence columns of the overall table, in the order its score adds them up
+INFLUENCE_DIMS = ('dataset', 'model', 'infra', 'eval')
+# What `_rank_universes_together` reimplements, and a strategy must not override to use it
+_RANKING_METHODS = (
+    '_normalize',
+    '_normalize_overall',
+    '_score_and_rank',
+    'rank_model_dim',
+    'rank_dataset_dim',
+    'rank_infra_dim',
+    'rank_eval_dim',
+    'rank_overall',
+)
+
+
+def type_universe(org_type: str) -> str:
+    """Name of the universe of an organization type, e.g. type-research-lab."""
+    return 'type-' + '-'.join(org_type.lower().split())
+
+
+def org_universes(org_list: list[OrgInfo], config_root: Path) -> dict[str, set[str]]:
+    """Universes by name: one per country, e.g. CN, one per type, and the custom ones."""
+    universes: dict[str, set[str]] = {}
+    for org_info in org_list:
+        universes.setdefault(org_info.country, set()).add(org_info.org)
+    for org_info in org_list:
+        universes.setdefault(type_universe(org_info.type), set()).add(org_info.org)
+
+    custom_path = config_root / UNIVERSES_FILE
+    if custom_path.exists():
+        custom = json.loads(custom_path.read_text(encoding='utf-8'))
+        for name, orgs in custom.items():
+            if name in universes:
+                raise ValueError(f'Universe {name} of {custom_path} is a country or type')
+            universes[name] = set(orgs)
+    return universes
+
+
+def _dense_ranks(scores: np.ndarray, members: np.ndarray) -> np.ndarray:
+    """Dense ranks of the scores of every row among its members, the highest first; 0 for
+    the others."""
+    keys = np.where(members, -scores, np.inf)
+    order = np.argsort(keys, axis=1, kind='stable')
+    ordered = np.take_along_axis(keys, order, axis=1)
+    steps = np.ones(ordered.shape, dtype=np.int64)
+    steps[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ranks = np.empty(ordered.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.cumsum(steps, axis=1), axis=1)
+    return np.where(members, ranks, 0)
+
+
+def _scores(values: np.ndarray, columns: list[str], weights: dict[str, float] | None) -> np.ndarray:
+    """Scores of (universe, org, column) values: the weighted sum or the mean of the columns,
+    missing values left out.
+
+    The columns are added one after the other, as pandas does, for the same floats.
+    """
+    if weights is not None:
+        positions = [columns.index(column) for column in weights]
+        values = values[:, :, positions] * np.asarray(list(weights.values()))
+    missing = np.isnan(values)
+    total = np.zeros(values.shape[:2])
+    for j in range(values.shape[2]):
+        total += np.where(missing[:, :, j], 0, values[:, :, j])
+    if weights is not None:
+        return total
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / (~missing).sum(axis=2)
+
+
+def _dim_ranks(
+    table: BaseSummaryTable, universes: list[set[str]], weights: dict[str, float] | None
+) -> pd.DataFrame:
+    """Rank of every organization of the table in every universe (columns), 0 outside it."""
+    df = table.to_dataframe()
+    values = df.to_numpy(dtype=float)
+    members = np.array([df.index.isin(list(orgs)) for orgs in universes], dtype=bool)
+    members = members.reshape(len(universes), len(df))
+
+    # Column maxima of every universe, 0 replaced by 1 as in `_normalize`
+    present = members[:, :, None] & ~np.isnan(values)[None]
+    maxima = np.where(present, values[None], -np.inf).max(axis=1, initial=-np.inf)
+    maxima[maxima == 0] = 1
+    with np.errstate(invalid='ignore'):
+        normalized = values[None] / maxima[:, None, :]
+        scores = _scores(normalized, list(df.columns), weights)
+    return pd.DataFrame(_dense_ranks(scores, members).T, index=df.index)
+
+
+def _rank_universes_together(
+    strategy: DefaultRankStrategy,
+    tables: tuple[ModelSummaryTable, DatasetSummaryTable, InfraSummaryTable, EvalSummaryTable],
+    universes: dict[str, set[str]],
+    acc: bool,
+) -> dict[str, OverallSummaryTable]:
+    sets = list(universes.values())
+    ranks = [
+        _dim_ranks(table, sets, strategy.score_weights(dim, acc))
+        for dim, table in zip(DIMS, tables)
+        if table.rows
+    ]
+    # Organizations of any table, in the order they first appear
+    orgs = pd.Index(list(dict.fromkeys(org for r in ranks for org in r.index)))
+    ranks = [r.reindex(orgs, fill_value=0).to_numpy().T for r in ranks]
+    influences = np.full((len(sets), len(orgs), len(INFLUENCE_DIMS)), np.nan)
+    dims = [dim for dim, table in zip(DIMS, tables) if table.rows]
+    for dim, dim_ranks in zip(dims, ranks):
+        with np.errstate(divide='ignore'):
+            influence = 1 / np.log2(dim_ranks + 1)
+        influences[:, :, INFLUENCE_DIMS.index(dim)] = np.where(dim_ranks > 0, influence, np.nan)
+
+    members = ~np.isnan(influences).all(axis=2)
+    columns = [f'{dim}_influence' for dim in INFLUENCE_DIMS]
+    scores = _scores(influences, columns, strategy.score_weights('overall', acc))
+    overall_ranks = _dense_ranks(scores, members)
+
+    result = {}
+    for u, name in enumerate(universes):
+        table = OverallSummaryTable()
+        for i in np.flatnonzero(members[u]):
+            dataset, model, infra, eval_ = influences[u, i].tolist()
+            table.rows.append(
+                OverallSummaryRow(
+                    orgs[i],
+                    dataset_influence=dataset,
+                    model_influence=model,
+                    infra_influence=infra,
+                    eval_influence=eval_,
+                    score=float(scores[u, i]),
+                    rank=int(overall_ranks[u, i]),
+                )
+            )
+        result[name] = table
+    return result
+
+
+def _filter_rows[Table: BaseSummaryTable](table: Table, orgs: set[str]) -> Table:
+    filtered = type(table)()
+    filtered.rows.extend(row for row in table.rows if row.org in orgs)  # type: ignore
+    return filtered
+
+
+def _ranks_by_score_weights(strategy: OsirLmtsRankStrategy) -> bool:
+    """Whether the strategy ranks every dimension as `DefaultRankStrategy` does, with its
+    `score_weights`."""
+    return isinstance(strategy, DefaultRankStrategy) and all(
+        getattr(type(strategy), name) is getattr(DefaultRankStrategy, name)
+        for name in _RANKING_METHODS
+    )
+
+
+def rank_universe(
+    strategy: OsirLmtsRankStrategy,
+    tables: tuple[ModelSummaryTable, DatasetSummaryTable, InfraSummaryTable, EvalSummaryTable],
+    orgs: set[str],
+    acc: bool = False,
+) -> OverallSummaryTable:
+    """Overall ranking of one universe, by the strategy's ranking of its rows of the tables."""
+    model, dataset, infra, eval_ = (_filter_rows(table, orgs) for table in tables)
+    return strategy.rank_overall(
+        strategy.rank_model_dim(model, acc=acc),
+        strategy.rank_dataset_dim(dataset, acc=acc),
+        strategy.rank_infra_dim(infra, acc=acc),
+        strategy.rank_eval_dim(eval_, acc=acc),
+        acc=acc,
+    )
+
+
+def rank_universes(
+    strategy: OsirLmtsRankStrategy,
+    tables: tuple[ModelSummaryTable, DatasetSummaryTable, InfraSummaryTable, EvalSummaryTable],
+    universes: dict[str, set[str]],
+    acc: bool = False,
+) -> dict[str, OverallSummaryTable]:
+    """Overall ranking of every universe with organizations in the tables, by name.
+
+    The universes are ranked in one pass if the strategy only changes the score weights of
+    `DefaultRankStrategy`, else one by one with `rank_universe`.
+    """
+    if not _ranks_by_score_weights(strategy):
+        ranked = set().union(*(table.get_orgs() for table in tables))
+        return {
+            name: rank_universe(strategy, tables, orgs, acc)
+            for name, orgs in universes.items()
+            if orgs & ranked
+        }
+    result = _rank_universes_together(strategy, tables, universes, acc)  # type: ignore
+    return {name: table for name, table in result.items() if table.rows}
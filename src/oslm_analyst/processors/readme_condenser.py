@@ -0,0 +1,235 @@
+"""Shrink repository READMEs to the parts that tell what a model or dataset is."""
+
+import re
+from dataclasses import dataclass
+
+from oslm_analyst.processors.llm_scheduler import estimate_tokens
+from oslm_analyst.processors.modality_rules import split_front_matter
+
+# Front matter keys that help classification, in output order
+METADATA_KEYS = (
+    'pipeline_tag',
+    'task_categories',
+    'task_ids',
+    'tasks',
+    'library_name',
+    'tags',
+    'modality',
+    'language',
+    'size_categories',
+    'base_model',
+    'datasets',
+)
+
+# Heading words -> relevance weight, matched as whole words ('reference' is not in 'Preference
+# Data'); sections matching a weight of -10 are dropped
+HEADING_WEIGHTS: dict[str, float] = {
+    'model description': 5,
+    'model summary': 5,
+    'model details': 4,
+    'model card': 3,
+    'dataset description': 5,
+    'dataset summary': 5,
+    'dataset card': 3,
+    'dataset structure': 2,
+    'overview': 4,
+    'introduction': 4,
+    'about': 3,
+    'summary': 3,
+    'description': 3,
+    'intended use': 3,
+    'uses': 2,
+    'task': 2,
+    'tasks': 2,
+    'modality': 3,
+    'architecture': 2,
+    'training data': 2,
+    'training': 1,
+    'data': 1,
+    'language': 1,
+    'evaluation': 1,
+    'benchmark': 1,
+    'benchmarks': 1,
+    'limitation': -1,
+    'limitations': -1,
+    'bias': -1,
+    'citation': -10,
+    'citations': -10,
+    'bibtex': -10,
+    'reference': -10,
+    'references': -10,
+    'license': -10,
+    'acknowledgment': -10,
+    'acknowledgments': -10,
+    'acknowledgement': -10,
+    'acknowledgements': -10,
+    'contact': -10,
+    'changelog': -10,
+    'news': -10,
+    'update': -10,
+    'latest updates': -10,
+    'install': -10,
+    'installation': -10,
+    'requirements': -10,
+    'environmental impact': -10,
+    'card authors': -10,
+    'more information': -10,
+}
+
+_HEADING_PATTERNS = [
+    (re.compile(rf'\b{re.escape(keyword)}\b'), weight) for keyword, weight in HEADING_WEIGHTS.items()
+]
+
+# Words in the body of a section that hint at what the repository is
+BODY_KEYWORDS = re.compile(
+    r'\b(model|dataset|pretrain\w*|fine-?tun\w*|instruction|benchmark|evaluation|preference|'
+    r'rlhf|dpo|language|text|image|vision|video|speech|audio|multimodal|embedding|'
+    r'robot\w*|protein|3d|point cloud)\b',
+    re.IGNORECASE,
+)
+
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_BIBTEX_RE = re.compile(r'@\w+\s*\{[^@]*?\n\s*\}', re.DOTALL)
+_BADGE_RE = re.compile(r'\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)|!\[[^\]]*\]\([^)]*\)')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_HTML_IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r'</?[a-zA-Z][^>]*>')
+_URL_RE = re.compile(r'https?://\S+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+TRUNCATION_MARK = '[...]'
+
+
+@dataclass
+class Section:
+    position: int
+    heading: str
+    text: str
+    score: float = 0.0
+
+
+def _format_value(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value[:10])
+    return str(value)
+
+
+def _clean_body(body: str) -> str:
+    """Remove code blocks, tables, badges, images, citations, HTML and bare URLs."""
+    body = _HTML_COMMENT_RE.sub('', body)
+    lines, in_code = [], False
+    for line in body.splitlines():
+        if _FENCE_RE.match(line):
+            in_code = not in_code
+            continue
+        if in_code or line.lstrip().startswith('|'):
+            continue
+        lines.append(line)
+    body = '\n'.join(lines)
+    body = _BIBTEX_RE.sub('', body)
+    body = _BADGE_RE.sub('', body)
+    body = _HTML_IMG_RE.sub('', body)
+    body = _LINK_RE.sub(r'\1', body)
+    body = _HTML_TAG_RE.sub('', body)
+    body = _URL_RE.sub('', body)
+    return body
+
+
+def _split_sections(body: str) -> list[Section]:
+    sections = [Section(0, '', '')]
+    text: list[str] = []
+    for line in body.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            sections[-1].text = '\n'.join(text).strip()
+            sections.append(Section(len(sections), line.strip(), ''))
+            text = []
+        else:
+            text.append(line.rstrip())
+    sections[-1].text = '\n'.join(text).strip()
+    return [s for s in sections if s.text]
+
+
+def _heading_weight(heading: str) -> float | None:
+    """Weight of a heading, or None if the section should be dropped."""
+    title = heading.lstrip('#').strip().lower()
+    weights = [w for pattern, w in _HEADING_PATTERNS if pattern.search(title)]
+    if any(w <= -10 for w in weights):
+        return None
+    if any(w < 0 for w in weights):
+        return min(weights)
+    return max(weights, default=0.0)
+
+
+class ReadmeCondenser:
+    """Condense a README into its card metadata and most relevant sections within a token budget.
+
+    Code blocks, tables, badges, images, citations and boilerplate sections (license,
+    installation, contact, ...) are dropped; the remaining sections are ranked by their heading
+    and by keyword density, and the best ones are kept in their original order.
+    """
+
+    def __init__(self, max_section_tokens: int | None = None):
+        # Upper bound of the share of the budget a single section may take
+        self.max_section_tokens = max_section_tokens
+
+    def _metadata_summary(self, metadata: dict) -> str:
+        lines = [
+            f'{key}: {_format_value(metadata[key])}'
+            for key in METADATA_KEYS
+            if metadata.get(key) not in (None, '', [])
+        ]
+        return '\n'.join(lines)
+
+    def _rank(self, sections: list[Section]) -> list[Section]:
+        ranked = []
+        for section in sections:
+            weight = _heading_weight(section.heading)
+            if weight is None:
+                continue
+            words = max(1, len(section.text.split()))
+            density = len(BODY_KEYWORDS.findall(section.text)) / words
+            # The text before the first heading (or right after the title) usually says what
+            # the repository is
+            lead = 3.0 if section.position <= 1 else 0.0
+            section.score = weight + lead + 10 * density - 0.1 * section.position
+            ranked.append(section)
+        return sorted(ranked, key=lambda s: s.score, reverse=True)
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        max_chars = max(0, max_tokens * 4 - len(TRUNCATION_MARK) - 1)
+        if len(text) <= max_chars:
+            return text
+        cut = text.rfind('\n', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = text.rfind(' ', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = max_chars
+        return text[:cut].rstrip() + '\n' + TRUNCATION_MARK
+
+    def condense(self, readme: str, max_tokens: int) -> str:
+        if estimate_tokens(readme) <= max_tokens:
+            return readme
+        metadata, body = split_front_matter(readme)
+        parts: dict[int, str] = {}
+        budget = max_tokens
+        summary = self._metadata_summary(metadata)
+        if summary:
+            summary = self._truncate(f'Metadata:\n{summary}', max_tokens // 4)
+            budget -= estimate_tokens(summary)
+
+        sections = self._rank(_split_sections(_clean_body(body)))
+        section_cap = self.max_section_tokens or max_tokens
+        for section in sections:
+            if budget <= 16:
+                break
+            text = f'{section.heading}\n{section.text}' if section.heading else section.text
+            text = self._truncate(_BLANK_LINES_RE.sub('\n\n', text), min(budget, section_cap))
+            parts[section.position] = text
+            budget -= estimate_tokens(text) + 1
+
+        body = '\n\n'.join(parts[position] for position in sorted(parts))
+        return f'{summary}\n\n{body}'.strip() if summary else body
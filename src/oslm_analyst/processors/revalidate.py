@@ -0,0 +1,142 @@
+"""Flag tracked repositories that were deleted or made private, by diffing one listing per
+account against the extra-info files instead of probing every repository."""
+
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import jsonlines
+from loguru import logger
+
+from oslm_analyst.crawlers.crawl_utils import format_identifier_from_dict
+from oslm_analyst.crawlers.huggingface import HfCrawler
+from oslm_analyst.crawlers.modelscope import MsCrawler
+from oslm_analyst.processors.modality import cleanup_temp_files, write_jsonl_atomic
+from oslm_analyst.utils import today
+
+# Accounts with fewer tracked entries are never skipped for losing too many of them
+MIN_GUARDED_ENTRIES = 4
+
+# (platform, account, category) -> names of the live repositories; raises if the listing fails
+ListNames = Callable[[str, str, Literal['model', 'dataset']], set[str]]
+
+
+def platform_of(link: str) -> str | None:
+    """Platform with an account listing the entry can be checked against, from its link."""
+    if 'huggingface.co' in link:
+        return 'huggingface'
+    if 'modelscope.cn' in link:
+        return 'modelscope'
+    return None
+
+
+def crawler_list_names(max_retry: int = 5) -> ListNames:
+    """List repositories with the HuggingFace/ModelScope crawlers."""
+    crawlers = {
+        'huggingface': HfCrawler(max_retry=max_retry),
+        'modelscope': MsCrawler(max_retry=max_retry),
+    }
+
+    def list_names(platform: str, account: str, category: Literal['model', 'dataset']) -> set[str]:
+        return crawlers[platform].list_names(account, category)
+
+    return list_names
+
+
+@dataclass
+class RevalidationResult:
+    category: str
+    checked: int = 0
+    accounts: int = 0
+    vanished: list[str] = field(default_factory=list)
+    # Accounts whose listing failed or looked implausible; their entries are left as they are
+    skipped_accounts: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f'{self.category}: {len(self.vanished)} of {self.checked} entries vanished '
+            f'({self.accounts} accounts listed, {len(self.skipped_accounts)} skipped)'
+        )
+
+
+def revalidate_info_file(
+    info_path: Path,
+    category: Literal['model', 'dataset'],
+    list_names: ListNames,
+    concurrency: int = 4,
+    max_vanished_ratio: float = 0.5,
+    dry_run: bool = False,
+    audit_path: Path | None = None,
+) -> RevalidationResult:
+    """Set `valid: false` on the entries missing from the listing of their account.
+
+    Entries already invalid, and entries of platforms without listings, are not checked. An
+    account with several entries is skipped when more than `max_vanished_ratio` of them would
+    vanish, which usually means a renamed account or a truncated listing, not mass deletion.
+    """
+    cleanup_temp_files(info_path)
+    with jsonlines.open(info_path, 'r') as reader:
+        lines: list[dict] = list(reader)
+
+    tracked: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for idx, line in enumerate(lines):
+        platform = platform_of(line.get('link') or '')
+        if platform is not None and line.get('valid') is not False:
+            tracked[(platform, line['repo'])].append(idx)
+    result = RevalidationResult(category, checked=sum(len(v) for v in tracked.values()))
+    logger.info(f'Revalidating {result.checked} {category} entries of {len(tracked)} accounts')
+
+    def listing(key: tuple[str, str]) -> tuple[tuple[str, str], set[str] | None]:
+        platform, account = key
+        try:
+            # Repository names are case-insensitive on both platforms
+            return key, {name.lower() for name in list_names(platform, account, category)}
+        except Exception as e:
+            logger.warning(f'Could not list {category} repositories of {platform}/{account}: {e}')
+            return key, None
+
+    audit = []
+    with ThreadPoolExecutor(max(1, concurrency)) as pool:
+        for (platform, account), live in pool.map(listing, tracked):
+            if live is None:
+                result.skipped_accounts.append(f'{platform}/{account}')
+                continue
+            indices = tracked[(platform, account)]
+            vanished = [idx for idx in indices if lines[idx]['name'].lower() not in live]
+            if (
+                len(indices) >= MIN_GUARDED_ENTRIES
+                and len(vanished) > max_vanished_ratio * len(indices)
+            ):
+                logger.warning(
+                    f'{len(vanished)} of {len(indices)} {category} entries of {platform}/{account} '
+                    'are missing from its listing, skipping the account'
+                )
+                result.skipped_accounts.append(f'{platform}/{account}')
+                continue
+            result.accounts += 1
+            for idx in vanished:
+                identifier = format_identifier_from_dict(lines[idx])
+                result.vanished.append(identifier)
+                audit.append(
+                    {
+                        'date': today(),
+                        'category': category,
+                        'identifier': identifier,
+                        'platform': platform,
+                        'previous_valid': lines[idx].get('valid'),
+                    }
+                )
+                lines[idx]['valid'] = False
+
+    logger.info(f'Revalidation: {result.summary()}')
+    if dry_run or not result.vanished:
+        return result
+    write_jsonl_atomic(info_path, lines)
+    if audit_path is not None:
+        audit_path.parent.mkdir(parents=True, exist_ok=True)
+        with jsonlines.open(audit_path, 'a') as writer:
+            writer.write_all(audit)
+    return result
@@ -1,3 +1,5 @@
+import threading
+import time
 import yaml
 import jsonlines
 from pathlib import Path
@@ -20,6 +22,25 @@ def parse_commas_separated_params(param: str) -> list[str]:
     return params
 
 
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least `1 / rate` seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
 class Source(NamedTuple):
     """
     Data structure for the data source passed to the Crawler.
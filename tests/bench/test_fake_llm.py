@@ -0,0 +1,59 @@
+from oslm_analyst.bench.fake_llm import FakeLLMServer, deterministic_label
+from oslm_analyst.bench.modality_throughput import ThroughputSetting, make_info_lines, run_setting
+from oslm_analyst.bench.readme_source import FakeReadmeSource
+from oslm_analyst.processors.llm_scheduler import LLMRequestScheduler
+from oslm_analyst.processors.modality import ModalityAIHelper
+
+
+def test_fake_llm_answers_single_and_batched_prompts():
+    with FakeLLMServer() as server:
+        helper = ModalityAIHelper(
+            api_key='fake', base_url=server.base_url, model='fake', knn_threshold=None
+        )
+        result = helper.classify_dataset('org/a', 'link', 'A text dataset.')
+        assert result == deterministic_label('org/a', 'dataset')
+
+        helper.batch_size = 3
+        items = [(f'org/m{i}', 'link', 'A model.') for i in range(3)]
+        results = helper.classify_models_batch(items)
+        assert results == [deterministic_label(item[0], 'model') for item in items]
+        assert server.requests == 2
+
+
+def test_fake_llm_rate_limit_is_retried():
+    with FakeLLMServer(rpm=1, rate_window=0.5) as server:
+        helper = ModalityAIHelper(
+            api_key='fake', base_url=server.base_url, model='fake', knn_threshold=None
+        )
+        helper.scheduler = LLMRequestScheduler(max_attempts=3, backoff_initial=0, backoff_max=0)
+        server.respond({'messages': []})
+        # The only request of the window is used up: the 429 is retried after Retry-After
+        result = helper.classify_model('org/a', 'link', 'A model.')
+        assert result == deterministic_label('org/a', 'model')
+        assert server.rate_limited == 1
+        assert helper.metrics['model'].retries == 1
+
+
+def test_throughput_run(tmp_path):
+    readme_source = FakeReadmeSource()
+    with FakeLLMServer() as server:
+        result = run_setting(
+            ThroughputSetting(llm_concurrency=2, batch_size=4, cache=True),
+            server,
+            readme_source,
+            n_items=20,
+            work_dir=tmp_path,
+        )
+    assert result['items'] == 20
+    assert result['llm']['cache_hits'] > 0
+    assert 'warm_seconds' in result
+    assert len(make_info_lines('dataset', 3)) == 3
+    assert all('lifecycle' in line for line in make_info_lines('dataset', 3))
+    assert not list(tmp_path.iterdir())
+
+
+def test_fake_readme_source_is_deterministic():
+    source = FakeReadmeSource(empty_ratio=0.0, metadata_ratio=1.0)
+    readme = source.fetch('org/a', 'link', 'model')
+    assert readme == source.fetch('org/a', 'link', 'model')
+    assert readme.startswith('---\npipeline_tag:')
@@ -0,0 +1,62 @@
+import json
+
+from oslm_analyst.bench.osir_lmts_scaling import find_regressions, run_size
+from oslm_analyst.bench.osir_lmts_synthetic import SyntheticSetting, generate_tree
+
+SETTING = SyntheticSetting(orgs=5, identifiers=200, months=2, snapshots_per_month=2)
+
+
+def read_tree(root):
+    return {
+        str(path.relative_to(root)): path.read_text(encoding='utf-8')
+        for path in sorted(root.rglob('*'))
+        if path.is_file()
+    }
+
+
+def test_synthetic_tree_is_complete_and_deterministic(tmp_path):
+    months = generate_tree(tmp_path / 'a', SETTING)
+    generate_tree(tmp_path / 'b', SETTING)
+    assert months == ['2026-01', '2026-02']
+    tree = read_tree(tmp_path / 'a')
+    assert tree == read_tree(tmp_path / 'b')
+
+    for name in ('orgs.yaml', 'model_info.jsonl', 'dataset_descendants.jsonl'):
+        assert f'config/{name}' in tree
+    assert 'config/other_source_datasets.jsonl' in tree
+    assert {'infra_summary.csv', 'eval_summary.csv'} <= set(tree)
+    assert 'output/osir-lmts_2026-02/infra_summary.csv' in tree
+    snapshots = [path for path in tree if path.endswith('raw_model_data.jsonl')]
+    assert len(snapshots) == 2 * 2 * 2  # platforms, months, snapshots per month
+    lines = [json.loads(line) for path in snapshots for line in tree[path].splitlines()]
+    assert {line['category'] for line in lines} == {'model'}
+    assert any('downloads_last_month' in line for line in lines)
+    assert any('downloads' in line for line in lines)
+
+
+def test_run_size_profiles_every_stage(tmp_path):
+    result = run_size(SETTING, work_dir=tmp_path)
+    assert result['identifiers'] == 200
+    assert result['month'] == '2026-02'
+    assert {'model_data', 'rank', 'universe_acc_rank'} <= set(result['stages'])
+    assert result['stages']['model_data']['rows'] > 0
+    # Timed unprofiled, with the peak memory of a profiled rerun
+    assert all(stage['wall_seconds'] >= 0 for stage in result['stages'].values())
+    assert result['stages']['model_data']['peak_memory'] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_regressions_beyond_threshold_and_noise_floor():
+    def result(seconds, memory):
+        stage = {'wall_seconds': seconds, 'peak_memory': memory}
+        return {'identifiers': 1000, 'engine': 'python', 'stages': {'model_data': stage}}
+
+    baseline = [result(1.0, 100 * 2**20)]
+    assert find_regressions([result(1.4, 140 * 2**20)], baseline) == []
+    assert len(find_regressions([result(2.0, 100 * 2**20)], baseline)) == 1
+    assert len(find_regressions([result(2.0, 300 * 2**20)], baseline)) == 2
+    # Tripled, but by less than the noise floors
+    assert find_regressions([result(0.03, 3 * 2**10)], [result(0.01, 2**10)]) == []
+    # No baseline of that setting, engine or number of workers
+    for other in ({'engine': 'columnar'}, {'workers': 4}, {'skew': 2.0}):
+        assert find_regressions([dict(result(5.0, 0), **other)], baseline) == []
@@ -0,0 +1,51 @@
+import time
+
+from pytest import raises
+
+from oslm_analyst.processors import llm_scheduler
+from oslm_analyst.processors.llm_scheduler import LLMRequestScheduler, RateLimitExhausted
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+def test_scheduler_paces_requests(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, 'WINDOW_SECONDS', 0.3)
+    scheduler = LLMRequestScheduler(rpm=2, tpm=100)
+    start = time.monotonic()
+    scheduler.acquire(10)
+    scheduler.acquire(10)
+    assert time.monotonic() - start < 0.1
+    # Third request exceeds the RPM budget and waits for the window to slide
+    scheduler.acquire(10)
+    assert time.monotonic() - start >= 0.3
+    # A request larger than the TPM budget waits until it can be sent alone
+    scheduler.acquire(500)
+    assert time.monotonic() - start >= 0.6
+
+
+def test_scheduler_retries_rate_limits():
+    scheduler = LLMRequestScheduler(max_attempts=3, backoff_initial=0.01, backoff_max=0.01)
+    calls, retries = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FakeRateLimitError()
+        return 'ok'
+
+    assert scheduler.submit(flaky, 10, on_retry=lambda: retries.append(1)) == 'ok'
+    assert len(retries) == 2
+
+    def always_limited():
+        raise FakeRateLimitError()
+
+    with raises(RateLimitExhausted):
+        scheduler.submit(always_limited, 10)
+
+    def broken():
+        raise ValueError('not retried')
+
+    with raises(ValueError):
+        scheduler.submit(broken, 10)
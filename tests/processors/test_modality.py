@@ -0,0 +1,285 @@
+import json
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from pytest import fixture, mark, raises
+
+from oslm_analyst.processors.llm_scheduler import LLMRequestScheduler, RateLimitExhausted
+from oslm_analyst.processors.modality import ModalityAIHelper
+from oslm_analyst.processors.modality_knn import KnnModalityClassifier
+
+
+@fixture
+def ai_helper(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    return ModalityAIHelper(batch_size=3, use_rules=True, knn_threshold=None)
+
+
+def use_fake_llm(helper: ModalityAIHelper, responses: list[str]):
+    helper.llm = FakeListChatModel(responses=responses)  # type: ignore
+    helper._build_chains()
+
+
+def test_classify_models_batch(ai_helper: ModalityAIHelper):
+    use_fake_llm(
+        ai_helper,
+        [
+            json.dumps(
+                [
+                    {'identifier': 'org/b', 'valid': True, 'modality': 'Vision', 'reason': ''},
+                    {'identifier': 'org/a', 'valid': True, 'modality': 'Language', 'reason': ''},
+                ]
+            )
+        ],
+    )
+    items = [('org/a', 'link-a', 'readme a'), ('org/b', 'link-b', 'readme b'), ('org/c', 'c', '')]
+    results = ai_helper.classify_models_batch(items)
+    assert [r['modality'] for r in results] == ['Language', 'Vision', None]
+    assert results[2]['valid'] is False
+
+
+def test_classify_datasets_batch_fallback(ai_helper: ModalityAIHelper):
+    single = {'valid': True, 'modality': 'Speech', 'lifecycle': 'Fine-tuning', 'reason': ''}
+    use_fake_llm(ai_helper, ['not json at all', json.dumps(single), json.dumps(single)])
+    items = [('org/a', 'link-a', 'readme a'), ('org/b', 'link-b', 'readme b')]
+    results = ai_helper.classify_datasets_batch(items)
+    assert [r['lifecycle'] for r in results] == ['Fine-tuning', 'Fine-tuning']
+
+
+def test_classify_batch_with_renamed_identifiers_falls_back(ai_helper: ModalityAIHelper):
+    renamed = [
+        {'identifier': 'org/x', 'valid': True, 'modality': 'Vision', 'reason': ''},
+        {'identifier': 'org/y', 'valid': True, 'modality': 'Speech', 'reason': ''},
+    ]
+    single = {'valid': True, 'modality': 'Language', 'reason': ''}
+    use_fake_llm(ai_helper, [json.dumps(renamed), json.dumps(single), json.dumps(single)])
+    items = [('org/a', 'link-a', 'readme a'), ('org/b', 'link-b', 'readme b')]
+    results = ai_helper.classify_models_batch(items)
+    assert [r['modality'] for r in results] == ['Language', 'Language']
+
+
+def test_pack_batches_token_budget(ai_helper: ModalityAIHelper):
+    ai_helper.batch_token_budget = 1000
+    items = [(f'org/{i}', 'link', 'x' * 4000) for i in range(5)]
+    batches = list(ai_helper._pack_batches(items))
+    assert [len(b) for b in batches] == [1, 1, 1, 1, 1]
+    ai_helper.batch_token_budget = 24000
+    assert [len(b) for b in ai_helper._pack_batches(items)] == [3, 2]
+
+
+def test_rules_skip_llm(ai_helper: ModalityAIHelper):
+    use_fake_llm(ai_helper, [])
+    readme = '---\npipeline_tag: text-generation\nlibrary_name: transformers\n---\n# Model\nSome text.'
+    classification = ai_helper._pre_classify('model', ('org/a', 'link', readme))
+    assert classification is not None
+    assert classification['modality'] == 'Language'
+    assert ai_helper.stats['model'].llm_calls_avoided == 1
+    ambiguous = '---\npipeline_tag: text-generation\nlibrary_name: timm\n---\n# Model\nSome text.'
+    assert ai_helper._pre_classify('model', ('org/b', 'link', ambiguous)) is None
+
+    # Off unless asked for, the rules leave the repositories to the LLM
+    helper = ModalityAIHelper(knn_threshold=None)
+    assert helper.rule_classifier is None
+    assert helper._pre_classify('model', ('org/a', 'link', readme)) is None
+
+
+def test_knn_never_marks_invalid(ai_helper: ModalityAIHelper):
+    identifiers = ['org/llama-7b', 'org/llama-13b', 'spam/test-1', 'spam/test-2', 'spam/test-3']
+    labels = ['Language', 'Language', 'invalid', 'invalid', 'invalid']
+    ai_helper.knn_classifiers['model'] = KnnModalityClassifier(n_features=2**12, k=3).fit(
+        identifiers, labels
+    )
+    ai_helper.knn_threshold = 0.0
+    assert ai_helper._knn_classify('model', 'org/llama-70b')['modality'] == 'Language'  # type: ignore
+    # A confident invalid prediction falls through to the README and LLM stages
+    assert ai_helper._knn_classify('model', 'spam/test-4') is None
+
+
+def test_update_extra_info_pipeline(ai_helper: ModalityAIHelper, tmp_path):
+    lines = [
+        {'repo': 'org', 'name': f'm{i}', 'modality': None, 'valid': None, 'link': 'link'}
+        for i in range(10)
+    ]
+    lines.append({'repo': 'org', 'name': 'done', 'modality': 'Vision', 'valid': True, 'link': ''})
+    info_path = tmp_path / 'model_info.jsonl'
+    info_path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    ai_helper.model_info_path = info_path
+    ai_helper.dataset_info_path = tmp_path / 'missing.jsonl'
+    ai_helper.prefetch_queue_size = 2
+    ai_helper.llm_concurrency = 2
+    ai_helper._fetch_readme = lambda identifier, link, category: (  # type: ignore
+        '' if identifier.endswith('m0') else '---\npipeline_tag: text-generation\n---\nA model.'
+    )
+    ai_helper.update_extra_info()
+
+    result = [json.loads(line) for line in info_path.read_text().splitlines()]
+    assert [line['name'] for line in result] == [line['name'] for line in lines]
+    assert result[0]['valid'] is False
+    assert all(line['modality'] == 'Language' for line in result[1:10])
+    assert result[10]['modality'] == 'Vision'
+    assert ai_helper.stats['model'].resolved_by['rules'] == 9
+
+
+def test_failing_fetch_worker_aborts_pipeline(ai_helper: ModalityAIHelper):
+    lines = [{'repo': 'org', 'name': f'm{i}', 'link': 'link'} for i in range(4)]
+    ai_helper.llm_concurrency = 2
+
+    def failing_fetch(identifier, link, category):
+        raise RuntimeError('fetch failed')
+
+    ai_helper._fetch_readme = failing_fetch  # type: ignore
+    # The classification workers must not wait forever for a sentinel that is never queued
+    with raises(RuntimeError, match='fetch failed'):
+        ai_helper._run_pipeline('model', lines, list(range(4)))
+
+
+def test_update_extra_info_checkpoints(ai_helper: ModalityAIHelper, tmp_path):
+    lines = [
+        {'repo': 'org', 'name': f'm{i}', 'modality': None, 'valid': None, 'link': 'link'}
+        for i in range(6)
+    ]
+    info_path = tmp_path / 'model_info.jsonl'
+    info_path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    (tmp_path / '.model_info.jsonl.abc.tmp').write_text('orphan')
+    (tmp_path / 'tmp_notes.jsonl').write_text('kept')
+    ai_helper.model_info_path = info_path
+    ai_helper.dataset_info_path = tmp_path / 'missing.jsonl'
+    ai_helper.batch_size = 1
+    ai_helper.fetch_concurrency = 1
+    ai_helper.checkpoint_every = 2
+    ai_helper.rule_classifier = None
+    ai_helper._fetch_readme = lambda identifier, link, category: 'readme'  # type: ignore
+
+    calls = []
+
+    def flaky_classify(category, items):
+        calls.append(items[0][0])
+        if len(calls) == 4:
+            raise RuntimeError('interrupted')
+        return [{'valid': True, 'modality': 'Speech', 'reason': ''}]
+
+    ai_helper._classify_items = flaky_classify  # type: ignore
+    try:
+        ai_helper.update_extra_info()
+    except RuntimeError:
+        pass
+    saved = [json.loads(line) for line in info_path.read_text().splitlines()]
+    assert sum(line['modality'] == 'Speech' for line in saved) == 3
+    assert list(tmp_path.glob('*.tmp')) == []
+    assert (tmp_path / 'tmp_notes.jsonl').read_text() == 'kept'
+
+    # A rerun only classifies the remaining entries
+    calls.clear()
+    ai_helper._classify_items = lambda category, items: (  # type: ignore
+        calls.append(items[0][0]) or [{'valid': True, 'modality': 'Speech', 'reason': ''}]
+    )
+    ai_helper.update_extra_info()
+    assert len(calls) == 3
+    saved = [json.loads(line) for line in info_path.read_text().splitlines()]
+    assert all(line['modality'] == 'Speech' for line in saved)
+
+
+def test_rate_limited_items_stay_unclassified(ai_helper: ModalityAIHelper):
+    use_fake_llm(ai_helper, [])
+    ai_helper.scheduler = LLMRequestScheduler(max_attempts=2, backoff_initial=0, backoff_max=0)
+
+    def rate_limited(*args, **kwargs):
+        raise RateLimitExhausted('429')
+
+    ai_helper.scheduler.submit = rate_limited  # type: ignore
+    assert ai_helper.classify_model('org/a', 'link', 'readme') is None
+    items = [('org/a', 'link-a', 'readme a'), ('org/b', 'link-b', 'readme b')]
+    assert ai_helper.classify_datasets_batch(items) == [None, None]
+    assert ai_helper.metrics['dataset'].fallbacks['rate_limited'] == 1
+
+
+@mark.parametrize('workers', [1, 2])
+def test_update_raw_data_files(ai_helper: ModalityAIHelper, tmp_path, workers):
+    info_path = tmp_path / 'dataset_info.jsonl'
+    info_path.write_text(
+        json.dumps(
+            {
+                'repo': 'org',
+                'name': 'known',
+                'modality': 'Language',
+                'lifecycle': 'Evaluation',
+                'valid': True,
+                'link': 'l',
+            }
+        )
+        + '\n'
+    )
+    ai_helper.dataset_info_path = info_path
+
+    def raw(name, modality=None, lifecycle=None):
+        return {
+            'repo': 'org',
+            'name': name,
+            'downloads': 1,
+            'modality': modality,
+            'lifecycle': lifecycle,
+            'valid': None,
+            'link': 'l',
+        }
+
+    snapshots = []
+    for i, rows in enumerate(
+        [
+            [raw('known'), raw('new'), raw('done', 'Vision', 'Pre-training')],
+            [raw('new'), raw('known')],
+        ]
+    ):
+        path = tmp_path / f'snapshot{i}' / 'raw_dataset_data.jsonl'
+        path.parent.mkdir()
+        path.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+        snapshots.append(path)
+
+    ai_helper.update_raw_data_files(snapshots, 'dataset', workers=workers)
+
+    first = [json.loads(line) for line in snapshots[0].read_text().splitlines()]
+    assert first[0]['modality'] == 'Language' and first[0]['valid'] is True
+    assert first[1]['modality'] is None
+    assert first[2]['lifecycle'] == 'Pre-training'
+    second = [json.loads(line) for line in snapshots[1].read_text().splitlines()]
+    assert second[1]['lifecycle'] == 'Evaluation'
+    info = [json.loads(line) for line in info_path.read_text().splitlines()]
+    # The new identifier is added once, although both snapshots contain it
+    assert [line['name'] for line in info] == ['known', 'new']
+    assert info[1] == {
+        'repo': 'org',
+        'name': 'new',
+        'modality': None,
+        'lifecycle': None,
+        'valid': None,
+        'link': 'l',
+    }
+
+
+def test_update_snapshots(ai_helper: ModalityAIHelper, tmp_path):
+    info_path = tmp_path / 'model_info.jsonl'
+    info_path.write_text('')
+    ai_helper.model_info_path = info_path
+    ai_helper.dataset_info_path = tmp_path / 'missing.jsonl'
+    ai_helper._fetch_readme = lambda identifier, link, category: (  # type: ignore
+        '---\npipeline_tag: text-generation\n---\nA model.'
+    )
+    inp_dirs = []
+    for i, names in enumerate([['a', 'b'], ['b', 'c']]):
+        inp_dir = tmp_path / f'snapshot{i}'
+        inp_dir.mkdir()
+        rows = [
+            {'repo': 'org', 'name': n, 'downloads': 1, 'modality': None, 'valid': None, 'link': ''}
+            for n in names
+        ]
+        (inp_dir / 'raw_model_data.jsonl').write_text(''.join(json.dumps(r) + '\n' for r in rows))
+        inp_dirs.append(inp_dir)
+
+    ai_helper.update_snapshots(inp_dirs, workers=2)
+
+    info = [json.loads(line) for line in info_path.read_text().splitlines()]
+    # The union of the snapshots is classified once
+    assert [line['name'] for line in info] == ['a', 'b', 'c']
+    assert ai_helper.stats['model'].resolved_by['rules'] == 3
+    for inp_dir in inp_dirs:
+        raw_path = inp_dir / 'raw_model_data.jsonl'
+        raw = [json.loads(line) for line in raw_path.read_text().splitlines()]
+        assert all(line['modality'] == 'Language' for line in raw)
@@ -0,0 +1,54 @@
+import json
+
+from oslm_analyst.bench.fake_llm import FakeLLMServer, deterministic_label
+from oslm_analyst.processors.modality_eval import (
+    parse_eval_config,
+    recommend,
+    run_eval,
+    sample_labelled,
+)
+
+
+def test_parse_eval_config():
+    config = parse_eval_config('rules:llm=false,batch-size=8,knn_threshold=0.7,model=none')
+    assert config.name == 'rules'
+    assert config.llm is False and config.batch_size == 8
+    assert config.knn_threshold == 0.7 and config.model is None
+    assert parse_eval_config('baseline').batch_size == 1
+
+
+def test_run_eval(tmp_path):
+    lines = []
+    for i in range(20):
+        identifier = f'org/m{i}'
+        # Half of the stored labels agree with the fake LLM
+        label = deterministic_label(identifier, 'model') if i % 2 else {'valid': False}
+        lines.append({'repo': 'org', 'name': f'm{i}', 'link': '', 'modality': None, **label})
+    lines.append({'repo': 'org', 'name': 'unlabelled', 'link': '', 'modality': None, 'valid': None})
+    info_path = tmp_path / 'model_info.jsonl'
+    info_path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+
+    sample, rest = sample_labelled(info_path, 'model', 10)
+    assert len(sample) == 10 and len(rest) == 10
+    readme = '# Model\n\nA transformer model for text generation, trained on web text.'
+    readmes = {f'org/m{i}': readme for i in range(20)}
+
+    with FakeLLMServer() as server:
+        llm = run_eval(
+            parse_eval_config('llm'), sample, rest, readmes, 'model', 'fake', server.base_url
+        ).to_dict()
+        local_config = parse_eval_config('local:llm=false')
+        local = run_eval(
+            local_config, sample, rest, readmes, 'model', 'fake', server.base_url
+        ).to_dict()
+
+    expected = sum(1 for line in sample if int(line['name'][1:]) % 2) / 10
+    assert llm['coverage'] == 1.0
+    assert llm['accuracy'] >= expected
+    assert llm['llm_calls'] == 10
+    assert llm['latency_p95'] is not None
+    assert sum(sum(row.values()) for row in llm['confusion_matrix'].values()) == 10
+
+    assert local['coverage'] == 0.0 and local['llm_calls'] == 0
+    assert local['confusion_matrix']['invalid'].keys() == {'unresolved'}
+    assert recommend([llm, local], min_accuracy=0.4)['config']['name'] == 'llm'
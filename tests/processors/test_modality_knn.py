@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from oslm_analyst.processors.modality_knn import (
+    KnnModalityClassifier,
+    classification_from_label,
+    label_from_dict,
+)
+
+
+def test_knn_predict_and_roundtrip(tmp_path: Path):
+    identifiers = [
+        'Qwen/Qwen2.5-7B-Instruct',
+        'Qwen/Qwen2.5-14B-Instruct',
+        'Qwen/Qwen2.5-72B-Instruct',
+        'openai/whisper-small',
+        'openai/whisper-large-v3',
+        'openai/whisper-base',
+    ]
+    labels = ['Language'] * 3 + ['Speech'] * 3
+    clf = KnnModalityClassifier(n_features=2**12, k=3).fit(identifiers, labels)
+    prediction = clf.predict('Qwen/Qwen2.5-32B-Instruct')
+    assert prediction is not None and prediction.label == 'Language'
+    assert 0 < prediction.confidence <= 1
+
+    clf.save(tmp_path / 'knn.npz')
+    loaded = KnnModalityClassifier.load(tmp_path / 'knn.npz')
+    assert loaded.predict('openai/whisper-medium').label == 'Speech'  # type: ignore
+    unrelated = loaded.predict('zzz/qqq')
+    assert unrelated is None or unrelated.confidence < 0.5
+
+
+def test_labels():
+    line = {'repo': 'a', 'name': 'b', 'valid': True, 'modality': 'Vision', 'lifecycle': None}
+    assert label_from_dict(line, 'model') == 'Vision'
+    assert label_from_dict(line, 'dataset') is None
+    assert label_from_dict({**line, 'valid': False}, 'dataset') == 'invalid'
+    assert classification_from_label('Vision|Fine-tuning', 'dataset', '')['lifecycle'] == 'Fine-tuning'
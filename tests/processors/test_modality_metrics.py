@@ -0,0 +1,68 @@
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from pytest import fixture
+
+from oslm_analyst.processors.modality import ModalityAIHelper
+
+
+@fixture
+def ai_helper(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    return ModalityAIHelper(
+        knn_threshold=None,
+        prompt_price=1.0,
+        completion_price=2.0,
+        condense_readme=False,
+        readme_token_budget=2000,
+    )
+
+
+def fake_message(content: dict | str, input_tokens: int, output_tokens: int) -> AIMessage:
+    return AIMessage(
+        content=content if isinstance(content, str) else json.dumps(content),
+        usage_metadata={
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens,
+        },
+    )
+
+
+def test_llm_call_metrics(ai_helper: ModalityAIHelper, tmp_path):
+    answer = {'valid': True, 'modality': 'Language', 'reason': ''}
+    ai_helper.llm = GenericFakeChatModel(  # type: ignore
+        messages=iter([fake_message(answer, 1000, 50), fake_message('not json', 800, 10)])
+    )
+    ai_helper._build_chains()
+
+    assert ai_helper.classify_model('org/a', 'link', 'x' * 10000)['modality'] == 'Language'
+    assert ai_helper.classify_model('org/b', 'link', 'short readme')['reason'].startswith('Fallback')
+
+    summary = ai_helper.write_metrics(tmp_path / 'metrics.json', wall_seconds=1.0)
+    assert json.loads((tmp_path / 'metrics.json').read_text()) == summary
+    model = summary['model']
+    assert model['calls'] == 2
+    assert model['prompt_tokens'] == 1800
+    assert model['completion_tokens'] == 60
+    assert model['estimated_cost'] == (1800 * 1.0 + 60 * 2.0) / 1000
+    assert model['latency_seconds']['p50'] is not None
+    assert model['fallbacks'] == {'error': 1}
+    # The 10000 characters README was cut to 8000 characters plus a truncation marker
+    assert model['truncation']['readmes'] == 1
+    assert 1950 < model['truncation']['chars_dropped'] < 2000
+    assert summary['dataset']['calls'] == 0
+
+
+def test_llm_call_metrics_errors(ai_helper: ModalityAIHelper):
+    # An exhausted fake model raises, which is reported as a failed call
+    ai_helper.llm = GenericFakeChatModel(messages=iter([]))  # type: ignore
+    ai_helper._build_chains()
+    result = ai_helper.classify_dataset('org/a', 'link', 'readme')
+    assert result['valid'] is False
+    summary = ai_helper.metrics['dataset'].summary()
+    assert summary['calls'] == 1
+    assert summary['errors'] == 1
+    assert summary['fallbacks'] == {'error': 1}
+    assert 'estimated_cost' not in summary
@@ -0,0 +1,65 @@
+from oslm_analyst.processors.modality_mirror import (
+    MirrorIndex,
+    normalize_name,
+    propagate_mirror_labels,
+)
+
+
+def entry(repo, name, modality=None, valid=None):
+    return {'repo': repo, 'name': name, 'modality': modality, 'valid': valid, 'link': ''}
+
+
+def test_normalize_name():
+    assert normalize_name('Qwen2___5-7B_Instruct') == normalize_name('qwen2.5-7b-instruct')
+
+
+def test_mirror_index():
+    account_orgs = {'qwen': 'Alibaba', 'iic': 'Alibaba'}
+    lines = [
+        entry('Qwen', 'Qwen2.5-7B-Instruct', 'Language', True),
+        entry('Qwen', 'Qwen2.5-VL-7B-Instructt', 'Multimodal', True),
+        entry('someone', 'broken', None, False),
+    ]
+    index = MirrorIndex(lines, 'model', account_orgs, exact_confidence=0.95)
+    # Same organization, same normalized name
+    match = index.find(entry('iic', 'Qwen2___5-7B-Instruct'), 0.9)
+    assert match is not None and match.label == 'Language' and match.match == 'exact'
+    # Nearly the same name with the same numbers
+    match = index.find(entry('iic', 'Qwen2.5-VL-7B-Instruct'), 0.8)
+    assert match is not None and match.label == 'Multimodal' and match.match == 'fuzzy'
+    # Different numbers or unrelated owners never match
+    assert index.find(entry('iic', 'Qwen2.5-72B-Instruct'), 0.5) is None
+    assert index.find(entry('other', 'Qwen2.5-7B-Instruct'), 0.5) is None
+    # Invalid labels are not propagated
+    assert index.find(entry('Someone', 'broken'), 0.5) is None
+
+
+def test_propagate_mirror_labels(tmp_path):
+    lines = [
+        entry('OpenBMB', 'MiniCPM-2B', 'Language', True),
+        entry('openbmb', 'MiniCPM-2B'),
+        entry('openbmb', 'Unrelated'),
+        # Labelled mirrors that agree, which calibrate the confidence of exact links
+        entry('OpenBMB', 'MiniCPM-V', 'Multimodal', True),
+        entry('openbmb', 'minicpm_v', 'Multimodal', True),
+    ]
+    audit_path = tmp_path / 'audit.jsonl'
+    results = propagate_mirror_labels(lines, [1, 2], 'model', {}, 0.9, audit_path)
+    assert list(results) == [1]
+    assert results[1]['modality'] == 'Language' and results[1]['valid'] is True
+    assert '"source": "OpenBMB/MiniCPM-2B"' in audit_path.read_text()
+
+
+def test_exact_confidence_is_measured_agreement():
+    lines = [
+        entry('org', 'a', 'Language', True),
+        entry('ORG', 'a', 'Language', True),
+        entry('org', 'b', 'Vision', True),
+        entry('Org', 'b', 'Language', True),
+    ]
+    index = MirrorIndex(lines, 'model')
+    assert index.exact_confidence == 0.5
+    assert index.find(entry('org', 'A'), 0.9) is None
+    assert index.find(entry('org', 'A'), 0.5).label == 'Language'  # type: ignore
+    # Nothing to measure: nothing is propagated
+    assert MirrorIndex(lines[:1], 'model').exact_confidence == 0.0
@@ -0,0 +1,27 @@
+from oslm_analyst.processors.modality_rules import MetadataRuleClassifier, split_front_matter
+
+
+def test_split_front_matter():
+    metadata, body = split_front_matter('---\nlicense: mit\ntags:\n- dpo\n---\n# Title\n')
+    assert metadata == {'license': 'mit', 'tags': ['dpo']}
+    assert body == '# Title\n'
+    assert split_front_matter('# No metadata') == ({}, '# No metadata')
+
+
+def test_dataset_rules():
+    classifier = MetadataRuleClassifier()
+    readme = (
+        '---\ntask_categories:\n- text-generation\ntags:\n- dpo\n- preference\n---\n'
+        '# Dataset\nPairs of chosen and rejected answers.'
+    )
+    result = classifier.classify('dataset', readme)
+    assert result is not None
+    assert (result['modality'], result['lifecycle']) == ('Language', 'Preference')
+    # Modality is known but lifecycle is not: leave it to the LLM
+    assert classifier.classify('dataset', '---\ntask_categories: [robotics]\n---\nRobot data.') is None
+
+
+def test_empty_or_script_only_card():
+    classifier = MetadataRuleClassifier()
+    result = classifier.classify('model', '# Title\n```bash\npip install foo\n```\n')
+    assert result is not None and result['valid'] is False
@@ -0,0 +1,61 @@
+import json
+import os
+
+import numpy as np
+
+from oslm_analyst.processors.osir_lmts import _read_raw_data_file
+from oslm_analyst.processors.osir_lmts_cache import cache_path, load_raw_columns
+from oslm_analyst.processors.osir_lmts_columnar import load_raw_frame
+
+LINES = [
+    {'repo': 'org', 'name': 'a', 'downloads': 10, 'likes': -1, 'modality': 'Language'},
+    {'repo': 'org', 'name': 'b', 'downloads_last_month': 3, 'likes': None, 'discussions': None},
+    {'repo': 'org', 'name': 'c', 'valid': False, 'downloads': 1},
+    {'repo': '', 'name': 'orphan', 'downloads': 5, 'date_crawl': None},
+    {'repo': 'solo', 'downloads': 7, 'lifecycle': 'Fine-tuning', 'modality': ''},
+    {'repo': '', 'name': ''},
+    {'repo': 'org', 'name': 'a', 'downloads': 12, 'likes': 4, 'date_crawl': '2026-03-02'},
+    {'repo': 'org', 'name': 'ünï', 'downloads': 2**40, 'valid': None},
+    {'repo': 'org', 'name': 'ünïcode', 'downloads': 2**40, 'valid': True},
+]
+
+
+def write_raw(tmp_path, lines=LINES):
+    path = tmp_path / 'huggingface_2026-03-05' / 'raw_model_data.jsonl'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines))
+    return path
+
+
+def test_cached_parse_matches_json_parse(tmp_path):
+    path = write_raw(tmp_path)
+    expected = _read_raw_data_file(path, '2026-03')
+    expected_frame = load_raw_frame(path, '2026-03')
+    for _ in range(2):  # building the cache, then reading it
+        assert _read_raw_data_file(path, '2026-03', parse_cache=True) == expected
+        frame = load_raw_frame(path, '2026-03', parse_cache=True)
+        assert cache_path(path).exists()
+        frame = frame.sort_values('pos').drop(columns='pos').reset_index(drop=True)
+        reference = expected_frame.sort_values('pos').drop(columns='pos').reset_index(drop=True)
+        assert frame.equals(reference)
+    assert isinstance(load_raw_columns(path).arrays['likes'], np.memmap)
+
+
+def test_cache_is_rebuilt_when_the_source_changes(tmp_path):
+    path = write_raw(tmp_path)
+    load_raw_columns(path)
+    write_raw(tmp_path, LINES + [{'repo': 'org', 'name': 'new', 'downloads': 1}])
+    assert 'org/new' in _read_raw_data_file(path, '2026-03', parse_cache=True)
+
+    # Touching the file keeps the columns, and refreshes the key of the cache
+    os.utime(path, ns=(0, 0))
+    assert load_raw_columns(path).strings('identifier')[-1] == 'org/new'
+    assert isinstance(load_raw_columns(path).arrays['likes'], np.memmap)
+
+
+def test_unencodable_files_are_parsed_directly(tmp_path):
+    path = write_raw(tmp_path, LINES + [{'repo': 'org', 'name': 'f', 'downloads': 1.5}])
+    for _ in range(2):
+        assert load_raw_columns(path) is None
+        data = _read_raw_data_file(path, '2026-03', parse_cache=True)
+        assert data['org/f'].downloads_total == 1.5
@@ -0,0 +1,67 @@
+from oslm_analyst.processors.readme_condenser import ReadmeCondenser, _heading_weight
+
+README = """---
+license: apache-2.0
+pipeline_tag: text-generation
+tags: [llm, chat]
+---
+# Foo-7B
+
+[![badge](https://img.shields.io/badge.svg)](https://example.com)
+<img src="logo.png" width=100>
+
+Foo-7B is a large language model pretrained on 2T tokens of text.
+
+## News
+- 2024-01-01: released
+
+## Installation
+```bash
+pip install foo
+```
+
+## Model Description
+Foo is a decoder-only transformer language model, see [the paper](https://arxiv.org/abs/0).
+
+| Benchmark | Score |
+|---|---|
+| MMLU | 60 |
+
+## Citation
+@article{foo,
+  title={Foo}
+}
+
+## License
+Apache 2.0. """ + 'Boilerplate terms. ' * 500
+
+
+def test_condense_keeps_relevant_sections():
+    condensed = ReadmeCondenser().condense(README, 200)
+    assert len(condensed) <= 200 * 4
+    assert 'pipeline_tag: text-generation' in condensed
+    assert 'large language model pretrained' in condensed
+    assert '## Model Description' in condensed
+    assert 'the paper' in condensed
+    for dropped in ('license', 'pip install', 'MMLU', '@article', 'shields.io', 'Boilerplate'):
+        assert dropped not in condensed
+    # Kept sections stay in document order
+    assert condensed.index('Foo-7B is') < condensed.index('## Model Description')
+
+
+def test_condense_fits_budget():
+    short = '# Model\nA small vision model.'
+    assert ReadmeCondenser().condense(short, 100) == short
+    long = '# Model\n' + 'A vision model for image classification. ' * 1000
+    condensed = ReadmeCondenser().condense(long, 100)
+    assert len(condensed) <= 100 * 4
+    assert condensed.endswith('[...]')
+
+
+def test_headings_match_whole_words():
+    assert _heading_weight('## Preference Data') == 1
+    assert _heading_weight('## Model updates and architecture') == 2
+    assert _heading_weight('## Newsletter samples') == 0.0
+    assert _heading_weight('## Metadata') == 0.0
+    assert _heading_weight('## References') is None
+    assert _heading_weight('## Acknowledgements') is None
@@ -0,0 +1,56 @@
+import json
+
+from oslm_analyst.processors.revalidate import revalidate_info_file
+
+
+def entry(repo, name, valid=True, host='huggingface.co'):
+    return {
+        'repo': repo,
+        'name': name,
+        'modality': 'Language',
+        'valid': valid,
+        'link': f'https://{host}/{repo}/{name}',
+    }
+
+
+def test_revalidate_info_file(tmp_path):
+    lines = [
+        entry('org', 'Kept'),
+        entry('org', 'deleted'),
+        entry('org', 'kept-2'),
+        entry('org', 'kept-3'),
+        entry('org', 'already-invalid', valid=False),
+        entry('gone', 'a'),
+        entry('gone', 'b'),
+        entry('gone', 'c'),
+        entry('gone', 'd'),
+        entry('broken', 'a', host='modelscope.cn'),
+        entry('baai', 'a', host='data.baai.ac.cn'),
+    ]
+    info_path = tmp_path / 'model_info.jsonl'
+    info_path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    calls = []
+
+    def list_names(platform, account, category):
+        calls.append((platform, account))
+        if account == 'broken':
+            raise RuntimeError('listing failed')
+        return {'org': {'kept', 'KEPT-2', 'kept-3'}}.get(account, set())
+
+    audit_path = tmp_path / 'audit.jsonl'
+    result = revalidate_info_file(info_path, 'model', list_names, audit_path=audit_path)
+
+    # One listing per account, none for platforms without listings
+    assert sorted(calls) == [
+        ('huggingface', 'gone'),
+        ('huggingface', 'org'),
+        ('modelscope', 'broken'),
+    ]
+    assert result.vanished == ['org/deleted']
+    assert sorted(result.skipped_accounts) == ['huggingface/gone', 'modelscope/broken']
+    updated = [json.loads(line) for line in info_path.read_text().splitlines()]
+    assert [line['name'] for line in updated if not line['valid']] == ['deleted', 'already-invalid']
+    assert json.loads(audit_path.read_text())['identifier'] == 'org/deleted'
+
+    # Nothing left to flag
+    assert revalidate_info_file(info_path, 'model', list_names).vanished == []